@@ -0,0 +1,72 @@
+"""
+Pencarian absensi terbuka (sudah absen masuk, belum absen keluar) untuk absen keluar.
+
+Tabel absensi_terbuka menyimpan satu baris per karyawan yang menunjuk ke absensi
+hari itu yang belum absen keluar. Baris ditulis saat absen masuk dan dihapus saat
+absen keluar atau saat absensinya dihapus, selalu dalam transaksi yang sama dengan
+perubahan absensi. Absen keluar cukup membaca satu baris berdasarkan primary key
+karyawan_id, berapa pun panjang riwayat absensi karyawan tersebut.
+
+Baris dari hari sebelumnya (karyawan lupa absen keluar) tidak pernah cocok dengan
+tanggal hari ini dan tertimpa saat karyawan absen masuk berikutnya.
+
+Fungsi di modul ini memakai Session sync; dari AsyncSession panggil melalui
+await db.run_sync(fungsi, ...).
+"""
+
+from models import Absensi, AbsensiTerbuka
+
+
+def buka(db, absensi):
+    """
+    Mencatat absensi baru sebagai absensi terbuka karyawannya.
+
+    Args:
+        db (Session): Session database (absensi sudah ditambahkan ke session)
+        absensi (Absensi): Absensi hasil absen masuk
+    """
+    # Flush agar ID absensi dan tanggal_hari (diisi sebelum insert) tersedia
+    db.flush()
+    db.merge(AbsensiTerbuka(
+        karyawan_id=absensi.karyawan_id,
+        absensi_id=absensi.id,
+        tanggal_hari=absensi.tanggal_hari
+    ))
+
+
+def cari(db, karyawan_id, tanggal):
+    """
+    Mencari absensi terbuka karyawan pada tanggal tersebut.
+
+    Args:
+        db (Session): Session database
+        karyawan_id (int): ID karyawan
+        tanggal (date): Tanggal absen masuk (biasanya hari ini)
+
+    Returns:
+        Absensi: Absensi yang belum absen keluar, atau None
+    """
+    return db.query(Absensi).join(
+        AbsensiTerbuka, AbsensiTerbuka.absensi_id == Absensi.id
+    ).filter(
+        AbsensiTerbuka.karyawan_id == karyawan_id,
+        AbsensiTerbuka.tanggal_hari == tanggal
+    ).first()
+
+
+def tutup(db, karyawan_id):
+    """
+    Menghapus absensi terbuka karyawan (setelah absen keluar atau karyawan dihapus).
+    """
+    db.query(AbsensiTerbuka).filter(
+        AbsensiTerbuka.karyawan_id == karyawan_id
+    ).delete(synchronize_session=False)
+
+
+def hapus_absensi(db, absensi_id):
+    """
+    Menghapus absensi terbuka yang menunjuk ke absensi yang akan dihapus.
+    """
+    db.query(AbsensiTerbuka).filter(
+        AbsensiTerbuka.absensi_id == absensi_id
+    ).delete(synchronize_session=False)
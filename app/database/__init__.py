@@ -4,8 +4,8 @@
 #            Mengekspos beberapa komponen penting untuk digunakan di modul lain.
 
 # Mengekspos komponen-komponen penting dari modul database
-from app.database.database import Base, engine, get_db, SessionLocal
-from app.database.models import Employee, Attendance, Admin
+from app.database.database import Base, engine, get_db, SessionLocal, get_async_db, AsyncSessionLocal, pool_stats
+from app.database.models import Karyawan, Absensi, Admin
 from app.database.init_db import init_db
 
 # Daftar komponen yang tersedia saat mengimpor package
@@ -14,8 +14,11 @@ __all__ = [
     'engine',
     'get_db',
     'SessionLocal',
-    'Employee',
-    'Attendance',
+    'get_async_db',
+    'AsyncSessionLocal',
+    'pool_stats',
+    'Karyawan',
+    'Absensi',
     'Admin',
     'init_db'
 ]
@@ -1,26 +1,29 @@
 # File: app/database/init_db.py
 # Deskripsi: Modul ini berisi fungsi untuk inisialisasi database dan pembuatan tabel-tabel.
+#            Skema dibuat dan diperbarui oleh runner migrasi (migrate.py) sehingga database
+#            baru langsung tercatat di tabel schema_version pada versi terbaru.
 #            Dapat dijalankan sebagai script terpisah untuk membuat skema database.
 
-# Import engine database dari modul database.py
-from app.database.database import engine
-
-# Import Base class yang berisi definisi model-model
-from app.database.models import Base
+# Import runner migrasi skema berversi dari modul migrate.py di root proyek
+import migrate
 
 def init_db():
     """
     Fungsi untuk menginisialisasi database dan membuat semua tabel.
 
-    Fungsi ini akan membuat semua tabel yang didefinisikan dalam model-model
-    yang mewarisi Base class. Jika tabel sudah ada, tidak akan dibuat ulang.
+    Fungsi ini menjalankan runner migrasi: database baru dibuat dari model-model
+    dalam bentuk terbarunya lalu ditandai pada versi skema terbaru, sedangkan
+    database lama diperbarui dengan migrasi yang belum diterapkan.
+
+    Returns:
+        int: Versi skema database setelah inisialisasi
     """
-    # Membuat semua tabel berdasarkan model yang didefinisikan
-    # create_all() akan membuat tabel jika belum ada, tidak akan mengubah jika sudah ada
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully!")
+    # Memakai engine migrasi agar DDL SQLite ikut transaksi bersama baris schema_version
+    versi = migrate.upgrade(migrate.create_migration_engine())
+    print(f"Database schema version {versi:04d} ready!")
+    return versi
 
 # Blok ini akan dieksekusi jika file dijalankan langsung (bukan diimpor)
 if __name__ == "__main__":
     # Panggil fungsi init_db untuk membuat tabel-tabel
-    init_db()
\ No newline at end of file
+    init_db()
@@ -0,0 +1,625 @@
+"""
+Arsip kolumnar absensi lama dalam file bulanan NumPy (.npz).
+
+Tabel absensi terus bertambah. Absensi yang lebih tua dari batas arsip
+(ARSIP_BATAS_BULAN bulan sebelum bulan berjalan) dipindahkan ke satu file per
+bulan, arsip/absensi-YYYY-MM.npz, lalu dihapus dari tabel absensi sehingga tabel
+dan index-nya tetap kecil dan halaman database yang sering dibaca tetap di cache.
+
+Setiap kolom absensi disimpan sebagai satu array NumPy (kolumnar, terkompresi).
+Isi foto tidak ikut diarsipkan: foto sudah berada di foto_blob dan arsip hanya
+menyimpan hash-nya (foto_masuk_hash, foto_keluar_hash), sehingga /foto/{hash}
+tetap dapat menampilkannya. Nilai NULL pada kolom teks disimpan sebagai string
+kosong, pada kolom waktu sebagai NaT, dan pada karyawan_id sebagai -1.
+
+Arsip tetap dapat dibaca melalui laporan dan ekspor laporan: baris_arsip()
+membaca bulan arsip yang beririsan dengan filter tanggal dan menerapkan filter
+laporan yang sama dengan array NumPy. Untuk satu halaman laporan, halaman_arsip()
+menerapkan posisi cursor dan memilih paling banyak limit + 1 baris teratas per
+bulan di NumPy (np.partition pada nilai urutan) sebelum membuat objek baris,
+sehingga biaya halaman tidak bergantung pada jumlah baris arsip. Nama dan
+departemen karyawan untuk baris arsip diambil dari peta karyawan yang di-cache
+(peta_karyawan). Bulan yang sudah diarsipkan bersifat
+tetap: ringkasan_harian dan rekap_bulanan untuk bulan tersebut tidak dihitung
+ulang (lihat awal_live).
+
+Konfigurasi melalui variabel lingkungan:
+- ARSIP_DIR: direktori file arsip (default arsip)
+- ARSIP_BATAS_BULAN: jumlah bulan terakhir yang tetap di tabel absensi (default 12)
+- ARSIP_CACHE_BULAN: jumlah file bulan arsip yang disimpan di memori (default 12)
+- ARSIP_DAFTAR_TTL: umur cache daftar bulan arsip dalam detik, 0 untuk tanpa batas (default 300)
+- PETA_KARYAWAN_TTL: umur cache peta karyawan dalam detik, 0 untuk tanpa batas (default 300)
+
+Daftar bulan arsip (bulan_arsip, awal_live) dibaca dari ARSIP_DIR sekali lalu
+disimpan di memori proses, karena awal_live dipanggil pada setiap absen masuk,
+absen keluar dan halaman laporan. Arsip yang ditulis di proses yang sama langsung
+memperbarui cache; arsip dari proses lain (command line di bawah) terlihat oleh
+aplikasi setelah paling lama ARSIP_DAFTAR_TTL detik.
+
+Penggunaan dari command line:
+    python arsip_absensi.py [--batas YYYY-MM] [--vacuum]
+"""
+
+import argparse
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime
+
+import numpy as np
+
+from models import Absensi, AbsensiTerbuka, Karyawan
+
+logger = logging.getLogger(__name__)
+
+# Direktori file arsip bulanan
+ARSIP_DIR = os.getenv("ARSIP_DIR", "arsip")
+# Jumlah bulan terakhir (termasuk bulan berjalan) yang tetap berada di tabel absensi
+ARSIP_BATAS_BULAN = int(os.getenv("ARSIP_BATAS_BULAN", "12"))
+# Jumlah file bulan arsip yang disimpan di memori setelah dibaca
+ARSIP_CACHE_BULAN = int(os.getenv("ARSIP_CACHE_BULAN", "12"))
+# Umur cache daftar bulan arsip dalam detik (0 = hanya diperbarui saat arsip ditulis di proses ini)
+ARSIP_DAFTAR_TTL = float(os.getenv("ARSIP_DAFTAR_TTL", "300"))
+# Umur cache peta karyawan dalam detik (0 = hanya dimuat ulang saat invalidasi_karyawan)
+PETA_KARYAWAN_TTL = float(os.getenv("PETA_KARYAWAN_TTL", "300"))
+
+_FILE_PATTERN = re.compile(r"^absensi-(\d{4})-(\d{2})\.npz$")
+
+# Kolom absensi yang diarsipkan beserta jenis penyimpanannya
+KOLOM_ARSIP = {
+    "id": "int",
+    "karyawan_id": "int",
+    "tanggal": "datetime",
+    "tanggal_hari": "date",
+    "jam_masuk": "datetime",
+    "jam_keluar": "datetime",
+    "waktu": "str",
+    "hari": "str",
+    "status": "str",
+    "keterangan": "str",
+    "foto_masuk_hash": "str",
+    "foto_keluar_hash": "str",
+    "alamat": "str",
+    "alamat_keluar": "str",
+    "latitude": "float",
+    "longitude": "float",
+    "uang_makan": "bool",
+    "uang_transport": "bool",
+}
+
+# Baris arsip dengan atribut yang sama dengan baris laporan.REPORT_COLUMNS
+ArsipRow = namedtuple("ArsipRow", [
+    "id", "karyawan_id", "nama", "departemen", "tanggal", "jam_masuk", "jam_keluar",
+    "status", "alamat", "alamat_keluar", "foto_masuk_hash", "foto_keluar_hash",
+    "uang_makan", "uang_transport",
+])
+
+
+def _bulan_berikutnya(bulan):
+    return date(bulan.year + 1, 1, 1) if bulan.month == 12 else date(bulan.year, bulan.month + 1, 1)
+
+
+def batas_default(hari_ini=None):
+    """
+    Menghitung batas arsip default: awal bulan ARSIP_BATAS_BULAN - 1 bulan sebelum bulan berjalan.
+
+    Returns:
+        date: Absensi dengan tanggal_hari sebelum tanggal ini diarsipkan
+    """
+    hari_ini = hari_ini or datetime.now().date()
+    indeks = hari_ini.year * 12 + hari_ini.month - 1 - max(ARSIP_BATAS_BULAN - 1, 0)
+    return date(indeks // 12, indeks % 12 + 1, 1)
+
+
+def path_bulan(bulan):
+    """
+    Path file arsip untuk bulan tersebut.
+    """
+    return os.path.join(ARSIP_DIR, f"absensi-{bulan.year:04d}-{bulan.month:02d}.npz")
+
+
+def _baca_daftar_bulan():
+    # Daftar bulan arsip langsung dari isi ARSIP_DIR
+    if not os.path.isdir(ARSIP_DIR):
+        return ()
+    months = []
+    for name in os.listdir(ARSIP_DIR):
+        match = _FILE_PATTERN.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return tuple(sorted(months))
+
+
+_daftar_lock = threading.Lock()
+_daftar_bulan = None
+_daftar_dimuat_pada = 0.0
+
+
+def bulan_arsip():
+    """
+    Daftar bulan yang sudah diarsipkan (tanggal pertama bulan), urut naik.
+
+    Dibaca dari cache; isi ARSIP_DIR dibaca ulang setelah ARSIP_DAFTAR_TTL detik
+    atau setelah arsip ditulis di proses ini.
+
+    Returns:
+        tuple: Tanggal pertama setiap bulan arsip
+    """
+    global _daftar_bulan, _daftar_dimuat_pada
+    months = _daftar_bulan
+    if months is not None and (ARSIP_DAFTAR_TTL <= 0 or time.monotonic() - _daftar_dimuat_pada < ARSIP_DAFTAR_TTL):
+        return months
+
+    with _daftar_lock:
+        if _daftar_bulan is months:
+            _daftar_bulan = _baca_daftar_bulan()
+            _daftar_dimuat_pada = time.monotonic()
+        return _daftar_bulan
+
+
+def _invalidasi_daftar():
+    # Daftar bulan dibaca ulang dari ARSIP_DIR pada pemanggilan bulan_arsip berikutnya
+    global _daftar_bulan
+    with _daftar_lock:
+        _daftar_bulan = None
+
+
+def awal_live():
+    """
+    Tanggal pertama yang datanya masih berada di tabel absensi.
+
+    Ringkasan dan rekap untuk tanggal sebelum ini tidak boleh dihitung ulang dari
+    tabel absensi karena barisnya sudah dipindahkan ke arsip. Dibaca dari cache
+    daftar bulan arsip (lihat bulan_arsip) tanpa mengakses sistem file.
+
+    Returns:
+        date: Awal bulan setelah bulan arsip terakhir, atau None jika belum ada arsip
+    """
+    months = bulan_arsip()
+    return _bulan_berikutnya(months[-1]) if months else None
+
+
+def _to_columns(rows):
+    # Mengubah baris absensi menjadi array per kolom sesuai KOLOM_ARSIP
+    columns = {}
+    for index, (name, kind) in enumerate(KOLOM_ARSIP.items()):
+        values = [row[index] for row in rows]
+        if kind == "int":
+            columns[name] = np.array([-1 if value is None else value for value in values], dtype=np.int64)
+        elif kind == "datetime":
+            columns[name] = np.array(
+                [np.datetime64("NaT") if value is None else np.datetime64(value, "us") for value in values],
+                dtype="datetime64[us]"
+            )
+        elif kind == "date":
+            columns[name] = np.array(
+                [np.datetime64("NaT") if value is None else np.datetime64(value, "D") for value in values],
+                dtype="datetime64[D]"
+            )
+        elif kind == "float":
+            columns[name] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        elif kind == "bool":
+            columns[name] = np.array([bool(value) for value in values], dtype=bool)
+        else:
+            columns[name] = np.array(["" if value is None else str(value) for value in values], dtype=str)
+    return columns
+
+
+def _tulis(bulan, columns):
+    """
+    Menulis file arsip satu bulan secara atomik, digabung dengan arsip bulan itu yang sudah ada.
+    """
+    path = path_bulan(bulan)
+    if os.path.exists(path):
+        # Bulan yang sama diarsipkan ulang: gabungkan, baris dari tabel absensi menggantikan ID yang sama
+        lama = _baca(path)
+        sisa = ~np.isin(lama["id"], columns["id"])
+        columns = {name: np.concatenate([lama[name][sisa], columns[name]]) for name in KOLOM_ARSIP}
+
+    urutan = np.lexsort((columns["id"], columns["tanggal"]))
+    columns = {name: values[urutan] for name, values in columns.items()}
+
+    os.makedirs(ARSIP_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **columns)
+    os.replace(tmp_path, path)
+    _cache_clear()
+    _invalidasi_daftar()
+    return len(columns["id"])
+
+
+def arsipkan_bulan(db, bulan):
+    """
+    Memindahkan absensi satu bulan ke file arsip lalu menghapusnya dari tabel absensi.
+
+    File ditulis lebih dulu, kemudian baris dihapus dan di-commit. Jika proses
+    terhenti di antaranya, menjalankan ulang arsip menggabungkan file yang ada
+    dan menghapus baris yang tersisa.
+
+    Args:
+        db (Session): Session database
+        bulan (date): Tanggal pertama bulan
+
+    Returns:
+        int: Jumlah absensi yang dipindahkan
+    """
+    akhir = _bulan_berikutnya(bulan)
+    kondisi = (Absensi.tanggal_hari >= bulan, Absensi.tanggal_hari < akhir)
+    columns = [getattr(Absensi, name) for name in KOLOM_ARSIP]
+    rows = db.query(*columns).filter(*kondisi).order_by(Absensi.tanggal.asc(), Absensi.id.asc()).all()
+    if not rows:
+        return 0
+
+    _tulis(bulan, _to_columns(rows))
+
+    ids = db.query(Absensi.id).filter(*kondisi)
+    db.query(AbsensiTerbuka).filter(AbsensiTerbuka.absensi_id.in_(ids)).delete(synchronize_session=False)
+    db.query(Absensi).filter(*kondisi).delete(synchronize_session=False)
+    db.commit()
+    logger.info(f"Arsip {bulan:%Y-%m}: {len(rows)} absensi dipindahkan ke {path_bulan(bulan)}")
+    return len(rows)
+
+
+def arsipkan(db, batas=None):
+    """
+    Mengarsipkan semua absensi dengan tanggal_hari sebelum batas, satu transaksi per bulan.
+
+    Args:
+        db (Session): Session database
+        batas (date, optional): Batas arsip, dibulatkan ke awal bulan (default batas_default())
+
+    Returns:
+        int: Jumlah absensi yang dipindahkan
+    """
+    batas = batas or batas_default()
+    batas = date(batas.year, batas.month, 1)
+    tanggal_awal = db.query(Absensi.tanggal_hari).filter(
+        Absensi.tanggal_hari < batas
+    ).order_by(Absensi.tanggal_hari.asc()).limit(1).scalar()
+
+    total = 0
+    bulan = date(tanggal_awal.year, tanggal_awal.month, 1) if tanggal_awal else batas
+    while bulan < batas:
+        total += arsipkan_bulan(db, bulan)
+        bulan = _bulan_berikutnya(bulan)
+    return total
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_clear():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _baca(path):
+    # Membaca semua kolom file arsip (tanpa pickle)
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in KOLOM_ARSIP}
+
+
+def baca_bulan(bulan):
+    """
+    Membaca kolom arsip satu bulan, dengan cache LRU sebanyak ARSIP_CACHE_BULAN bulan.
+
+    Returns:
+        dict: Nama kolom -> array NumPy, atau None jika bulan tersebut tidak diarsipkan
+    """
+    path = path_bulan(bulan)
+    try:
+        key = (path, os.path.getmtime(path))
+    except OSError:
+        return None
+
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    columns = _baca(path)
+    with _cache_lock:
+        _cache[key] = columns
+        while len(_cache) > max(ARSIP_CACHE_BULAN, 0):
+            _cache.popitem(last=False)
+    return columns
+
+
+class PetaKaryawan:
+    """
+    Nama dan departemen seluruh karyawan sebagai array NumPy, untuk baris arsip (read-only).
+
+    Attributes:
+        ids (ndarray): ID karyawan, urut naik
+        nama (ndarray): Nama karyawan sesuai urutan ids
+        departemen (ndarray): Departemen karyawan sesuai urutan ids
+    """
+
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda row: row[0])
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.nama = np.array([row[1] for row in rows], dtype=str)
+        self.departemen = np.array([row[2] for row in rows], dtype=str)
+
+    def posisi(self, karyawan_ids):
+        """
+        Posisi setiap ID karyawan (yang ada di peta) pada array ids.
+        """
+        return np.searchsorted(self.ids, karyawan_ids)
+
+    def ids_terfilter(self, filters):
+        """
+        ID karyawan yang boleh muncul di laporan (join dengan karyawan, ditambah filter departemen).
+        """
+        if "departemen" in filters:
+            return self.ids[self.departemen == filters["departemen"]]
+        return self.ids
+
+
+_peta_lock = threading.Lock()
+_peta = None
+_peta_dimuat_pada = 0.0
+
+
+def peta_karyawan(db):
+    """
+    Mengambil peta karyawan dari cache, dimuat dari database jika perlu.
+
+    Returns:
+        PetaKaryawan: Nama dan departemen seluruh karyawan
+    """
+    global _peta, _peta_dimuat_pada
+    peta = _peta
+    if peta is not None and (PETA_KARYAWAN_TTL <= 0 or time.monotonic() - _peta_dimuat_pada < PETA_KARYAWAN_TTL):
+        return peta
+
+    with _peta_lock:
+        if _peta is peta:
+            _peta = PetaKaryawan(db.query(Karyawan.id, Karyawan.nama, Karyawan.departemen).all())
+            _peta_dimuat_pada = time.monotonic()
+        return _peta
+
+
+def invalidasi_karyawan():
+    """
+    Mengosongkan cache peta karyawan (dipanggil setelah karyawan diubah atau dihapus dan di-commit).
+
+    Karyawan baru tidak perlu: karyawan tersebut belum memiliki baris arsip.
+    """
+    global _peta
+    with _peta_lock:
+        _peta = None
+
+
+def _bulan_dalam_filter(filters):
+    # Bulan arsip yang beririsan dengan filter rentang tanggal
+    mulai = filters.get("tanggal_mulai")
+    akhir = filters.get("tanggal_akhir")
+    return [
+        bulan for bulan in bulan_arsip()
+        if (mulai is None or _bulan_berikutnya(bulan) > mulai) and (akhir is None or bulan <= akhir)
+    ]
+
+
+def ada_arsip(filters):
+    """
+    Memeriksa apakah filter laporan mencakup bulan yang sudah diarsipkan (tanpa membaca file).
+    """
+    return bool(_bulan_dalam_filter(filters))
+
+
+def _nilai(array):
+    # Array NumPy -> list nilai Python (NaT -> None, string kosong -> None)
+    values = array.tolist()
+    if array.dtype.kind == "U":
+        return [value or None for value in values]
+    return values
+
+
+def _mask(columns, filters, ids_karyawan):
+    # Filter laporan sebagai mask boolean atas kolom arsip satu bulan
+    mask = np.isin(columns["karyawan_id"], ids_karyawan)
+    if "tanggal_mulai" in filters:
+        mask &= columns["tanggal_hari"] >= np.datetime64(filters["tanggal_mulai"], "D")
+    if "tanggal_akhir" in filters:
+        mask &= columns["tanggal_hari"] <= np.datetime64(filters["tanggal_akhir"], "D")
+    if "karyawan_id" in filters:
+        mask &= columns["karyawan_id"] == int(filters["karyawan_id"])
+    if "status" in filters:
+        mask &= columns["status"] == filters["status"]
+    return mask
+
+
+def _baris(columns, indeks, karyawan):
+    # Membuat ArsipRow untuk baris arsip pada posisi indeks (karyawan_id harus ada di peta)
+    selected = {name: _nilai(columns[name][indeks]) for name in ArsipRow._fields if name in KOLOM_ARSIP}
+    posisi = karyawan.posisi(columns["karyawan_id"][indeks])
+    selected["nama"] = karyawan.nama[posisi].tolist()
+    selected["departemen"] = karyawan.departemen[posisi].tolist()
+    return [
+        ArsipRow(**{name: values[i] for name, values in selected.items()})
+        for i in range(len(indeks))
+    ]
+
+
+def jumlah_arsip(filters, karyawan):
+    """
+    Menghitung baris arsip yang cocok dengan filter laporan.
+
+    Args:
+        filters (dict): Hasil laporan.parse_filters
+        karyawan (PetaKaryawan): Hasil peta_karyawan
+
+    Returns:
+        int: Jumlah baris
+    """
+    ids_karyawan = karyawan.ids_terfilter(filters)
+    total = 0
+    for bulan in _bulan_dalam_filter(filters):
+        columns = baca_bulan(bulan)
+        if columns is not None:
+            total += int(_mask(columns, filters, ids_karyawan).sum())
+    return total
+
+
+def baris_arsip(filters, karyawan):
+    """
+    Membaca baris arsip yang cocok dengan filter laporan, urut tanggal lalu ID.
+
+    Seperti join laporan dengan tabel karyawan, baris milik karyawan yang sudah
+    tidak ada dilewati.
+
+    Args:
+        filters (dict): Hasil laporan.parse_filters
+        karyawan (PetaKaryawan): Hasil peta_karyawan
+
+    Yields:
+        ArsipRow: Baris arsip
+    """
+    ids_karyawan = karyawan.ids_terfilter(filters)
+    for bulan in _bulan_dalam_filter(filters):
+        columns = baca_bulan(bulan)
+        if columns is None:
+            continue
+        indeks = np.flatnonzero(_mask(columns, filters, ids_karyawan))
+        if len(indeks):
+            yield from _baris(columns, indeks, karyawan)
+
+
+def _nilai_urutan(columns, indeks, sort, nilai_null, karyawan):
+    # Nilai kolom urutan laporan untuk baris arsip pada posisi indeks, NULL diganti nilai_null
+    if sort in ("nama", "departemen"):
+        return getattr(karyawan, sort)[karyawan.posisi(columns["karyawan_id"][indeks])]
+    values = columns[sort][indeks]
+    if values.dtype.kind == "M":
+        return np.where(np.isnat(values), np.datetime64(nilai_null, "us"), values)
+    return np.where(values == "", nilai_null, values)
+
+
+def _teratas(keys, ids, jumlah, turun):
+    """
+    Posisi paling banyak jumlah baris teratas menurut (keys, ids), sudah terurut.
+
+    Nilai batas dicari dengan np.partition (O(n)); hanya baris yang lolos batas
+    yang diurutkan penuh.
+    """
+    n = len(keys)
+    if n > jumlah:
+        kth = n - jumlah if turun else jumlah - 1
+        batas = np.partition(keys, kth)[kth]
+        lebih = np.flatnonzero(keys > batas if turun else keys < batas)
+        # Baris dengan nilai urutan sama dengan batas dipilih berdasarkan ID
+        seri = np.flatnonzero(keys == batas)
+        sisa = jumlah - len(lebih)
+        if len(seri) > sisa:
+            k = len(seri) - sisa if turun else sisa - 1
+            seri = seri[np.argpartition(ids[seri], k)]
+            seri = seri[k:] if turun else seri[:sisa]
+        pilihan = np.concatenate([lebih, seri])
+    else:
+        pilihan = np.arange(n)
+    urutan = np.lexsort((ids[pilihan], keys[pilihan]))
+    return pilihan[urutan[::-1] if turun else urutan]
+
+
+def halaman_arsip(filters, karyawan, sort, turun, setelah, jumlah, nilai_null):
+    """
+    Memilih baris arsip untuk satu halaman laporan berurutan dengan keyset pagination.
+
+    Per bulan, filter laporan, posisi cursor dan batas jumlah baris diterapkan pada
+    array NumPy; objek baris hanya dibuat untuk paling banyak jumlah baris teratas
+    setiap bulan. Untuk urutan tanggal, bulan dibaca sesuai arah urutan dan berhenti
+    setelah cukup baris terkumpul karena bulan arsip tidak saling beririsan.
+
+    Args:
+        filters (dict): Hasil laporan.parse_filters
+        karyawan (PetaKaryawan): Hasil peta_karyawan
+        sort (str): Kolom urutan laporan (tanggal, jam_masuk, jam_keluar, nama, departemen, status)
+        turun (bool): True untuk urutan turun
+        setelah (tuple): (nilai urutan, ID) baris terakhir halaman sebelumnya, None untuk halaman pertama
+        jumlah (int): Jumlah baris maksimum per bulan
+        nilai_null (datetime | str): Nilai urutan pengganti NULL, sama dengan laporan
+
+    Returns:
+        list: Tuple (nilai urutan, ID, ArsipRow), terurut per bulan (belum digabung antar bulan)
+    """
+    ids_karyawan = karyawan.ids_terfilter(filters)
+    months = _bulan_dalam_filter(filters)
+    if turun:
+        months.reverse()
+
+    hasil = []
+    for bulan in months:
+        if sort == "tanggal" and len(hasil) >= jumlah:
+            break
+        columns = baca_bulan(bulan)
+        if columns is None:
+            continue
+        indeks = np.flatnonzero(_mask(columns, filters, ids_karyawan))
+        keys = _nilai_urutan(columns, indeks, sort, nilai_null, karyawan)
+        ids = columns["id"][indeks]
+        if setelah is not None:
+            nilai_akhir, id_akhir = setelah
+            if keys.dtype.kind == "M":
+                nilai_akhir = np.datetime64(nilai_akhir, "us")
+            if turun:
+                lolos = (keys < nilai_akhir) | ((keys == nilai_akhir) & (ids < id_akhir))
+            else:
+                lolos = (keys > nilai_akhir) | ((keys == nilai_akhir) & (ids > id_akhir))
+            indeks, keys, ids = indeks[lolos], keys[lolos], ids[lolos]
+        if not len(indeks):
+            continue
+
+        pilihan = _teratas(keys, ids, jumlah, turun)
+        rows = _baris(columns, indeks[pilihan], karyawan)
+        hasil.extend(zip(keys[pilihan].tolist(), ids[pilihan].tolist(), rows))
+    return hasil
+
+
+def hash_foto_arsip():
+    """
+    Mengumpulkan hash foto yang direferensikan arsip (agar tidak dihapus sebagai foto tanpa referensi).
+
+    Returns:
+        set: Hash SHA-256 foto
+    """
+    hashes = set()
+    # Tanpa cache: foto yang direferensikan arsip dari proses lain tidak boleh terlewat
+    for bulan in _baca_daftar_bulan():
+        with np.load(path_bulan(bulan), allow_pickle=False) as data:
+            for name in ("foto_masuk_hash", "foto_keluar_hash"):
+                hashes.update(value for value in data[name].tolist() if value)
+    return hashes
+
+
+if __name__ == "__main__":
+    from database import SessionLocal, engine
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Arsipkan absensi lama ke file bulanan .npz")
+    parser.add_argument("--batas", type=lambda value: datetime.strptime(value, "%Y-%m").date(),
+                        help="Arsipkan absensi sebelum bulan ini, YYYY-MM (default: ARSIP_BATAS_BULAN bulan terakhir tetap)")
+    parser.add_argument("--vacuum", action="store_true", help="Kembalikan ruang database SQLite setelah arsip")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        jumlah = arsipkan(db, args.batas)
+        logger.info(f"Arsip selesai: {jumlah} absensi dipindahkan")
+    finally:
+        db.close()
+
+    if args.vacuum and jumlah and engine.dialect.name == "sqlite":
+        # VACUUM tidak dapat dijalankan di dalam transaksi
+        connection = engine.raw_connection()
+        try:
+            logger.info("Menjalankan VACUUM...")
+            connection.cursor().execute("VACUUM")
+        finally:
+            connection.close()
@@ -0,0 +1,6 @@
+"""
+Benchmark untuk jalur pengenalan wajah aplikasi absensi.
+
+Jalankan dari root repository, misalnya:
+    python -m benchmarks.bench_face_index
+"""
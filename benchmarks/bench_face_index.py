@@ -0,0 +1,147 @@
+"""
+Benchmark recall dan latensi index IVF (face_index.py) dibandingkan pencarian eksak.
+
+Penggunaan:
+    python -m benchmarks.bench_face_index [--sizes 10000 50000 100000] [--nprobe 4 8 16] [--json hasil.json]
+
+Galeri sintetis dibuat dari campuran Gaussian di ruang 128 dimensi sehingga
+memiliki struktur cluster seperti encoding wajah asli (jarak antar karyawan
+sekitar 0.8-1.0, jarak antar foto karyawan yang sama sekitar 0.3-0.4). Setiap
+query adalah template acak dari galeri yang diberi noise, sehingga jawaban yang
+benar diketahui. Recall@1 dihitung terhadap hasil pencarian eksak FaceGallery.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from face_encoding_format import ENCODING_DIM
+from face_gallery import FACE_MATCH_TOLERANCE, FaceGallery
+from face_index import IVFIndex
+
+# Jumlah komponen campuran Gaussian pada galeri sintetis
+N_MODES = 64
+# Simpangan baku per dimensi: jarak antar karyawan ~0.9, antar foto karyawan yang sama ~0.35
+MODE_STD = 0.045
+IDENTITY_STD = 0.04
+QUERY_NOISE_STD = 0.03
+
+
+def synthetic_gallery(size, seed=0):
+    """
+    Membuat galeri sintetis dengan satu template per karyawan.
+
+    Args:
+        size (int): Jumlah template
+        seed (int): Seed generator acak
+
+    Returns:
+        FaceGallery: Snapshot galeri sintetis
+    """
+    rng = np.random.default_rng(seed)
+    modes = rng.normal(0.0, MODE_STD, size=(N_MODES, ENCODING_DIM))
+    assignment = rng.integers(0, N_MODES, size=size)
+    matrix = modes[assignment] + rng.normal(0.0, IDENTITY_STD, size=(size, ENCODING_DIM))
+    owner_ids = np.arange(1, size + 1)
+    return FaceGallery(owner_ids, matrix.astype(np.float32))
+
+
+def synthetic_queries(gallery, count, seed=1):
+    """
+    Membuat query dari template galeri yang diberi noise.
+
+    Returns:
+        numpy.ndarray: Matriks query (count, 128)
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(gallery.matrix), size=count)
+    noise = rng.normal(0.0, QUERY_NOISE_STD, size=(count, ENCODING_DIM))
+    return (gallery.matrix[rows] + noise).astype(np.float32)
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000.0)
+
+
+def run(sizes, nprobes, n_queries):
+    """
+    Menjalankan benchmark untuk setiap ukuran galeri dan nilai nprobe.
+
+    Returns:
+        list: Daftar dict hasil per (ukuran, metode)
+    """
+    results = []
+    for size in sizes:
+        gallery = synthetic_gallery(size)
+        queries = synthetic_queries(gallery, n_queries)
+        gallery.match(queries[0])  # Pemanasan: hitung pengelompokan per pemilik sekali
+
+        exact_ids = []
+        exact_times = []
+        for query in queries:
+            started = time.perf_counter()
+            karyawan_id, _ = gallery.match(query, tolerance=FACE_MATCH_TOLERANCE)
+            exact_times.append(time.perf_counter() - started)
+            exact_ids.append(karyawan_id)
+        results.append({
+            "size": size,
+            "method": "exact",
+            "nprobe": None,
+            "build_s": 0.0,
+            "recall_at_1": 1.0,
+            "p50_ms": percentile_ms(exact_times, 50),
+            "p95_ms": percentile_ms(exact_times, 95),
+        })
+
+        started = time.perf_counter()
+        index = IVFIndex.build(gallery)
+        build_s = time.perf_counter() - started
+
+        for nprobe in nprobes:
+            hits = 0
+            times = []
+            for query, expected in zip(queries, exact_ids):
+                started = time.perf_counter()
+                karyawan_id, _ = index.search(gallery, query, nprobe=nprobe)
+                times.append(time.perf_counter() - started)
+                hits += karyawan_id == expected
+            results.append({
+                "size": size,
+                "method": "ivf",
+                "nprobe": nprobe,
+                "n_lists": len(index.centroids),
+                "build_s": build_s,
+                "recall_at_1": hits / len(queries),
+                "p50_ms": percentile_ms(times, 50),
+                "p95_ms": percentile_ms(times, 95),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recall dan latensi index IVF wajah")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000, 100000], help="Ukuran galeri")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16], help="Jumlah daftar yang dipindai")
+    parser.add_argument("--queries", type=int, default=200, help="Jumlah query per ukuran galeri")
+    parser.add_argument("--json", help="Simpan hasil dalam format JSON ke file ini")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.nprobe, args.queries)
+
+    print(f"{'ukuran':>8} {'metode':>6} {'nprobe':>6} {'build(s)':>9} {'recall@1':>9} {'p50(ms)':>9} {'p95(ms)':>9}")
+    for row in results:
+        nprobe = "-" if row["nprobe"] is None else row["nprobe"]
+        print(
+            f"{row['size']:>8} {row['method']:>6} {nprobe:>6} {row['build_s']:>9.2f} "
+            f"{row['recall_at_1']:>9.3f} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
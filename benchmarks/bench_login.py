@@ -0,0 +1,343 @@
+"""
+Benchmark jalur pengenalan wajah login karyawan.
+
+Penggunaan:
+    python -m benchmarks.bench_login [--sizes 100 1000 10000 100000] [--images benchmarks/fixtures] [--json hasil.json]
+
+Untuk setiap ukuran galeri, benchmark membuat database SQLite sementara berisi
+karyawan dan encoding wajah sintetis, lalu mengukur tiga lapisan secara terpisah:
+1. gallery_load: FaceGalleryService.reload() dari tabel face_encoding
+2. matching: FaceGallery.match() per login (tanpa deteksi wajah)
+3. endpoint: POST /employee-login lengkap melalui TestClient FastAPI dengan
+   foto wajah fixture (decode, deteksi dan encoding di pool worker, pencocokan,
+   query karyawan). Foto fixture juga didaftarkan ke galeri sehingga login
+   berhasil. Lapisan ini dilewati jika face_recognition tidak terpasang atau
+   tidak ada foto fixture.
+
+Foto fixture dibaca dari direktori --images (default benchmarks/fixtures, foto
+wajah kecil yang ikut di repository; lihat README di direktori tersebut). Semua
+data dibuat lokal sehingga benchmark berjalan offline. Aplikasi diarahkan ke
+database sementara melalui DATABASE_URL sebelum diimpor, sehingga benchmark
+tidak menyentuh dan tidak bergantung pada database kerja (absensi.db). Hasil JSON menyertakan commit git dan versi library agar regresi dapat
+dibandingkan antar commit.
+"""
+
+import argparse
+import base64
+import importlib.util
+import json
+import logging
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+# database.py dan main.py membaca DATABASE_URL saat diimpor: arahkan ke database sementara
+# sebelum modul aplikasi mana pun diimpor. Worker wajah (spawn) mengimpor ulang modul ini
+# dan memakai direktori yang sama dari environment proses induk.
+if "BENCH_LOGIN_DB_DIR" not in os.environ:
+    os.environ["BENCH_LOGIN_DB_DIR"] = tempfile.mkdtemp(prefix="bench-login-")
+APP_DB_DIR = os.environ["BENCH_LOGIN_DB_DIR"]
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(APP_DB_DIR, "app.db")
+
+import numpy as np  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import face_encoding_format  # noqa: E402
+from benchmarks.bench_face_index import synthetic_gallery, synthetic_queries  # noqa: E402
+from database import Base  # noqa: E402
+from face_gallery import FACE_MATCH_TOLERANCE, FaceGalleryService  # noqa: E402
+
+# Ekstensi foto fixture yang dipakai lapisan endpoint
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+# Foto wajah fixture bawaan repository
+DEFAULT_IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def percentiles_ms(samples):
+    samples = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "min_ms": round(float(samples.min()), 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def load_fixture_images(directory):
+    """
+    Membaca foto wajah fixture dari direktori.
+
+    Returns:
+        list: Daftar tuple (nama file, bytes foto)
+    """
+    if not directory or not os.path.isdir(directory):
+        return []
+    images = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            with open(os.path.join(directory, name), "rb") as f:
+                images.append((name, f.read()))
+    return images
+
+
+def fixture_encodings(images):
+    """
+    Menghitung encoding wajah foto fixture agar dapat didaftarkan ke galeri.
+
+    Returns:
+        list: Encoding wajah (satu per foto yang wajahnya terdeteksi)
+    """
+    import face_recognition
+    from image_ingest import ingest_image
+
+    encodings = []
+    for name, data in images:
+        rgb_img, _ = ingest_image(data)
+        found = face_recognition.face_encodings(rgb_img)
+        if found:
+            encodings.append(found[0])
+        else:
+            logging.warning(f"Tidak ada wajah pada foto fixture {name}")
+    return encodings
+
+
+def create_synthetic_db(path, encodings):
+    """
+    Membuat database SQLite berisi satu karyawan dan satu template per encoding.
+
+    Args:
+        path (str): Path file database
+        encodings (numpy.ndarray): Matriks encoding (N, 128)
+
+    Returns:
+        str: URL database SQLAlchemy
+    """
+    url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    now = datetime.now()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO karyawan (id, nama, email, no_telepon, jabatan, departemen, alamat, tanggal_bergabung, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)",
+            (
+                (i, f"Karyawan {i}", f"karyawan{i}@example.com", "0800000000", "Staf", f"Departemen {i % 10}", "-", now)
+                for i in range(1, len(encodings) + 1)
+            )
+        )
+        conn.executemany(
+            "INSERT INTO face_encoding (karyawan_id, encoding, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            ((i, face_encoding_format.encode(vector), now, now) for i, vector in enumerate(encodings, start=1))
+        )
+    conn.close()
+    return url
+
+
+def bench_gallery_load(session_factory, repeats):
+    times = []
+    for _ in range(repeats):
+        service = FaceGalleryService()
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            service.reload(db)
+            times.append(time.perf_counter() - started)
+        finally:
+            db.close()
+    return percentiles_ms(times)
+
+
+def bench_matching(gallery, queries):
+    started = time.perf_counter()
+    gallery.match(queries[0], tolerance=FACE_MATCH_TOLERANCE)  # Termasuk pengelompokan per pemilik
+    first_ms = (time.perf_counter() - started) * 1000.0
+
+    times = []
+    for query in queries:
+        started = time.perf_counter()
+        gallery.match(query, tolerance=FACE_MATCH_TOLERANCE)
+        times.append(time.perf_counter() - started)
+    result = percentiles_ms(times)
+    result["first_ms"] = round(first_ms, 3)
+    return result
+
+
+def bench_endpoint(client, images, rounds):
+    times = []
+    statuses = {}
+    matched = 0
+    for _ in range(rounds):
+        for _, data in images:
+            image_data = "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+            started = time.perf_counter()
+            response = client.post("/employee-login", data={"imageData": image_data}, allow_redirects=False)
+            times.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            matched += response.status_code == 303
+    result = percentiles_ms(times)
+    result["requests"] = len(times)
+    result["matched"] = matched
+    result["status_codes"] = statuses
+    return result
+
+
+def run(sizes, images_dir, queries, repeats, rounds):
+    """
+    Menjalankan benchmark untuk setiap ukuran galeri.
+
+    Returns:
+        dict: Metadata lingkungan dan hasil per ukuran galeri
+    """
+    images = load_fixture_images(images_dir)
+    endpoint_skip = None
+    if importlib.util.find_spec("face_recognition") is None:
+        endpoint_skip = "face_recognition tidak terpasang"
+    elif not images:
+        endpoint_skip = f"tidak ada foto fixture di {images_dir}"
+
+    enrolled = []
+    client = None
+    if endpoint_skip is None:
+        enrolled = fixture_encodings(images)
+        from fastapi.testclient import TestClient
+
+        import migrate
+
+        # Pemeriksaan versi skema saat main diimpor berjalan pada database sementara yang baru dibuat
+        migration_engine = migrate.create_migration_engine(os.environ["DATABASE_URL"])
+        migrate.upgrade(migration_engine)
+        migration_engine.dispose()
+        import main
+        from database import create_async_db_engine, get_async_db, get_db
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        client = TestClient(main.app)
+        client.__enter__()  # Menjalankan event startup (pool worker wajah)
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for size in sizes:
+                synthetic = synthetic_gallery(size)
+                encodings = synthetic.matrix
+                if enrolled:
+                    # Wajah fixture mengisi baris pertama galeri agar login dapat berhasil
+                    encodings = np.vstack([np.asarray(enrolled, dtype=np.float32), encodings[len(enrolled):]])
+
+                url = create_synthetic_db(os.path.join(tmp, f"gallery_{size}.db"), encodings)
+                engine = create_engine(url, connect_args={"check_same_thread": False})
+                session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                async_engine = None
+
+                row = {"size": size}
+                row["gallery_load"] = bench_gallery_load(session_factory, repeats)
+
+                loader = FaceGalleryService()
+                db = session_factory()
+                try:
+                    gallery = loader.reload(db)
+                finally:
+                    db.close()
+                row["matching"] = bench_matching(gallery, synthetic_queries(synthetic, queries))
+
+                if client is None:
+                    row["endpoint"] = {"skipped": endpoint_skip}
+                else:
+                    def override_get_db():
+                        db = session_factory()
+                        try:
+                            yield db
+                        finally:
+                            db.close()
+
+                    # POST /employee-login memakai session async (sqlite+aiosqlite ke database sintetis yang sama)
+                    async_engine = create_async_db_engine(url)
+                    async_session_factory = sessionmaker(
+                        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+                    )
+
+                    async def override_get_async_db():
+                        async with async_session_factory() as db:
+                            yield db
+
+                    main.app.dependency_overrides[get_db] = override_get_db
+                    main.app.dependency_overrides[get_async_db] = override_get_async_db
+                    db = session_factory()
+                    try:
+                        main.face_gallery_service.reload(db)
+                    finally:
+                        db.close()
+                    row["endpoint"] = bench_endpoint(client, images, rounds)
+
+                engine.dispose()
+                if async_engine is not None:
+                    # Koneksi aiosqlite file tidak di-pool (NullPool), cukup lepaskan engine sync-nya
+                    async_engine.sync_engine.dispose()
+                results.append(row)
+    finally:
+        if client is not None:
+            main.app.dependency_overrides.clear()
+            client.__exit__(None, None, None)
+
+    return {
+        "benchmark": "login",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "fixture_images": len(images),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark jalur pengenalan wajah login karyawan")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000], help="Ukuran galeri")
+    parser.add_argument("--images", default=DEFAULT_IMAGES_DIR, help="Direktori foto wajah fixture untuk lapisan endpoint")
+    parser.add_argument("--queries", type=int, default=200, help="Jumlah query pencocokan per ukuran galeri")
+    parser.add_argument("--repeats", type=int, default=3, help="Jumlah pengulangan pemuatan galeri")
+    parser.add_argument("--rounds", type=int, default=3, help="Jumlah putaran login per foto fixture")
+    parser.add_argument("--json", help="Simpan hasil dalam format JSON ke file ini (default stdout)")
+    args = parser.parse_args()
+
+    # Log SQL dan log per request tidak relevan untuk hasil benchmark
+    logging.disable(logging.INFO)
+
+    try:
+        report = run(args.sizes, args.images, args.queries, args.repeats, args.rounds)
+    finally:
+        shutil.rmtree(APP_DB_DIR, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(output)
+        for row in report["results"]:
+            endpoint = row["endpoint"]
+            endpoint_text = endpoint.get("skipped") or f"p50 {endpoint['p50_ms']} ms"
+            print(
+                f"{row['size']:>8} load p50 {row['gallery_load']['p50_ms']:>9} ms | "
+                f"match p50 {row['matching']['p50_ms']:>7} ms | endpoint {endpoint_text}"
+            )
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Benchmark latensi commit absensi masuk saat halaman laporan sedang dibaca.
+
+Penggunaan:
+    python -m benchmarks.bench_sqlite_profile [--rows 20000] [--readers 2] [--checkins 200] [--json hasil.json]
+
+Untuk setiap profil SQLite (bawaan: rollback journal + synchronous FULL, dan
+profil produksi dari database.SQLITE_PRAGMAS), benchmark membuat database
+sementara berisi riwayat absensi dengan foto, menjalankan beberapa thread
+pembaca yang terus memuat seluruh tabel absensi (seperti admin_laporanabsensi),
+lalu mengukur latensi commit absensi masuk dari thread penulis.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, SQLITE_PRAGMAS, create_db_engine
+from models import Absensi, Karyawan
+
+# Profil pembanding: perilaku SQLite bawaan sebelum profil produksi
+DEFAULT_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+# Ukuran foto sintetis per baris absensi (byte)
+PHOTO_SIZE = 20 * 1024
+
+
+def seed_database(session_factory, rows, employees=50):
+    """
+    Mengisi database dengan karyawan dan riwayat absensi berfoto.
+    """
+    rng = np.random.default_rng(0)
+    photo = rng.integers(0, 256, size=PHOTO_SIZE, dtype=np.uint8).tobytes()
+    start = datetime.now() - timedelta(days=rows // employees + 1)
+
+    db = session_factory()
+    try:
+        for i in range(1, employees + 1):
+            db.add(Karyawan(
+                id=i, nama=f"Karyawan {i}", email=f"karyawan{i}@example.com", no_telepon="0800000000",
+                jabatan="Staf", departemen=f"Departemen {i % 5}", alamat="-"
+            ))
+        db.flush()
+        for i in range(rows):
+            tanggal = start + timedelta(days=i // employees, hours=8)
+            db.add(Absensi(
+                karyawan_id=i % employees + 1, tanggal=tanggal, jam_masuk=tanggal, status="Hadir",
+                foto_masuk=photo
+            ))
+            if i % 1000 == 999:
+                db.commit()
+        db.commit()
+    finally:
+        db.close()
+
+
+def reader_loop(session_factory, stop, counter):
+    # Meniru admin_laporanabsensi: muat seluruh baris absensi beserta fotonya
+    while not stop.is_set():
+        db = session_factory()
+        try:
+            db.query(Absensi).all()
+            counter.append(1)
+        finally:
+            db.close()
+
+
+def measure_profile(name, pragmas, rows, readers, checkins):
+    """
+    Mengukur latensi commit absensi masuk untuk satu profil PRAGMA.
+
+    Returns:
+        dict: Statistik latensi commit dan jumlah pembacaan laporan
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_db_engine(url, pragmas=pragmas, echo=False)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        seed_database(session_factory, rows)
+
+        stop = threading.Event()
+        reads = []
+        threads = [threading.Thread(target=reader_loop, args=(session_factory, stop, reads)) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)  # Biarkan pembaca mulai memindai tabel
+
+        latencies = []
+        errors = 0
+        db = session_factory()
+        try:
+            for i in range(checkins):
+                now = datetime.now()
+                started = time.perf_counter()
+                try:
+                    db.add(Absensi(karyawan_id=i % 50 + 1, tanggal=now, jam_masuk=now, status="Hadir"))
+                    db.commit()
+                    latencies.append(time.perf_counter() - started)
+                except Exception:
+                    db.rollback()
+                    errors += 1
+                time.sleep(0.005)
+        finally:
+            db.close()
+            stop.set()
+            for thread in threads:
+                thread.join()
+            engine.dispose()
+
+    samples = np.asarray(latencies) * 1000.0 if latencies else np.zeros(1)
+    return {
+        "profile": name,
+        "pragmas": pragmas,
+        "checkins": len(latencies),
+        "errors": errors,
+        "report_reads": len(reads),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "max_ms": round(float(samples.max()), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark latensi commit absensi saat laporan dibaca")
+    parser.add_argument("--rows", type=int, default=20000, help="Jumlah baris riwayat absensi")
+    parser.add_argument("--readers", type=int, default=2, help="Jumlah thread pembaca laporan")
+    parser.add_argument("--checkins", type=int, default=200, help="Jumlah commit absensi masuk yang diukur")
+    parser.add_argument("--json", help="Simpan hasil dalam format JSON ke file ini")
+    args = parser.parse_args()
+
+    results = [
+        measure_profile("default", DEFAULT_PRAGMAS, args.rows, args.readers, args.checkins),
+        measure_profile("production", SQLITE_PRAGMAS, args.rows, args.readers, args.checkins),
+    ]
+
+    print(f"{'profil':>10} {'commit':>7} {'error':>6} {'baca':>6} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9}")
+    for row in results:
+        print(
+            f"{row['profile']:>10} {row['checkins']:>7} {row['errors']:>6} {row['report_reads']:>6} "
+            f"{row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['p99_ms']:>9.3f} {row['max_ms']:>9.3f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
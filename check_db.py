@@ -26,7 +26,7 @@ for k in karyawan_list:
     print(f"Alamat: {k.alamat}")
     print(f"Tanggal Bergabung: {k.tanggal_bergabung}")
     print(f"Status: {'Aktif' if k.status else 'Tidak Aktif'}")
-    print(f"Foto: {'Ada' if k.foto else 'Tidak Ada'}")
+    print(f"Foto: {'Ada' if k.foto_hash else 'Tidak Ada'}")
     print("-" * 100)
 
 session.close() 
\ No newline at end of file
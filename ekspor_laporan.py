@@ -0,0 +1,290 @@
+"""
+Ekspor laporan absensi ke CSV dan XLSX secara streaming di server.
+
+Ekspor memakai filter yang sama dengan halaman laporan (laporan.parse_filters dan
+laporan.apply_filters). Baris dibaca dengan Query.yield_per sehingga hanya satu
+batch baris yang berada di memori, lalu langsung ditulis ke response melalui
+generator; pemakaian memori tetap konstan berapa pun panjang rentang tanggalnya.
+Kolom foto tidak pernah dipilih. Absensi yang sudah diarsipkan ikut diekspor.
+
+File XLSX ditulis langsung sebagai arsip zip (tanpa library spreadsheet): isi
+sheet ditulis baris demi baris ke entri zip dan byte yang sudah jadi dikirim ke
+client setiap satu batch. Tata letaknya sama dengan file yang sebelumnya dibuat
+di browser: kop PT MATURA JAYA, tabel absensi dan kolom tanda tangan Manager HRD.
+
+Konfigurasi melalui variabel lingkungan:
+- LAPORAN_EKSPOR_BATCH: jumlah baris yang dibaca per batch (default 1000)
+"""
+
+import csv
+import io
+import os
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from models import Absensi, Karyawan
+import arsip_absensi
+import laporan
+
+# Jumlah baris yang dibaca dari database (dan dikirim ke client) per batch
+LAPORAN_EKSPOR_BATCH = int(os.getenv("LAPORAN_EKSPOR_BATCH", "1000"))
+
+# Format ekspor yang didukung: format -> media type
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Kolom yang dipilih untuk ekspor (tanpa kolom foto maupun hash foto)
+EXPORT_COLUMNS = (
+    Absensi.id,
+    Karyawan.nama,
+    Absensi.tanggal,
+    Absensi.jam_masuk,
+    Absensi.jam_keluar,
+    Absensi.alamat,
+    Absensi.alamat_keluar,
+    Absensi.uang_makan,
+    Absensi.uang_transport,
+)
+
+# Judul kolom tabel beserta lebar kolomnya di XLSX (dalam jumlah karakter)
+HEADERS = [
+    ("No", 5),
+    ("Nama", 20),
+    ("Tanggal", 12),
+    ("Jam Masuk", 12),
+    ("Jam Keluar", 12),
+    ("Lokasi Masuk", 30),
+    ("Lokasi Keluar", 30),
+    ("Uang Makan", 12),
+    ("Uang Transport", 12),
+]
+
+# Karakter yang tidak boleh ada di XML 1.0
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def nama_file(judul, format):
+    """
+    Membuat nama file unduhan dari judul laporan.
+
+    Returns:
+        str: Misalnya laporan_absensi___semua_karyawan.xlsx
+    """
+    return re.sub(r"[^a-z0-9]", "_", judul.lower()) + "." + format
+
+
+def _iter_rows(session_factory, filters):
+    """
+    Membaca baris laporan berfilter per batch dengan yield_per.
+
+    Baris arsip (arsip_absensi.py) dibaca lebih dulu per bulan karena seluruhnya
+    bertanggal sebelum baris di tabel absensi.
+
+    Session dibuka sendiri karena generator ini berjalan setelah endpoint selesai
+    (saat response dikirim), dan ditutup setelah baris terakhir dibaca.
+
+    Yields:
+        Row: Baris berisi EXPORT_COLUMNS, urut tanggal lalu ID
+    """
+    db = session_factory()
+    try:
+        if arsip_absensi.ada_arsip(filters):
+            yield from arsip_absensi.baris_arsip(filters, arsip_absensi.peta_karyawan(db))
+
+        query = laporan.report_query(db, filters, EXPORT_COLUMNS).order_by(
+            Absensi.tanggal.asc(), Absensi.id.asc()
+        ).yield_per(LAPORAN_EKSPOR_BATCH)
+        for row in query:
+            yield row
+    finally:
+        db.close()
+
+
+def _values(nomor, row):
+    # Nilai satu baris tabel sesuai urutan HEADERS
+    return [
+        nomor,
+        row.nama or "",
+        row.tanggal.strftime("%d/%m/%Y") if row.tanggal else "-",
+        row.jam_masuk.strftime("%H:%M:%S") if row.jam_masuk else "-",
+        row.jam_keluar.strftime("%H:%M:%S") if row.jam_keluar else "-",
+        row.alamat or "-",
+        row.alamat_keluar or "-",
+        "Ya" if row.uang_makan else "Tidak",
+        "Ya" if row.uang_transport else "Tidak",
+    ]
+
+
+def iter_csv(session_factory, filters):
+    """
+    Menghasilkan isi file CSV laporan absensi per batch.
+
+    Args:
+        session_factory (callable): Pembuat Session database (SessionLocal)
+        filters (dict): Hasil laporan.parse_filters
+
+    Yields:
+        bytes: Potongan file CSV (UTF-8 dengan BOM agar terbaca benar di Excel)
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in HEADERS])
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+
+    for nomor, row in enumerate(_iter_rows(session_factory, filters), start=1):
+        writer.writerow(_values(nomor, row))
+        if nomor % LAPORAN_EKSPOR_BATCH == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkBuffer:
+    """
+    File tujuan ZipFile yang hanya bisa ditulis; byte yang ditulis diambil dengan drain().
+
+    Karena tidak mendukung seek, ZipFile menulis ukuran setiap entri setelah isinya
+    (data descriptor) sehingga arsip dapat dikirim sambil ditulis.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _column_name(index):
+    # 0 -> A, 1 -> B, ... (cukup untuk jumlah kolom laporan)
+    return chr(ord("A") + index)
+
+
+def _cell(column, row_number, value):
+    ref = f"{_column_name(column)}{row_number}"
+    if isinstance(value, int):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    text = escape(_INVALID_XML_CHARS.sub("", str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row(row_number, values):
+    cells = "".join(_cell(column, row_number, value) for column, value in enumerate(values) if value != "")
+    return f'<row r="{row_number}">{cells}</row>'.encode("utf-8")
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Laporan Absensi" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def iter_xlsx(session_factory, filters, judul):
+    """
+    Menghasilkan isi file XLSX laporan absensi per batch.
+
+    Args:
+        session_factory (callable): Pembuat Session database (SessionLocal)
+        filters (dict): Hasil laporan.parse_filters
+        judul (str): Judul laporan yang ditulis di kop
+
+    Yields:
+        bytes: Potongan arsip XLSX
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+
+        # force_zip64 karena ukuran sheet belum diketahui saat entri dibuka
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            widths = "".join(
+                f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+                for i, (_, width) in enumerate(HEADERS, start=1)
+            )
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f'<cols>{widths}</cols><sheetData>'
+            ).encode("utf-8"))
+
+            # Kop laporan, satu baris kosong, lalu judul kolom tabel
+            dicetak = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+            kop = ["PT MATURA JAYA", "Laporan Absensi Karyawan", judul, f"Dicetak pada: {dicetak}"]
+            for row_number, text in enumerate(kop, start=1):
+                sheet.write(_row(row_number, [text]))
+            row_number = len(kop) + 2
+            sheet.write(_row(row_number, [header for header, _ in HEADERS]))
+            yield buffer.drain()
+
+            for nomor, row in enumerate(_iter_rows(session_factory, filters), start=1):
+                row_number += 1
+                sheet.write(_row(row_number, _values(nomor, row)))
+                if nomor % LAPORAN_EKSPOR_BATCH == 0:
+                    yield buffer.drain()
+
+            # Kolom tanda tangan setelah satu baris kosong
+            for offset, text in ((2, "Mengetahui,"), (3, "Manager HRD"), (6, "_________________")):
+                sheet.write(_row(row_number + offset, [text]))
+            sheet.write(b"</sheetData></worksheet>")
+
+    yield buffer.drain()
+
+
+def iter_export(session_factory, filters, format, judul):
+    """
+    Memilih generator ekspor sesuai format.
+
+    Raises:
+        ValueError: Jika format tidak didukung
+    """
+    if format == "csv":
+        return iter_csv(session_factory, filters)
+    if format == "xlsx":
+        return iter_xlsx(session_factory, filters, judul)
+    raise ValueError("Format ekspor harus csv atau xlsx")
@@ -0,0 +1,144 @@
+"""
+Micro-batching encoding wajah lintas request yang datang bersamaan.
+
+Saat jam masuk, puluhan kiosk mengirim foto login hampir bersamaan. Alih-alih
+mengirim satu pekerjaan ke pool worker per foto, FaceBatcher menampung foto yang
+datang dalam jendela waktu singkat (atau sampai ukuran batch maksimum tercapai),
+mengirimnya sebagai satu pekerjaan batch (deteksi CNN dlib dijalankan per batch
+gambar berukuran sama), lalu mengembalikan hasil masing-masing ke pemanggilnya.
+
+Batcher berjalan di event loop asyncio sehingga tidak memerlukan lock. Foto hanya
+digabung dengan foto lain yang memakai strategi deteksi dan upsample yang sama.
+
+Konfigurasi melalui variabel lingkungan:
+- FACE_BATCH_WINDOW_MS: lama jendela pengumpulan dalam milidetik (default 5, 0 menonaktifkan batching)
+- FACE_BATCH_MAX_SIZE: ukuran batch maksimum (default 8, 1 menonaktifkan batching)
+"""
+
+import asyncio
+import logging
+import os
+from collections import Counter
+
+from face_detection import FACE_DETECTION_STRATEGY
+from face_worker_pool import face_worker_pool
+
+logger = logging.getLogger(__name__)
+
+# Lama jendela pengumpulan request sebelum batch dikirim (milidetik)
+FACE_BATCH_WINDOW_MS = float(os.getenv("FACE_BATCH_WINDOW_MS", "5"))
+# Jumlah foto maksimum dalam satu batch
+FACE_BATCH_MAX_SIZE = int(os.getenv("FACE_BATCH_MAX_SIZE", "8"))
+
+
+class FaceBatcher:
+    """
+    Pengumpul request encoding wajah menjadi batch untuk pool worker.
+
+    Attributes:
+        pool (FaceWorkerPool): Pool worker yang menjalankan batch
+        window_ms (float): Lama jendela pengumpulan (milidetik)
+        max_batch (int): Ukuran batch maksimum
+    """
+
+    def __init__(self, pool, window_ms=FACE_BATCH_WINDOW_MS, max_batch=FACE_BATCH_MAX_SIZE):
+        self.pool = pool
+        self.window_ms = window_ms
+        self.max_batch = max(1, max_batch)
+        self._pending = {}  # Peta (strategi, upsample) -> daftar (gambar, future)
+        self._timers = {}  # Peta (strategi, upsample) -> timer flush jendela
+        self._batches = 0
+        self._items = 0
+        self._full_flushes = 0
+        self._sizes = Counter()
+
+    @property
+    def enabled(self):
+        return self.window_ms > 0 and self.max_batch > 1
+
+    async def encode_faces(self, rgb_img, strategy=None, upsample=1):
+        """
+        Mendeteksi dan menghitung encoding wajah melalui batch bersama.
+
+        Args:
+            rgb_img (numpy.ndarray): Gambar RGB
+            strategy (str, optional): Strategi deteksi (lihat face_detection.py)
+            upsample (int): Jumlah upsample gambar sebelum deteksi
+
+        Returns:
+            tuple: (face_locations, encodings, timings) untuk gambar ini
+
+        Raises:
+            FaceWorkerError: Jika pool worker menolak atau gagal menjalankan batch
+        """
+        if not self.enabled:
+            return await self.pool.encode_faces(rgb_img, strategy=strategy, upsample=upsample)
+
+        loop = asyncio.get_running_loop()
+        key = ((strategy or FACE_DETECTION_STRATEGY).lower(), upsample)
+        future = loop.create_future()
+        queue = self._pending.setdefault(key, [])
+        queue.append((rgb_img, future))
+
+        if len(queue) >= self.max_batch:
+            self._full_flushes += 1
+            self._flush(key)
+        elif len(queue) == 1:
+            # Request pertama membuka jendela pengumpulan
+            self._timers[key] = loop.call_later(self.window_ms / 1000.0, self._flush, key)
+
+        return await future
+
+    def stats(self):
+        """
+        Mendapatkan metrik batching.
+
+        Returns:
+            dict: Jumlah batch dan foto, rata-rata ukuran batch, tingkat pengisian
+                  batch (rata-rata ukuran dibagi ukuran maksimum), jumlah batch yang
+                  dikirim karena penuh, dan distribusi ukuran batch
+        """
+        mean_size = self._items / self._batches if self._batches else 0.0
+        return {
+            "window_ms": self.window_ms,
+            "max_batch": self.max_batch,
+            "batches": self._batches,
+            "items": self._items,
+            "mean_batch_size": round(mean_size, 2),
+            "fill_rate": round(mean_size / self.max_batch, 3),
+            "full_flushes": self._full_flushes,
+            "batch_sizes": dict(sorted(self._sizes.items())),
+        }
+
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(key, None)
+        if not items:
+            return
+
+        self._batches += 1
+        self._items += len(items)
+        self._sizes[len(items)] += 1
+        asyncio.ensure_future(self._run_batch(key, items))
+
+    async def _run_batch(self, key, items):
+        strategy, upsample = key
+        try:
+            results = await self.pool.encode_faces_batch([image for image, _ in items], strategy=strategy, upsample=upsample)
+        except Exception as e:
+            # Kegagalan batch (antrean penuh, timeout, pool rusak) diteruskan ke setiap pemanggil
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(items, results):
+            # Pemanggil yang sudah membatalkan request (misalnya koneksi terputus) dilewati
+            if not future.done():
+                future.set_result(result)
+
+
+# Batcher encoding wajah untuk endpoint login
+face_batcher = FaceBatcher(face_worker_pool)
@@ -0,0 +1,209 @@
+"""
+Strategi deteksi wajah untuk login dan verifikasi wajah.
+
+Strategi yang tersedia:
+- "cnn": detektor CNN dlib pada frame penuh (paling akurat, paling mahal di CPU)
+- "hog": detektor HOG dlib pada frame penuh (cepat, kurang toleran terhadap pose)
+- "cascade": dua tahap. Detektor murah (Haar cascade OpenCV atau HOG) dijalankan
+  pada frame yang diperkecil untuk mengusulkan area wajah, lalu detektor CNN hanya
+  dijalankan pada potongan area tersebut (dengan padding) dalam resolusi penuh.
+  Jika tahap pertama tidak menemukan wajah atau CNN tidak menemukan wajah di
+  potongan, CNN dijalankan pada frame penuh sebagai fallback.
+
+Setiap pemanggilan mengembalikan waktu per tahap (milidetik) agar biaya deteksi
+dapat dipantau di log.
+
+Konfigurasi melalui variabel lingkungan:
+- FACE_DETECTION_STRATEGY: "cnn" (default), "hog", atau "cascade"
+- FACE_COARSE_DETECTOR: detektor tahap pertama strategi cascade, "haar" (default) atau "hog"
+- FACE_COARSE_WIDTH: lebar frame tahap pertama dalam piksel (default 320)
+- FACE_CROP_PADDING: padding potongan relatif terhadap ukuran area wajah (default 0.5)
+"""
+
+import os
+import time
+
+import cv2
+import numpy as np
+
+# Strategi deteksi wajah yang didukung
+STRATEGIES = ("cnn", "hog", "cascade")
+
+# Strategi default untuk endpoint login dan verifikasi wajah
+FACE_DETECTION_STRATEGY = os.getenv("FACE_DETECTION_STRATEGY", "cnn").lower()
+# Detektor tahap pertama strategi cascade
+FACE_COARSE_DETECTOR = os.getenv("FACE_COARSE_DETECTOR", "haar").lower()
+# Lebar frame yang diperkecil untuk tahap pertama
+FACE_COARSE_WIDTH = int(os.getenv("FACE_COARSE_WIDTH", "320"))
+# Padding potongan di setiap sisi, relatif terhadap lebar/tinggi area wajah
+FACE_CROP_PADDING = float(os.getenv("FACE_CROP_PADDING", "0.5"))
+
+# Haar cascade dimuat sekali per proses saat pertama dibutuhkan
+_haar_cascade = None
+
+
+def _elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000.0, 2)
+
+
+def _get_haar_cascade():
+    global _haar_cascade
+    if _haar_cascade is None:
+        # Classifier yang sama dengan face_training.py
+        _haar_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    return _haar_cascade
+
+
+def coarse_regions(rgb_img, detector=None, width=None):
+    """
+    Mengusulkan area wajah dengan detektor murah pada frame yang diperkecil.
+
+    Args:
+        rgb_img (numpy.ndarray): Gambar RGB resolusi penuh
+        detector (str, optional): "haar" atau "hog", default FACE_COARSE_DETECTOR
+        width (int, optional): Lebar frame yang diperkecil, default FACE_COARSE_WIDTH
+
+    Returns:
+        list: Area wajah (top, right, bottom, left) dalam koordinat gambar penuh
+    """
+    detector = detector or FACE_COARSE_DETECTOR
+    width = width or FACE_COARSE_WIDTH
+    full_width = rgb_img.shape[1]
+    scale = min(1.0, width / float(full_width))
+    small = rgb_img if scale == 1.0 else cv2.resize(rgb_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    if detector == "hog":
+        import face_recognition
+
+        boxes = face_recognition.face_locations(small, number_of_times_to_upsample=1, model="hog")
+    else:
+        gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+        faces = _get_haar_cascade().detectMultiScale(gray, 1.1, 5, minSize=(24, 24))
+        boxes = [(y, x + w, y + h, x) for (x, y, w, h) in faces]
+
+    return [
+        (int(top / scale), int(right / scale), int(bottom / scale), int(left / scale))
+        for top, right, bottom, left in boxes
+    ]
+
+
+def padded_crop_box(regions, image_shape, padding=None):
+    """
+    Menghitung satu kotak potongan yang mencakup semua area wajah beserta padding.
+
+    Args:
+        regions (list): Area wajah (top, right, bottom, left)
+        image_shape (tuple): Shape gambar penuh
+        padding (float, optional): Padding relatif terhadap ukuran area gabungan, default FACE_CROP_PADDING
+
+    Returns:
+        tuple: Kotak potongan (top, right, bottom, left) yang sudah dibatasi ke ukuran gambar
+    """
+    padding = FACE_CROP_PADDING if padding is None else padding
+    height, width = image_shape[:2]
+    top = min(r[0] for r in regions)
+    right = max(r[1] for r in regions)
+    bottom = max(r[2] for r in regions)
+    left = min(r[3] for r in regions)
+    pad_y = int((bottom - top) * padding)
+    pad_x = int((right - left) * padding)
+    return (
+        max(0, top - pad_y),
+        min(width, right + pad_x),
+        min(height, bottom + pad_y),
+        max(0, left - pad_x),
+    )
+
+
+def detect_faces(rgb_img, strategy=None, upsample=1):
+    """
+    Mendeteksi lokasi wajah dengan strategi yang dipilih.
+
+    Args:
+        rgb_img (numpy.ndarray): Gambar RGB
+        strategy (str, optional): "cnn", "hog", atau "cascade"; default FACE_DETECTION_STRATEGY
+        upsample (int): Jumlah upsample gambar sebelum deteksi oleh dlib
+
+    Returns:
+        tuple: (face_locations, timings) di mana face_locations adalah daftar
+               (top, right, bottom, left) dalam koordinat gambar penuh dan timings
+               adalah dict waktu per tahap dalam milidetik
+
+    Raises:
+        ValueError: Jika strategi tidak dikenal
+    """
+    import face_recognition
+
+    strategy = (strategy or FACE_DETECTION_STRATEGY).lower()
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Strategi deteksi wajah tidak dikenal: {strategy}")
+
+    timings = {}
+    if strategy in ("cnn", "hog"):
+        started = time.perf_counter()
+        face_locations = face_recognition.face_locations(rgb_img, number_of_times_to_upsample=upsample, model=strategy)
+        timings[strategy] = _elapsed_ms(started)
+        return face_locations, timings
+
+    # Tahap 1: usulan area wajah dari detektor murah pada frame yang diperkecil
+    started = time.perf_counter()
+    regions = coarse_regions(rgb_img)
+    timings["coarse"] = _elapsed_ms(started)
+
+    if regions:
+        # Tahap 2: CNN hanya pada potongan area wajah dalam resolusi penuh
+        started = time.perf_counter()
+        top, right, bottom, left = padded_crop_box(regions, rgb_img.shape)
+        crop = np.ascontiguousarray(rgb_img[top:bottom, left:right])
+        crop_locations = face_recognition.face_locations(crop, number_of_times_to_upsample=upsample, model="cnn")
+        timings["cnn_crop"] = _elapsed_ms(started)
+        if crop_locations:
+            # Kembalikan lokasi ke koordinat gambar penuh
+            face_locations = [(t + top, r + left, b + top, l + left) for t, r, b, l in crop_locations]
+            return face_locations, timings
+
+    # Fallback: CNN pada frame penuh
+    started = time.perf_counter()
+    face_locations = face_recognition.face_locations(rgb_img, number_of_times_to_upsample=upsample, model="cnn")
+    timings["cnn_full"] = _elapsed_ms(started)
+    return face_locations, timings
+
+
+def batch_detect_faces(images, strategy=None, upsample=1):
+    """
+    Mendeteksi lokasi wajah pada beberapa gambar sekaligus.
+
+    Untuk strategi "cnn", gambar dikelompokkan berdasarkan ukuran dan setiap kelompok
+    dideteksi dengan satu panggilan batch_face_locations (detektor CNN dlib memproses
+    satu batch gambar berukuran sama). Strategi lain diproses per gambar karena
+    potongan tahap kedua strategi cascade memiliki ukuran yang berbeda-beda.
+
+    Args:
+        images (list): Daftar gambar RGB
+        strategy (str, optional): "cnn", "hog", atau "cascade"; default FACE_DETECTION_STRATEGY
+        upsample (int): Jumlah upsample gambar sebelum deteksi oleh dlib
+
+    Returns:
+        list: Tuple (face_locations, timings) untuk setiap gambar, urutan sama dengan images
+    """
+    import face_recognition
+
+    strategy = (strategy or FACE_DETECTION_STRATEGY).lower()
+    if strategy != "cnn" or len(images) == 1:
+        return [detect_faces(image, strategy=strategy, upsample=upsample) for image in images]
+
+    groups = {}
+    for i, image in enumerate(images):
+        groups.setdefault(image.shape, []).append(i)
+
+    results = [None] * len(images)
+    for indices in groups.values():
+        started = time.perf_counter()
+        batch_locations = face_recognition.batch_face_locations(
+            [images[i] for i in indices], number_of_times_to_upsample=upsample, batch_size=len(indices)
+        )
+        elapsed = _elapsed_ms(started)
+        for i, face_locations in zip(indices, batch_locations):
+            # Waktu batch dicatat untuk setiap gambar beserta ukuran batch-nya
+            results[i] = (face_locations, {"cnn_batch": elapsed, "batch_size": len(indices)})
+    return results
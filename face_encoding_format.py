@@ -0,0 +1,148 @@
+"""
+Format biner berversi untuk menyimpan encoding wajah di kolom face_encoding.encoding.
+
+Setiap record berukuran tetap: header 8 byte diikuti payload 128 float32 little-endian.
+
+    offset  ukuran  isi
+    0       2       magic b"FE"
+    2       1       versi format (1)
+    3       1       kode dtype payload (1 = float32 little-endian)
+    4       2       dimensi encoding (uint16, 128)
+    6       2       cadangan (0)
+    8       512     payload 128 x float32
+
+Karena ukuran record tetap, banyak record yang digabung dapat dibaca sekaligus
+dengan satu np.frombuffer tanpa parsing per baris. Modul ini juga tetap dapat
+membaca format lama: string JSON (FaceEncoding.set_encoding_array versi lama)
+dan bytes float64 mentah (face_training.py versi lama).
+"""
+
+import json
+import struct
+
+import numpy as np
+
+# Dimensi encoding wajah yang dihasilkan oleh face_recognition (dlib ResNet)
+ENCODING_DIM = 128
+
+MAGIC = b"FE"  # Penanda format biner encoding wajah
+VERSION = 1  # Versi format saat ini
+DTYPE_FLOAT32 = 1  # Kode dtype payload float32 little-endian
+
+# Struktur header: magic, versi, kode dtype, dimensi, cadangan
+_HEADER = struct.Struct("<2sBBHH")
+HEADER_SIZE = _HEADER.size
+PAYLOAD_DTYPE = np.dtype("<f4")
+RECORD_SIZE = HEADER_SIZE + ENCODING_DIM * PAYLOAD_DTYPE.itemsize
+
+# Header yang diharapkan untuk setiap record versi saat ini
+HEADER_BYTES = _HEADER.pack(MAGIC, VERSION, DTYPE_FLOAT32, ENCODING_DIM, 0)
+
+# Ukuran format lama bytes float64 mentah
+_LEGACY_RAW_SIZE = ENCODING_DIM * 8
+
+
+def encode(encoding):
+    """
+    Mengkonversi encoding wajah menjadi record biner berversi.
+
+    Args:
+        encoding (array-like): Encoding wajah dengan 128 elemen
+
+    Returns:
+        bytes: Record biner (header + payload float32)
+
+    Raises:
+        ValueError: Jika dimensi encoding tidak sesuai
+    """
+    vector = np.asarray(encoding, dtype=PAYLOAD_DTYPE).reshape(-1)
+    if vector.shape != (ENCODING_DIM,):
+        raise ValueError(f"Encoding wajah harus berdimensi {ENCODING_DIM}, diterima {vector.shape}")
+    return HEADER_BYTES + vector.tobytes()
+
+
+def is_current(raw):
+    """
+    Memeriksa apakah nilai kolom encoding sudah dalam format biner versi saat ini.
+
+    Args:
+        raw (bytes | str): Nilai kolom encoding
+
+    Returns:
+        bool: True jika nilai sudah dalam format saat ini
+    """
+    return isinstance(raw, (bytes, bytearray, memoryview)) and len(raw) == RECORD_SIZE and bytes(raw[:HEADER_SIZE]) == HEADER_BYTES
+
+
+def decode(raw):
+    """
+    Mengkonversi nilai kolom encoding (format apa pun) menjadi numpy array float32.
+
+    Args:
+        raw (bytes | str): Nilai kolom encoding dalam format biner, JSON, atau float64 mentah
+
+    Returns:
+        numpy.ndarray: Encoding wajah dengan shape (128,)
+
+    Raises:
+        ValueError: Jika format tidak dikenali
+    """
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    raw = bytes(raw)
+
+    if raw[:2] == MAGIC:
+        magic, version, dtype_code, dim, _ = _HEADER.unpack_from(raw)
+        if version != VERSION or dtype_code != DTYPE_FLOAT32 or dim != ENCODING_DIM:
+            raise ValueError(f"Format encoding tidak didukung: versi={version}, dtype={dtype_code}, dim={dim}")
+        return np.frombuffer(raw, dtype=PAYLOAD_DTYPE, count=ENCODING_DIM, offset=HEADER_SIZE)
+
+    if raw[:1] == b"[":
+        # Format lama: string JSON
+        vector = np.asarray(json.loads(raw), dtype=PAYLOAD_DTYPE)
+    elif len(raw) == _LEGACY_RAW_SIZE:
+        # Format lama: bytes float64 mentah dari ndarray.tobytes()
+        vector = np.frombuffer(raw, dtype=np.float64).astype(PAYLOAD_DTYPE)
+    else:
+        raise ValueError(f"Format encoding tidak dikenali (panjang {len(raw)} byte)")
+
+    if vector.shape != (ENCODING_DIM,):
+        raise ValueError(f"Encoding wajah harus berdimensi {ENCODING_DIM}, diterima {vector.shape}")
+    return vector
+
+
+def decode_many(raws):
+    """
+    Mengkonversi banyak nilai kolom encoding menjadi satu matriks float32.
+
+    Jika semua record sudah dalam format saat ini, seluruh record digabung dan
+    dibaca dengan satu np.frombuffer. Record berformat lama didekode satu per satu.
+
+    Args:
+        raws (list): Daftar nilai kolom encoding
+
+    Returns:
+        tuple: (matrix, valid) di mana matrix berbentuk (M, 128) berisi record yang
+               valid dan valid adalah array boolean (N,) penanda record yang berhasil didekode
+    """
+    n = len(raws)
+    if n == 0:
+        return np.empty((0, ENCODING_DIM), dtype=PAYLOAD_DTYPE), np.zeros(0, dtype=bool)
+
+    current = np.fromiter((is_current(raw) for raw in raws), dtype=bool, count=n)
+    if current.all():
+        # Jalur cepat: satu buffer, satu frombuffer, tanpa parsing per baris
+        records = np.frombuffer(b"".join(raws), dtype=np.uint8).reshape(n, RECORD_SIZE)
+        matrix = records[:, HEADER_SIZE:].copy().view(PAYLOAD_DTYPE)
+        return matrix, current
+
+    valid = np.zeros(n, dtype=bool)
+    vectors = []
+    for i, raw in enumerate(raws):
+        try:
+            vectors.append(decode(raw))
+            valid[i] = True
+        except (ValueError, TypeError):
+            continue
+    matrix = np.vstack(vectors) if vectors else np.empty((0, ENCODING_DIM), dtype=PAYLOAD_DTYPE)
+    return matrix, valid
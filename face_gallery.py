@@ -0,0 +1,453 @@
+"""
+Modul galeri wajah in-memory untuk pencocokan login karyawan.
+
+Galeri memuat seluruh encoding wajah dari tabel face_encoding satu kali ke dalam
+satu matriks NumPy yang contiguous (N x 128) beserta kolom ID pemilik (karyawan)
+dan ID template. Seorang karyawan dapat memiliki beberapa template wajah
+(misalnya dengan kacamata, masker, atau pencahayaan berbeda). Setiap login cukup
+menghitung jarak ke seluruh galeri dengan satu operasi vektor, mereduksi jarak
+minimum per karyawan, lalu mengambil argmin, tanpa query per karyawan dan tanpa
+parsing JSON per request.
+
+Perubahan data wajah (tambah karyawan, update foto, hapus karyawan) diterapkan
+secara inkremental melalui FaceGalleryService tanpa memuat ulang seluruh galeri.
+"""
+
+import logging
+import threading
+
+import numpy as np
+
+import face_encoding_format
+from face_encoding_format import ENCODING_DIM
+from models import FaceEncoding
+
+logger = logging.getLogger(__name__)
+
+# Tipe data matriks galeri, sama dengan payload format biner encoding wajah
+GALLERY_DTYPE = np.float32
+
+# Toleransi jarak wajah untuk login karyawan
+# Nilai default face_recognition adalah 0.6, semakin tinggi semakin toleran
+FACE_MATCH_TOLERANCE = 0.7
+
+# Jumlah maksimum template wajah per karyawan
+# Jika batas tercapai, template terlama diganti dengan template baru
+MAX_TEMPLATES_PER_KARYAWAN = 5
+
+
+class FaceGallery:
+    """
+    Snapshot galeri encoding wajah yang tidak berubah (read-only).
+
+    Snapshot hanya berisi view ke buffer milik FaceGalleryService. Penulis tidak
+    pernah mengubah baris yang sudah terlihat oleh snapshot yang dipublikasikan,
+    sehingga pembaca dapat memakai snapshot tanpa lock.
+
+    Attributes:
+        owner_ids (numpy.ndarray): ID karyawan pemilik setiap baris, -1 untuk baris yang dihapus
+        template_ids (numpy.ndarray): ID baris face_encoding untuk setiap baris
+        matrix (numpy.ndarray): Matriks encoding wajah dengan shape (N, 128)
+        sq_norms (numpy.ndarray): Kuadrat norma setiap baris, inf untuk baris yang dihapus
+        generation (int): Nomor generasi galeri saat snapshot dibuat
+        size (int): Jumlah template yang masih aktif
+    """
+
+    def __init__(self, owner_ids, matrix, template_ids=None, sq_norms=None, generation=0, size=None):
+        """
+        Inisialisasi snapshot galeri.
+
+        Args:
+            owner_ids (array-like): ID karyawan pemilik setiap baris matriks
+            matrix (array-like): Matriks encoding wajah dengan shape (N, 128)
+            template_ids (array-like, optional): ID template setiap baris, default nomor baris
+            sq_norms (array-like, optional): Kuadrat norma baris, dihitung jika tidak diberikan
+            generation (int): Nomor generasi galeri
+            size (int, optional): Jumlah baris aktif, default semua baris
+        """
+        self.owner_ids = np.asarray(owner_ids, dtype=np.int64)
+        self.matrix = np.asarray(matrix, dtype=GALLERY_DTYPE).reshape(-1, ENCODING_DIM)
+        if template_ids is None:
+            template_ids = np.arange(len(self.owner_ids), dtype=np.int64)
+        self.template_ids = np.asarray(template_ids, dtype=np.int64)
+        if sq_norms is None:
+            # Kuadrat norma dihitung sekali agar jarak per login cukup satu perkalian matriks-vektor
+            sq_norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+        self.sq_norms = sq_norms
+        self.generation = generation
+        self.size = len(self.owner_ids) if size is None else size
+        self._segments = None  # Pengelompokan baris per pemilik, dihitung saat pertama dibutuhkan
+
+    def __len__(self):
+        return self.size
+
+    def distances(self, encoding):
+        """
+        Menghitung jarak Euclidean dari encoding ke seluruh galeri secara vektor.
+
+        Menggunakan identitas |a - b|^2 = |a|^2 - 2ab + |b|^2 sehingga hanya
+        membutuhkan satu perkalian matriks-vektor. Baris yang dihapus bernilai inf.
+
+        Args:
+            encoding (numpy.ndarray): Encoding wajah yang akan dicocokkan
+
+        Returns:
+            numpy.ndarray: Jarak ke setiap baris galeri, shape (N,)
+        """
+        query = np.asarray(encoding, dtype=GALLERY_DTYPE)
+        sq = self.sq_norms - 2.0 * (self.matrix @ query) + query @ query
+        # Koreksi nilai negatif kecil akibat pembulatan floating point
+        np.maximum(sq, 0.0, out=sq)
+        return np.sqrt(sq)
+
+    def _owner_segments(self):
+        # Urutkan baris berdasarkan pemilik sekali per snapshot, sehingga reduksi
+        # minimum per pemilik cukup satu np.minimum.reduceat per login
+        if self._segments is None:
+            alive = np.flatnonzero(self.owner_ids >= 0)
+            order = alive[np.argsort(self.owner_ids[alive], kind="stable")]
+            sorted_owners = self.owner_ids[order]
+            if len(order):
+                starts = np.flatnonzero(np.r_[True, sorted_owners[1:] != sorted_owners[:-1]])
+            else:
+                starts = np.empty(0, dtype=np.int64)
+            self._segments = (order, starts, sorted_owners[starts])
+        return self._segments
+
+    def owner_distances(self, encoding):
+        """
+        Menghitung jarak minimum per karyawan ke seluruh template miliknya.
+
+        Args:
+            encoding (numpy.ndarray): Encoding wajah yang akan dicocokkan
+
+        Returns:
+            tuple: (owner_ids, distances) di mana distances[i] adalah jarak terdekat
+                   dari encoding ke salah satu template milik owner_ids[i]
+        """
+        order, starts, owners = self._owner_segments()
+        if len(owners) == 0:
+            return owners, np.empty(0, dtype=GALLERY_DTYPE)
+        distances = self.distances(encoding)
+        return owners, np.minimum.reduceat(distances[order], starts)
+
+    def match(self, encoding, tolerance=FACE_MATCH_TOLERANCE):
+        """
+        Mencari karyawan dengan template wajah terdekat.
+
+        Args:
+            encoding (numpy.ndarray): Encoding wajah yang akan dicocokkan
+            tolerance (float): Jarak maksimum agar dianggap cocok
+
+        Returns:
+            tuple: (karyawan_id, jarak) untuk kecocokan terbaik. karyawan_id bernilai
+                   None jika galeri kosong atau jarak terbaik di atas toleransi.
+        """
+        owners, distances = self.owner_distances(encoding)
+        if len(owners) == 0:
+            return None, None
+
+        best = int(np.argmin(distances))
+        best_distance = float(distances[best])
+        if best_distance > tolerance:
+            return None, best_distance
+        return int(owners[best]), best_distance
+
+
+class FaceGalleryService:
+    """
+    Pemilik galeri wajah in-process dengan operasi tambah, ganti, dan hapus inkremental.
+
+    Encoding disimpan dalam buffer berkapasitas (seperti list Python) sehingga
+    penambahan cukup menulis satu baris di belakang baris yang sudah dipublikasikan.
+    Penghapusan menandai baris sebagai mati (owner_ids = -1, sq_norms = inf) pada
+    salinan array 1-D, bukan matriks 128 kolom. Setiap perubahan mempublikasikan
+    snapshot baru dengan generasi yang bertambah; pembaca cukup mengambil referensi
+    snapshot tanpa lock. Hanya penulis yang memakai lock.
+
+    Galeri ini bersifat per proses: setiap worker uvicorn memiliki galerinya sendiri.
+
+    Attributes:
+        generation (int): Nomor generasi snapshot yang sedang aktif
+    """
+
+    # Kapasitas awal buffer galeri
+    INITIAL_CAPACITY = 64
+    # Proporsi baris mati yang memicu pemadatan ulang buffer
+    COMPACT_RATIO = 0.25
+
+    def __init__(self):
+        self._lock = threading.Lock()  # Hanya untuk penulis
+        self._snapshot = None  # Snapshot aktif, None jika belum dimuat
+        self._matrix = None  # Buffer encoding (capacity x 128)
+        self._sq_norms = None  # Buffer kuadrat norma (capacity,)
+        self._owner_ids = None  # Buffer ID karyawan pemilik (capacity,)
+        self._template_ids = None  # Buffer ID template face_encoding (capacity,)
+        self._count = 0  # Jumlah baris terpakai (termasuk baris mati)
+        self._dead = 0  # Jumlah baris mati
+        self._rows = {}  # Peta template_id -> indeks baris
+        self._owner_templates = {}  # Peta karyawan_id -> set template_id
+        self._generation = 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    @property
+    def loaded(self):
+        return self._snapshot is not None
+
+    def snapshot(self, db=None):
+        """
+        Mendapatkan snapshot galeri yang konsisten, memuatnya dari database jika belum ada.
+
+        Args:
+            db (Session, optional): Session database untuk pemuatan pertama
+
+        Returns:
+            FaceGallery: Snapshot galeri aktif
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            if db is None:
+                raise RuntimeError("Galeri wajah belum dimuat dan tidak ada session database")
+            snapshot = self.reload(db)
+        return snapshot
+
+    def reload(self, db):
+        """
+        Memuat ulang seluruh galeri dari tabel face_encoding dalam satu query.
+
+        Args:
+            db (Session): Session database
+
+        Returns:
+            FaceGallery: Snapshot galeri yang baru dimuat
+        """
+        rows = db.query(FaceEncoding.id, FaceEncoding.karyawan_id, FaceEncoding.encoding).filter(
+            FaceEncoding.karyawan_id.isnot(None)  # Abaikan encoding yatim dari karyawan yang sudah dihapus
+        ).all()
+
+        # Semua record digabung dan dibaca dengan satu np.frombuffer
+        matrix, valid = face_encoding_format.decode_many([raw for _, _, raw in rows])
+        template_ids = [template_id for (template_id, _, _), ok in zip(rows, valid) if ok]
+        owner_ids = [karyawan_id for (_, karyawan_id, _), ok in zip(rows, valid) if ok]
+        if not valid.all():
+            logger.error(f"{int((~valid).sum())} encoding wajah tidak valid dilewati saat memuat galeri")
+
+        with self._lock:
+            self._reset(owner_ids, template_ids, matrix)
+            snapshot = self._publish()
+        logger.info(f"Galeri wajah dimuat: {len(template_ids)} template dari {len(set(owner_ids))} karyawan (generasi {snapshot.generation})")
+        return snapshot
+
+    def add(self, karyawan_id, template_id, encoding):
+        """
+        Menambahkan template wajah karyawan ke galeri.
+
+        Jika template_id sudah ada di galeri (template yang didaur ulang karena batas
+        template tercapai), baris lama diganti. Tidak melakukan apa-apa jika galeri
+        belum dimuat (pemuatan pertama akan membaca data terbaru dari database).
+
+        Args:
+            karyawan_id (int): ID karyawan pemilik template
+            template_id (int): ID baris face_encoding
+            encoding (numpy.ndarray): Encoding wajah
+        """
+        vector = self._validate(encoding)
+        with self._lock:
+            if self._snapshot is None:
+                return
+            self._kill_row(template_id)
+            self._append_row(karyawan_id, template_id, vector)
+            self._publish()
+
+    def replace(self, karyawan_id, templates):
+        """
+        Mengganti seluruh template wajah karyawan di galeri.
+
+        Args:
+            karyawan_id (int): ID karyawan
+            templates (list): Daftar tuple (template_id, encoding) yang baru
+        """
+        vectors = [(template_id, self._validate(encoding)) for template_id, encoding in templates]
+        with self._lock:
+            if self._snapshot is None:
+                return
+            for template_id in list(self._owner_templates.get(int(karyawan_id), ())):
+                self._kill_row(template_id)
+            for template_id, vector in vectors:
+                self._kill_row(template_id)
+                self._append_row(karyawan_id, template_id, vector)
+            self._publish()
+
+    def remove(self, karyawan_id):
+        """
+        Menghapus seluruh template wajah karyawan dari galeri.
+
+        Args:
+            karyawan_id (int): ID karyawan
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return
+            template_ids = list(self._owner_templates.get(int(karyawan_id), ()))
+            for template_id in template_ids:
+                self._kill_row(template_id)
+            if template_ids:
+                self._publish()
+
+    def remove_template(self, template_id):
+        """
+        Menghapus satu template wajah dari galeri.
+
+        Args:
+            template_id (int): ID baris face_encoding
+        """
+        with self._lock:
+            if self._snapshot is None:
+                return
+            if self._kill_row(template_id):
+                self._publish()
+
+    def _validate(self, encoding):
+        vector = np.asarray(encoding, dtype=GALLERY_DTYPE).reshape(-1)
+        if vector.shape != (ENCODING_DIM,):
+            raise ValueError(f"Encoding wajah harus berdimensi {ENCODING_DIM}, diterima {vector.shape}")
+        return vector
+
+    def _reset(self, owner_ids, template_ids, vectors, capacity=None):
+        # Bangun buffer baru dari awal dengan ruang kosong untuk penambahan berikutnya
+        n = len(template_ids)
+        capacity = max(self.INITIAL_CAPACITY, 2 * n, capacity or 0)
+        self._matrix = np.zeros((capacity, ENCODING_DIM), dtype=GALLERY_DTYPE)
+        self._sq_norms = np.full(capacity, np.inf, dtype=GALLERY_DTYPE)
+        self._owner_ids = np.full(capacity, -1, dtype=np.int64)
+        self._template_ids = np.full(capacity, -1, dtype=np.int64)
+        if n:
+            self._matrix[:n] = vectors
+            self._sq_norms[:n] = np.einsum("ij,ij->i", self._matrix[:n], self._matrix[:n])
+            self._owner_ids[:n] = owner_ids
+            self._template_ids[:n] = template_ids
+        self._count = n
+        self._dead = 0
+        self._rows = {}
+        self._owner_templates = {}
+        for row, (owner_id, template_id) in enumerate(zip(owner_ids, template_ids)):
+            self._rows[int(template_id)] = row
+            self._owner_templates.setdefault(int(owner_id), set()).add(int(template_id))
+
+    def _append_row(self, karyawan_id, template_id, vector):
+        if self._count == len(self._owner_ids):
+            # Buffer penuh: padatkan baris mati sekaligus menggandakan kapasitas
+            self._compact(grow=True)
+        row = self._count
+        # Baris ini berada di luar view semua snapshot yang sudah dipublikasikan
+        self._matrix[row] = vector
+        self._sq_norms[row] = vector @ vector
+        self._owner_ids[row] = karyawan_id
+        self._template_ids[row] = template_id
+        self._rows[int(template_id)] = row
+        self._owner_templates.setdefault(int(karyawan_id), set()).add(int(template_id))
+        self._count += 1
+
+    def _kill_row(self, template_id):
+        row = self._rows.pop(int(template_id), None)
+        if row is None:
+            return False
+        owner_id = int(self._owner_ids[row])
+        templates = self._owner_templates.get(owner_id)
+        if templates is not None:
+            templates.discard(int(template_id))
+            if not templates:
+                del self._owner_templates[owner_id]
+        # Salin array 1-D agar snapshot lama yang sedang dibaca tidak ikut berubah
+        self._owner_ids = self._owner_ids.copy()
+        self._sq_norms = self._sq_norms.copy()
+        self._owner_ids[row] = -1
+        self._sq_norms[row] = np.inf
+        self._dead += 1
+        if self._dead > self.COMPACT_RATIO * self._count:
+            self._compact(grow=False)
+        return True
+
+    def _compact(self, grow):
+        # Buffer baru dibuat sehingga snapshot lama tetap memegang buffer lamanya
+        alive = self._owner_ids[:self._count] >= 0
+        owner_ids = self._owner_ids[:self._count][alive].tolist()
+        template_ids = self._template_ids[:self._count][alive].tolist()
+        vectors = self._matrix[:self._count][alive]
+        capacity = len(self._owner_ids) * 2 if grow else None
+        self._reset(owner_ids, template_ids, vectors, capacity=capacity)
+
+    def _publish(self):
+        self._generation += 1
+        n = self._count
+        snapshot = FaceGallery(
+            self._owner_ids[:n],
+            self._matrix[:n],
+            template_ids=self._template_ids[:n],
+            sq_norms=self._sq_norms[:n],
+            generation=self._generation,
+            size=n - self._dead,
+        )
+        # Penggantian referensi bersifat atomik sehingga pembaca selalu melihat snapshot utuh
+        self._snapshot = snapshot
+        return snapshot
+
+
+# Galeri wajah in-process yang dipakai oleh seluruh endpoint
+face_gallery_service = FaceGalleryService()
+
+
+def get_gallery(db):
+    """
+    Mendapatkan snapshot galeri wajah aktif, memuatnya dari database jika belum ada.
+
+    Args:
+        db (Session): Session database yang digunakan saat pemuatan pertama
+
+    Returns:
+        FaceGallery: Snapshot galeri wajah aktif
+    """
+    return face_gallery_service.snapshot(db)
+
+
+def save_face_template(db, karyawan_id, encoding, max_templates=MAX_TEMPLATES_PER_KARYAWAN):
+    """
+    Menyimpan template wajah baru untuk karyawan dengan batas jumlah template.
+
+    Jika karyawan sudah memiliki max_templates template, baris template yang paling
+    lama diperbarui ditimpa dengan encoding baru. Fungsi ini tidak melakukan commit;
+    pemanggil melakukan commit lalu memanggil face_gallery_service.add().
+
+    Args:
+        db (Session): Session database
+        karyawan_id (int): ID karyawan
+        encoding (numpy.ndarray): Encoding wajah baru
+        max_templates (int): Jumlah maksimum template per karyawan
+
+    Returns:
+        tuple: (template, removed_ids) di mana template adalah baris FaceEncoding yang
+               baru dibuat atau didaur ulang dan removed_ids adalah ID template yang dihapus
+    """
+    templates = db.query(FaceEncoding).filter(
+        FaceEncoding.karyawan_id == karyawan_id
+    ).order_by(FaceEncoding.updated_at.asc(), FaceEncoding.id.asc()).all()
+
+    if len(templates) >= max_templates:
+        # Hapus kelebihan jika batas diturunkan, lalu timpa template terlama yang tersisa
+        surplus = len(templates) - max_templates
+        removed_ids = [extra.id for extra in templates[:surplus]]
+        for extra in templates[:surplus]:
+            db.delete(extra)
+        template = templates[surplus]
+        logger.info(f"Batas {max_templates} template tercapai untuk karyawan ID {karyawan_id}, mengganti template ID {template.id}")
+    else:
+        removed_ids = []
+        template = FaceEncoding(karyawan_id=karyawan_id)
+        db.add(template)
+
+    template.set_encoding_array(encoding)
+    db.flush()  # Pastikan template.id tersedia sebelum commit
+    return template, removed_ids
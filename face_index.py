@@ -0,0 +1,286 @@
+"""
+Index approximate nearest neighbour (ANN) untuk galeri wajah berukuran sangat besar.
+
+Index menggunakan skema IVF (inverted file) yang hanya bergantung pada NumPy:
+1. Centroid kasar dilatih dengan k-means pada (sampel) matriks galeri
+2. Setiap template wajah dimasukkan ke daftar milik centroid terdekat
+3. Saat login, hanya daftar milik `nprobe` centroid terdekat yang dipindai secara eksak
+
+Index dibangun di thread latar belakang dari snapshot FaceGalleryService. Selama
+index belum tersedia atau sudah tertinggal terlalu jauh dari galeri, pencarian
+otomatis memakai pemindaian eksak. Jika pencarian IVF tidak menemukan kecocokan
+di bawah toleransi, pencarian eksak dijalankan sebagai fallback agar karyawan
+yang sah tidak ditolak hanya karena wajahnya berada di daftar yang tidak diprobe.
+
+Konfigurasi melalui variabel lingkungan:
+- FACE_SEARCH_MODE: "exact" (default) atau "ivf"
+- FACE_IVF_NPROBE: jumlah daftar yang dipindai per pencarian (default 8)
+- FACE_IVF_MIN_GALLERY: ukuran galeri minimum sebelum IVF dipakai (default 5000)
+"""
+
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from face_gallery import FACE_MATCH_TOLERANCE, GALLERY_DTYPE
+
+logger = logging.getLogger(__name__)
+
+# Mode pencarian wajah: "exact" atau "ivf"
+FACE_SEARCH_MODE = os.getenv("FACE_SEARCH_MODE", "exact").lower()
+# Jumlah daftar IVF yang dipindai per pencarian
+FACE_IVF_NPROBE = int(os.getenv("FACE_IVF_NPROBE", "8"))
+# Ukuran galeri minimum sebelum IVF dipakai; galeri kecil lebih cepat dipindai eksak
+FACE_IVF_MIN_GALLERY = int(os.getenv("FACE_IVF_MIN_GALLERY", "5000"))
+
+# Jumlah baris yang diproses per blok saat menghitung jarak ke centroid (membatasi memori)
+_ASSIGN_CHUNK = 16384
+
+
+def _buffer_of(matrix):
+    # Snapshot galeri adalah view ke buffer milik service; index hanya valid untuk buffer yang sama
+    return matrix.base if matrix.base is not None else matrix
+
+
+def _nearest_centroid(data, centroids):
+    """
+    Mencari centroid terdekat untuk setiap baris data.
+
+    Args:
+        data (numpy.ndarray): Matriks data (N, D)
+        centroids (numpy.ndarray): Matriks centroid (K, D)
+
+    Returns:
+        numpy.ndarray: Indeks centroid terdekat untuk setiap baris, shape (N,)
+    """
+    c_sq = np.einsum("ij,ij->i", centroids, centroids)
+    labels = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), _ASSIGN_CHUNK):
+        block = data[start:start + _ASSIGN_CHUNK]
+        # |x|^2 konstan per baris sehingga tidak memengaruhi argmin
+        scores = c_sq[None, :] - 2.0 * (block @ centroids.T)
+        labels[start:start + len(block)] = np.argmin(scores, axis=1)
+    return labels
+
+
+def kmeans(data, k, iterations=10, seed=0):
+    """
+    Melatih centroid k-means sederhana (algoritma Lloyd) dengan NumPy.
+
+    Args:
+        data (numpy.ndarray): Matriks data (N, D)
+        k (int): Jumlah centroid
+        iterations (int): Jumlah iterasi Lloyd
+        seed (int): Seed generator acak untuk inisialisasi
+
+    Returns:
+        numpy.ndarray: Matriks centroid (k, D)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _nearest_centroid(data, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=k)
+        nonempty = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+        # Jumlah per cluster dengan satu reduceat atas baris yang sudah diurutkan per label
+        sums = np.add.reduceat(data[order], starts, axis=0)
+        centroids[nonempty] = sums / counts[nonempty, None]
+        # Cluster kosong diinisialisasi ulang dengan baris acak
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = data[rng.choice(len(data), size=len(empty), replace=False)]
+    return centroids
+
+
+class IVFIndex:
+    """
+    Index IVF atas baris matriks galeri wajah.
+
+    Attributes:
+        centroids (numpy.ndarray): Centroid kasar (K, 128)
+        list_rows (numpy.ndarray): Indeks baris galeri yang diurutkan per daftar
+        list_offsets (numpy.ndarray): Batas setiap daftar di list_rows, shape (K + 1,)
+        built_count (int): Jumlah baris galeri yang sudah diindeks
+        buffer (numpy.ndarray): Buffer matriks galeri tempat index ini dibangun
+        generation (int): Generasi galeri saat index dibangun
+    """
+
+    def __init__(self, centroids, list_rows, list_offsets, built_count, buffer, generation):
+        self.centroids = centroids
+        self.list_rows = list_rows
+        self.list_offsets = list_offsets
+        self.built_count = built_count
+        self.buffer = buffer
+        self.generation = generation
+
+    @classmethod
+    def build(cls, snapshot, n_lists=None, iterations=10, train_size=None, seed=0):
+        """
+        Membangun index IVF dari snapshot galeri.
+
+        Args:
+            snapshot (FaceGallery): Snapshot galeri wajah
+            n_lists (int, optional): Jumlah daftar, default sekitar sqrt(N)
+            iterations (int): Jumlah iterasi k-means
+            train_size (int, optional): Jumlah sampel pelatihan k-means, default 64 x n_lists
+            seed (int): Seed generator acak
+
+        Returns:
+            IVFIndex: Index yang sudah dibangun
+        """
+        matrix = snapshot.matrix
+        alive = np.flatnonzero(snapshot.owner_ids >= 0)
+        n_lists = n_lists or max(1, int(np.sqrt(len(alive))))
+        n_lists = min(n_lists, max(1, len(alive)))
+        train_size = train_size or 64 * n_lists
+
+        rng = np.random.default_rng(seed)
+        train_rows = alive if len(alive) <= train_size else rng.choice(alive, size=train_size, replace=False)
+        centroids = kmeans(matrix[train_rows], n_lists, iterations=iterations, seed=seed)
+
+        labels = _nearest_centroid(matrix[alive], centroids)
+        order = np.argsort(labels, kind="stable")
+        list_rows = alive[order]
+        list_offsets = np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=n_lists))))
+        return cls(centroids, list_rows, list_offsets, len(matrix), _buffer_of(matrix), snapshot.generation)
+
+    def compatible_with(self, snapshot):
+        """
+        Memeriksa apakah index masih dapat dipakai untuk snapshot galeri.
+
+        Index tetap valid selama snapshot memakai buffer yang sama: baris baru hanya
+        ditambahkan di belakang (dipindai eksak) dan baris yang dihapus bernilai inf.
+        """
+        return _buffer_of(snapshot.matrix) is self.buffer and len(snapshot.matrix) >= self.built_count
+
+    def candidates(self, encoding, nprobe, snapshot_size):
+        """
+        Mengumpulkan baris kandidat dari daftar centroid terdekat dan baris baru.
+
+        Args:
+            encoding (numpy.ndarray): Encoding wajah yang dicari
+            nprobe (int): Jumlah daftar yang dipindai
+            snapshot_size (int): Jumlah baris pada snapshot yang sedang dicari
+
+        Returns:
+            numpy.ndarray: Indeks baris galeri yang perlu dihitung jaraknya
+        """
+        c_sq = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        scores = c_sq - 2.0 * (self.centroids @ encoding)
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(scores, nprobe - 1)[:nprobe]
+        parts = [self.list_rows[self.list_offsets[p]:self.list_offsets[p + 1]] for p in probes]
+        if snapshot_size > self.built_count:
+            # Baris yang ditambahkan setelah index dibangun dipindai secara eksak
+            parts.append(np.arange(self.built_count, snapshot_size))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def search(self, snapshot, encoding, nprobe=FACE_IVF_NPROBE):
+        """
+        Mencari template terdekat dengan memindai nprobe daftar IVF.
+
+        Args:
+            snapshot (FaceGallery): Snapshot galeri yang kompatibel dengan index
+            encoding (numpy.ndarray): Encoding wajah yang dicari
+            nprobe (int): Jumlah daftar yang dipindai
+
+        Returns:
+            tuple: (karyawan_id, jarak) kandidat terdekat, atau (None, None) jika tidak ada kandidat
+        """
+        query = np.asarray(encoding, dtype=GALLERY_DTYPE)
+        rows = self.candidates(query, nprobe, len(snapshot.matrix))
+        if len(rows) == 0:
+            return None, None
+        sq = snapshot.sq_norms[rows] - 2.0 * (snapshot.matrix[rows] @ query) + query @ query
+        best = int(np.argmin(sq))
+        if not np.isfinite(sq[best]):
+            # Semua kandidat sudah dihapus
+            return None, None
+        # Template terdekat juga merupakan minimum per karyawan untuk pemiliknya
+        return int(snapshot.owner_ids[rows[best]]), float(np.sqrt(max(float(sq[best]), 0.0)))
+
+
+class FaceIndexService:
+    """
+    Pengelola index IVF untuk galeri wajah in-process.
+
+    Index dibangun ulang di thread latar belakang saat belum ada, saat buffer galeri
+    berganti (pemuatan ulang atau pemadatan), atau saat baris baru yang belum
+    diindeks sudah terlalu banyak. Selama pembangunan, pencarian memakai galeri eksak.
+    """
+
+    # Proporsi baris baru yang belum diindeks sebelum index dibangun ulang
+    STALE_RATIO = 0.1
+
+    def __init__(self, mode=FACE_SEARCH_MODE, nprobe=FACE_IVF_NPROBE, min_gallery=FACE_IVF_MIN_GALLERY):
+        self.mode = mode
+        self.nprobe = nprobe
+        self.min_gallery = min_gallery
+        self._index = None
+        self._building = False
+        self._lock = threading.Lock()
+
+    def search(self, snapshot, encoding, tolerance=FACE_MATCH_TOLERANCE):
+        """
+        Mencari karyawan yang cocok sesuai mode pencarian yang dikonfigurasi.
+
+        Args:
+            snapshot (FaceGallery): Snapshot galeri wajah
+            encoding (numpy.ndarray): Encoding wajah yang dicari
+            tolerance (float): Jarak maksimum agar dianggap cocok
+
+        Returns:
+            tuple: (karyawan_id, jarak) seperti FaceGallery.match()
+        """
+        if self.mode != "ivf" or len(snapshot) < self.min_gallery:
+            return snapshot.match(encoding, tolerance=tolerance)
+
+        index = self._index
+        if index is None or not index.compatible_with(snapshot) or self._is_stale(index, snapshot):
+            self._schedule_build(snapshot)
+            if index is None or not index.compatible_with(snapshot):
+                # Index belum tersedia: gunakan pencarian eksak
+                return snapshot.match(encoding, tolerance=tolerance)
+
+        karyawan_id, distance = index.search(snapshot, encoding, nprobe=self.nprobe)
+        if karyawan_id is not None and distance <= tolerance:
+            return karyawan_id, distance
+
+        # Fallback eksak agar wajah di daftar yang tidak diprobe tetap dikenali
+        return snapshot.match(encoding, tolerance=tolerance)
+
+    def _is_stale(self, index, snapshot):
+        pending = len(snapshot.matrix) - index.built_count
+        return pending > max(1024, self.STALE_RATIO * index.built_count)
+
+    def _schedule_build(self, snapshot):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        thread = threading.Thread(target=self._build, args=(snapshot,), name="face-ivf-build", daemon=True)
+        thread.start()
+
+    def _build(self, snapshot):
+        try:
+            started = time.perf_counter()
+            index = IVFIndex.build(snapshot)
+            self._index = index
+            logger.info(
+                f"Index IVF wajah dibangun: {index.built_count} baris, {len(index.centroids)} daftar, "
+                f"generasi {index.generation}, {time.perf_counter() - started:.2f} detik"
+            )
+        except Exception as e:
+            logger.error(f"Gagal membangun index IVF wajah: {str(e)}", exc_info=True)
+        finally:
+            with self._lock:
+                self._building = False
+
+
+# Index wajah in-process yang dipakai oleh endpoint login
+face_index_service = FaceIndexService()
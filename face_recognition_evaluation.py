@@ -23,6 +23,7 @@ Cara penggunaan:
 import cv2
 import face_recognition
 import numpy as np
+import face_encoding_format
 import sqlite3
 import os
 import logging
@@ -72,7 +73,8 @@ def get_employee_face_data(cursor):
         cursor: Database cursor
 
     Returns:
-        dict: Dictionary dengan format {employee_id: (employee_name, face_encoding), ...}
+        dict: Dictionary dengan format {employee_id: (employee_name, [face_encoding, ...]), ...};
+            satu karyawan bisa memiliki beberapa template wajah
     """
     try:
         # Dapatkan data karyawan dan encoding wajah
@@ -86,10 +88,11 @@ def get_employee_face_data(cursor):
         for row in cursor.fetchall():
             employee_id, employee_name, encoding_bytes = row
 
-            # Konversi bytes ke numpy array
-            face_encoding = np.frombuffer(encoding_bytes, dtype=np.float64)
+            # Konversi record biner (atau format lama) ke numpy array
+            face_encoding = face_encoding_format.decode(encoding_bytes)
 
-            employee_data[employee_id] = (employee_name, face_encoding)
+            # Simpan semua template milik karyawan, bukan hanya yang terakhir dibaca
+            employee_data.setdefault(employee_id, (employee_name, []))[1].append(face_encoding)
 
         logger.info(f"Berhasil mendapatkan data wajah untuk {len(employee_data)} karyawan")
         return employee_data
@@ -204,9 +207,11 @@ def evaluate_face_recognition(employee_data, test_images_dir=TEST_DIR):
     known_face_encodings = []
     known_face_ids = []
 
-    for employee_id, (_, face_encoding) in employee_data.items():
-        known_face_encodings.append(face_encoding)
-        known_face_ids.append(employee_id)
+    # Setiap template menjadi satu kandidat; jarak terkecil mewakili karyawan pemiliknya
+    for employee_id, (_, face_encodings) in employee_data.items():
+        for face_encoding in face_encodings:
+            known_face_encodings.append(face_encoding)
+            known_face_ids.append(employee_id)
 
     # Daftar untuk menyimpan hasil prediksi dan label sebenarnya
     y_true = []
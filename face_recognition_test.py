@@ -14,6 +14,7 @@ Cara penggunaan:
 import cv2
 import face_recognition
 import numpy as np
+import face_encoding_format
 import sqlite3
 import logging
 from datetime import datetime
@@ -49,7 +50,8 @@ def get_employee_face_data(cursor):
         cursor: Database cursor
         
     Returns:
-        dict: Dictionary dengan format {employee_id: (employee_name, face_encoding), ...}
+        dict: Dictionary dengan format {employee_id: (employee_name, [face_encoding, ...]), ...};
+            satu karyawan bisa memiliki beberapa template wajah
     """
     try:
         # Dapatkan data karyawan dan encoding wajah
@@ -63,10 +65,11 @@ def get_employee_face_data(cursor):
         for row in cursor.fetchall():
             employee_id, employee_name, encoding_bytes = row
             
-            # Konversi bytes ke numpy array
-            face_encoding = np.frombuffer(encoding_bytes, dtype=np.float64)
+            # Konversi record biner (atau format lama) ke numpy array
+            face_encoding = face_encoding_format.decode(encoding_bytes)
             
-            employee_data[employee_id] = (employee_name, face_encoding)
+            # Simpan semua template milik karyawan, bukan hanya yang terakhir dibaca
+            employee_data.setdefault(employee_id, (employee_name, []))[1].append(face_encoding)
         
         logger.info(f"Berhasil mendapatkan data wajah untuk {len(employee_data)} karyawan")
         return employee_data
@@ -97,9 +100,11 @@ def main():
         known_face_encodings = []
         known_face_names = []
         
-        for employee_id, (employee_name, face_encoding) in employee_data.items():
-            known_face_encodings.append(face_encoding)
-            known_face_names.append(f"{employee_name} (ID: {employee_id})")
+        # Setiap template menjadi satu kandidat; jarak terkecil mewakili karyawan pemiliknya
+        for employee_id, (employee_name, face_encodings) in employee_data.items():
+            for face_encoding in face_encodings:
+                known_face_encodings.append(face_encoding)
+                known_face_names.append(f"{employee_name} (ID: {employee_id})")
         
         # Inisialisasi webcam
         cap = cv2.VideoCapture(0)
@@ -5,6 +5,11 @@ Script ini akan:
 2. Memproses gambar untuk mendeteksi wajah
 3. Menyimpan encoding wajah ke database untuk digunakan dalam sistem login
 
+Setiap pengambilan menambah satu template wajah (misalnya dengan kacamata, masker
+atau pencahayaan berbeda) melalui face_gallery.save_face_template, sehingga batas
+MAX_TEMPLATES_PER_KARYAWAN dan penggantian template terlama sama dengan aplikasi.
+Database yang dipakai mengikuti DATABASE_URL (lihat database.py).
+
 Cara penggunaan:
 1. Jalankan script dengan perintah: python face_training.py
 2. Ikuti instruksi yang muncul di layar
@@ -15,10 +20,11 @@ import cv2
 import face_recognition
 import numpy as np
 import os
-import sqlite3
-import json
 import logging
-from datetime import datetime
+
+from database import SessionLocal
+from face_gallery import save_face_template, MAX_TEMPLATES_PER_KARYAWAN
+from models import Karyawan
 
 # Konfigurasi logging
 logging.basicConfig(
@@ -35,33 +41,31 @@ if not os.path.exists(FACE_DIR):
 
 def connect_to_database():
     """
-    Fungsi untuk menghubungkan ke database
+    Fungsi untuk membuka session database
     
     Returns:
-        tuple: (connection, cursor) - Koneksi dan cursor database
+        Session: Session database, atau None jika gagal
     """
     try:
-        conn = sqlite3.connect('absensi.db')
-        cursor = conn.cursor()
+        db = SessionLocal()
         logger.info("Berhasil terhubung ke database")
-        return conn, cursor
+        return db
     except Exception as e:
         logger.error(f"Error saat menghubungkan ke database: {str(e)}")
-        return None, None
+        return None
 
-def get_all_employees(cursor):
+def get_all_employees(db):
     """
     Fungsi untuk mendapatkan semua data karyawan dari database
     
     Args:
-        cursor: Database cursor
+        db (Session): Session database
         
     Returns:
         list: Daftar karyawan dengan format [(id, nama), ...]
     """
     try:
-        cursor.execute("SELECT id, nama FROM karyawan")
-        employees = cursor.fetchall()
+        employees = [(row.id, row.nama) for row in db.query(Karyawan.id, Karyawan.nama)]
         logger.info(f"Berhasil mendapatkan {len(employees)} data karyawan")
         return employees
     except Exception as e:
@@ -160,13 +164,15 @@ def capture_face(employee_id, employee_name):
     
     return face_encoding
 
-def save_face_encoding(cursor, conn, employee_id, face_encoding):
+def save_face_encoding(db, employee_id, face_encoding):
     """
-    Fungsi untuk menyimpan encoding wajah ke database
+    Fungsi untuk menyimpan encoding wajah ke database sebagai template baru
+    
+    Jika karyawan sudah memiliki MAX_TEMPLATES_PER_KARYAWAN template, template
+    yang paling lama diperbarui diganti dengan encoding baru.
     
     Args:
-        cursor: Database cursor
-        conn: Database connection
+        db (Session): Session database
         employee_id (int): ID karyawan
         face_encoding (numpy.ndarray): Encoding wajah karyawan
         
@@ -174,27 +180,13 @@ def save_face_encoding(cursor, conn, employee_id, face_encoding):
         bool: True jika berhasil, False jika gagal
     """
     try:
-        # Konversi encoding ke bytes
-        encoding_bytes = face_encoding.tobytes()
-        
-        # Cek apakah encoding sudah ada
-        cursor.execute("SELECT id FROM face_encoding WHERE karyawan_id = ?", (employee_id,))
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update encoding yang sudah ada
-            cursor.execute("UPDATE face_encoding SET encoding = ?, updated_at = ? WHERE karyawan_id = ?",
-                          (encoding_bytes, datetime.now(), employee_id))
-            logger.info(f"Encoding wajah untuk karyawan ID {employee_id} berhasil diperbarui")
-        else:
-            # Buat encoding baru
-            cursor.execute("INSERT INTO face_encoding (karyawan_id, encoding, created_at, updated_at) VALUES (?, ?, ?, ?)",
-                          (employee_id, encoding_bytes, datetime.now(), datetime.now()))
-            logger.info(f"Encoding wajah untuk karyawan ID {employee_id} berhasil disimpan")
-        
-        conn.commit()
+        template, removed_ids = save_face_template(db, employee_id, face_encoding)
+        db.commit()
+        logger.info(f"Template wajah ID {template.id} untuk karyawan ID {employee_id} berhasil disimpan"
+                    f" (maksimum {MAX_TEMPLATES_PER_KARYAWAN} template, dihapus: {removed_ids})")
         return True
     except Exception as e:
+        db.rollback()
         logger.error(f"Error saat menyimpan encoding wajah: {str(e)}")
         return False
 
@@ -205,14 +197,14 @@ def main():
     logger.info("Memulai program training wajah karyawan")
     
     # Hubungkan ke database
-    conn, cursor = connect_to_database()
-    if not conn or not cursor:
+    db = connect_to_database()
+    if db is None:
         logger.error("Tidak dapat melanjutkan tanpa koneksi database")
         return
     
     try:
         # Dapatkan semua karyawan
-        employees = get_all_employees(cursor)
+        employees = get_all_employees(db)
         if not employees:
             logger.error("Tidak ada data karyawan")
             return
@@ -237,7 +229,7 @@ def main():
                     
                     if face_encoding is not None:
                         # Simpan encoding wajah
-                        success = save_face_encoding(cursor, conn, employee_id, face_encoding)
+                        success = save_face_encoding(db, employee_id, face_encoding)
                         if success:
                             print(f"Data wajah untuk {employee_name} berhasil disimpan!")
                         else:
@@ -248,8 +240,8 @@ def main():
                 print("Masukkan nomor yang valid")
     finally:
         # Tutup koneksi database
-        if conn:
-            conn.close()
+        if db is not None:
+            db.close()
             logger.info("Koneksi database ditutup")
     
     logger.info("Program training wajah karyawan selesai")
@@ -0,0 +1,313 @@
+"""
+Pool proses terbatas untuk deteksi dan encoding wajah di luar event loop.
+
+face_recognition (dlib) bersifat CPU-bound dan memegang GIL, sehingga memanggilnya
+langsung dari endpoint `async def` membekukan seluruh event loop uvicorn selama
+proses deteksi. Modul ini menjalankan pekerjaan tersebut di ProcessPoolExecutor:
+1. Setiap worker memuat model dlib sekali saat start (initializer)
+2. Jumlah pekerjaan yang sedang berjalan + mengantre dibatasi; jika penuh,
+   FaceWorkerBusy dinaikkan (HTTP 429) alih-alih menumpuk request
+3. Setiap pekerjaan memiliki batas waktu; jika terlewati, FaceWorkerTimeout
+   dinaikkan (HTTP 503)
+4. Jika pool rusak (worker mati), pool dibuat ulang dan FaceWorkerUnavailable
+   dinaikkan (HTTP 503)
+
+Konfigurasi melalui variabel lingkungan:
+- FACE_WORKERS: jumlah proses worker (default jumlah CPU)
+- FACE_QUEUE_SIZE: jumlah pekerjaan yang boleh mengantre di luar worker aktif (default 2 x worker)
+- FACE_TASK_TIMEOUT: batas waktu satu pekerjaan dalam detik (default 10)
+- FACE_WORKER_START_METHOD: metode start multiprocessing (default "spawn")
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import face_detection
+
+logger = logging.getLogger(__name__)
+
+# Jumlah proses worker face_recognition
+FACE_WORKERS = int(os.getenv("FACE_WORKERS", str(os.cpu_count() or 1)))
+# Jumlah pekerjaan yang boleh mengantre selain yang sedang dikerjakan worker
+FACE_QUEUE_SIZE = int(os.getenv("FACE_QUEUE_SIZE", str(2 * FACE_WORKERS)))
+# Batas waktu satu pekerjaan deteksi/encoding (detik)
+FACE_TASK_TIMEOUT = float(os.getenv("FACE_TASK_TIMEOUT", "10"))
+# "spawn" aman untuk dlib (termasuk build CUDA) karena worker tidak mewarisi state proses utama
+FACE_WORKER_START_METHOD = os.getenv("FACE_WORKER_START_METHOD", "spawn")
+
+
+class FaceWorkerError(Exception):
+    """
+    Error dasar pool worker wajah.
+
+    Attributes:
+        status_code (int): Kode status HTTP yang sesuai untuk error ini
+        message (str): Pesan untuk ditampilkan ke pengguna
+    """
+
+    status_code = 503
+    message = "Layanan pengenalan wajah sedang tidak tersedia. Coba lagi sebentar lagi."
+
+    def __init__(self, message=None):
+        super().__init__(message or self.message)
+        if message:
+            self.message = message
+
+
+class FaceWorkerBusy(FaceWorkerError):
+    """Antrean pool worker penuh."""
+
+    status_code = 429
+    message = "Server sedang sibuk memproses wajah lain. Coba lagi beberapa detik lagi."
+
+
+class FaceWorkerTimeout(FaceWorkerError):
+    """Pekerjaan melewati batas waktu."""
+
+    message = "Pemrosesan wajah terlalu lama. Coba lagi."
+
+
+class FaceWorkerUnavailable(FaceWorkerError):
+    """Pool worker tidak dapat menerima pekerjaan (misalnya worker mati)."""
+
+
+def _init_worker():
+    # Muat model dlib (deteksi CNN, landmark, encoder) sekali per worker agar
+    # pekerjaan pertama tidak menanggung biaya pemuatan model
+    import face_recognition
+
+    blank = np.zeros((64, 64, 3), dtype=np.uint8)
+    face_recognition.face_locations(blank, model="cnn")
+    face_recognition.face_encodings(blank, known_face_locations=[(0, 63, 63, 0)])
+    if face_detection.FACE_DETECTION_STRATEGY == "cascade":
+        face_detection.coarse_regions(blank)
+
+
+def _noop():
+    return None
+
+
+def _detect_faces(rgb_img, strategy, upsample):
+    return face_detection.detect_faces(rgb_img, strategy=strategy, upsample=upsample)
+
+
+def _encode_faces(rgb_img, strategy, upsample):
+    import face_recognition
+
+    face_locations, timings = face_detection.detect_faces(rgb_img, strategy=strategy, upsample=upsample)
+    if not face_locations:
+        return face_locations, [], timings
+    started = time.perf_counter()
+    encodings = face_recognition.face_encodings(rgb_img, face_locations)
+    timings["encode"] = round((time.perf_counter() - started) * 1000.0, 2)
+    return face_locations, encodings, timings
+
+
+def _encode_faces_batch(images, strategy, upsample):
+    import face_recognition
+
+    results = []
+    for image, (face_locations, timings) in zip(images, face_detection.batch_detect_faces(images, strategy, upsample)):
+        encodings = []
+        if face_locations:
+            started = time.perf_counter()
+            encodings = face_recognition.face_encodings(image, face_locations)
+            timings["encode"] = round((time.perf_counter() - started) * 1000.0, 2)
+        results.append((face_locations, encodings, timings))
+    return results
+
+
+class FaceWorkerPool:
+    """
+    ProcessPoolExecutor terbatas untuk pekerjaan face_recognition.
+
+    Attributes:
+        max_workers (int): Jumlah proses worker
+        max_queue (int): Jumlah pekerjaan yang boleh mengantre
+        timeout (float): Batas waktu satu pekerjaan (detik)
+    """
+
+    def __init__(self, max_workers=FACE_WORKERS, max_queue=FACE_QUEUE_SIZE, timeout=FACE_TASK_TIMEOUT,
+                 start_method=FACE_WORKER_START_METHOD):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self.start_method = start_method
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0  # Pekerjaan yang sedang dikerjakan atau mengantre
+        self._completed = 0
+        self._rejected = 0
+        self._timeouts = 0
+
+    @property
+    def capacity(self):
+        return self.max_workers + self.max_queue
+
+    def start(self):
+        """
+        Membuat ProcessPoolExecutor jika belum ada.
+
+        Returns:
+            ProcessPoolExecutor: Executor yang aktif
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                )
+                # Proses worker dibuat saat ada pekerjaan; kirim pekerjaan kosong agar semua
+                # worker langsung dibuat dan memuat model sebelum request pertama
+                for _ in range(self.max_workers):
+                    self._executor.submit(_noop)
+                logger.info(f"Pool worker wajah dimulai: {self.max_workers} worker, antrean {self.max_queue}")
+            return self._executor
+
+    def shutdown(self):
+        """Menghentikan seluruh worker."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            logger.info("Pool worker wajah dihentikan")
+
+    def stats(self):
+        """
+        Mendapatkan statistik pool worker.
+
+        Returns:
+            dict: Jumlah worker, kapasitas, pekerjaan tertunda, selesai, ditolak, dan timeout
+        """
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "capacity": self.capacity,
+                "pending": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+            }
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                return False
+            self._pending += 1
+            return True
+
+    def _release(self, future):
+        # Slot baru dilepas saat pekerjaan benar-benar selesai di worker, bukan saat
+        # pemanggil berhenti menunggu, sehingga batas antrean tetap akurat
+        with self._lock:
+            self._pending -= 1
+            if not future.cancelled():
+                self._completed += 1
+
+    def _discard(self, executor):
+        # Buang executor yang rusak agar pekerjaan berikutnya membuat pool baru
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.error("Pool worker wajah rusak dan akan dibuat ulang")
+
+    async def run(self, fn, *args):
+        """
+        Menjalankan fungsi di worker dengan batas antrean dan batas waktu.
+
+        Args:
+            fn (callable): Fungsi level modul yang dapat di-pickle
+            *args: Argumen fungsi
+
+        Returns:
+            Any: Hasil fungsi
+
+        Raises:
+            FaceWorkerBusy: Jika antrean penuh
+            FaceWorkerTimeout: Jika pekerjaan melewati batas waktu
+            FaceWorkerUnavailable: Jika pool rusak
+        """
+        executor = self.start()
+        if not self._acquire():
+            raise FaceWorkerBusy()
+
+        try:
+            future = executor.submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            with self._lock:
+                self._pending -= 1
+            self._discard(executor)
+            raise FaceWorkerUnavailable() from e
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            logger.warning(f"Pekerjaan wajah melewati batas waktu {self.timeout} detik")
+            raise FaceWorkerTimeout()
+        except BrokenProcessPool as e:
+            self._discard(executor)
+            raise FaceWorkerUnavailable() from e
+
+    async def detect_faces(self, rgb_img, strategy=None, upsample=1):
+        """
+        Mendeteksi lokasi wajah di worker.
+
+        Args:
+            rgb_img (numpy.ndarray): Gambar RGB
+            strategy (str, optional): Strategi deteksi (lihat face_detection.py),
+                default FACE_DETECTION_STRATEGY
+            upsample (int): Jumlah upsample gambar sebelum deteksi
+
+        Returns:
+            tuple: (face_locations, timings) dengan waktu per tahap dalam milidetik
+        """
+        return await self.run(_detect_faces, rgb_img, strategy, upsample)
+
+    async def encode_faces(self, rgb_img, strategy=None, upsample=1):
+        """
+        Mendeteksi wajah lalu menghitung encoding-nya di worker dalam satu pekerjaan.
+
+        Args:
+            rgb_img (numpy.ndarray): Gambar RGB
+            strategy (str, optional): Strategi deteksi (lihat face_detection.py),
+                default FACE_DETECTION_STRATEGY
+            upsample (int): Jumlah upsample gambar sebelum deteksi
+
+        Returns:
+            tuple: (face_locations, encodings, timings) dengan waktu per tahap dalam milidetik
+        """
+        return await self.run(_encode_faces, rgb_img, strategy, upsample)
+
+    async def encode_faces_batch(self, images, strategy=None, upsample=1):
+        """
+        Mendeteksi dan menghitung encoding wajah untuk beberapa gambar dalam satu pekerjaan.
+
+        Satu batch menempati satu slot antrean dan satu batas waktu FACE_TASK_TIMEOUT.
+
+        Args:
+            images (list): Daftar gambar RGB
+            strategy (str, optional): Strategi deteksi (lihat face_detection.py)
+            upsample (int): Jumlah upsample gambar sebelum deteksi
+
+        Returns:
+            list: Tuple (face_locations, encodings, timings) untuk setiap gambar
+        """
+        return await self.run(_encode_faces_batch, images, strategy, upsample)
+
+
+# Pool worker wajah yang dipakai oleh seluruh endpoint
+face_worker_pool = FaceWorkerPool()
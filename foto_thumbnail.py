@@ -0,0 +1,205 @@
+"""
+Penyajian foto karyawan dan absensi dengan thumbnail ter-cache dan HTTP caching.
+
+Foto disimpan content-addressed di tabel foto_blob (kunci SHA-256 isinya), sehingga
+isi foto untuk satu hash tidak pernah berubah. Karena itu hash dipakai langsung
+sebagai ETag kuat, dan browser boleh menyimpan respons selama mungkin.
+
+Thumbnail dibuat sekali saat pertama kali diminta (di luar event loop) lalu
+disimpan di tabel foto_thumbnail. Permintaan berikutnya hanya membaca thumbnail
+yang sudah jadi, dan permintaan ulang dari browser dijawab 304 Not Modified
+berdasarkan If-None-Match atau If-Modified-Since tanpa membaca isi foto.
+
+Konfigurasi melalui variabel lingkungan:
+- FOTO_THUMBNAIL_SIZE: sisi terpanjang thumbnail dalam piksel (default 160)
+- FOTO_THUMBNAIL_QUALITY: kualitas JPEG thumbnail (default 80)
+"""
+
+import io
+import logging
+import os
+import re
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi.responses import Response
+from PIL import Image, ImageOps
+from sqlalchemy.exc import IntegrityError
+
+from models import FotoBlob, FotoThumbnail
+
+logger = logging.getLogger(__name__)
+
+# Sisi terpanjang thumbnail (piksel)
+FOTO_THUMBNAIL_SIZE = int(os.getenv("FOTO_THUMBNAIL_SIZE", "160"))
+# Kualitas JPEG thumbnail
+FOTO_THUMBNAIL_QUALITY = int(os.getenv("FOTO_THUMBNAIL_QUALITY", "80"))
+
+# Foto tidak pernah berubah untuk hash yang sama; halaman admin tidak boleh di-cache proxy bersama
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+_SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def is_valid_hash(sha256):
+    return bool(sha256) and _SHA256_PATTERN.match(sha256) is not None
+
+
+def media_type(data):
+    """
+    Menentukan media type foto dari byte awalnya.
+
+    Returns:
+        str: image/png, image/gif, image/webp atau image/jpeg (default)
+    """
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"GIF8"):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/jpeg"
+
+
+def make_thumbnail(data, size=None):
+    """
+    Memperkecil foto menjadi thumbnail JPEG.
+
+    Decode memakai draft() sehingga JPEG besar langsung di-decode pada skala
+    tereduksi, dan orientasi EXIF diterapkan agar thumbnail tidak terbalik.
+
+    Args:
+        data (bytes): Isi foto asli
+        size (int, optional): Sisi terpanjang thumbnail (default FOTO_THUMBNAIL_SIZE)
+
+    Returns:
+        bytes: Isi thumbnail JPEG
+    """
+    size = size or FOTO_THUMBNAIL_SIZE
+    image = Image.open(io.BytesIO(data))
+    image.draft("RGB", (size, size))
+    image = ImageOps.exif_transpose(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.thumbnail((size, size), Image.LANCZOS)
+
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=FOTO_THUMBNAIL_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def get_foto_info(db, sha256):
+    """
+    Mengambil metadata foto (tanpa isi foto).
+
+    Returns:
+        FotoBlob: Baris foto dengan kolom data masih deferred, atau None jika tidak ada
+    """
+    if not is_valid_hash(sha256):
+        return None
+    return db.query(FotoBlob).filter(FotoBlob.sha256 == sha256).first()
+
+
+def get_thumbnail(db, sha256, size=None):
+    """
+    Mengambil thumbnail foto, membuatnya dan menyimpannya jika belum ada.
+
+    Args:
+        db (Session): Session database
+        sha256 (str): Hash foto asli
+        size (int, optional): Sisi terpanjang thumbnail (default FOTO_THUMBNAIL_SIZE)
+
+    Returns:
+        bytes: Isi thumbnail JPEG, atau None jika foto tidak ada
+    """
+    size = size or FOTO_THUMBNAIL_SIZE
+    cached = db.query(FotoThumbnail.data).filter(
+        FotoThumbnail.sha256 == sha256,
+        FotoThumbnail.lebar == size
+    ).scalar()
+    if cached is not None:
+        return cached
+
+    data = db.query(FotoBlob.data).filter(FotoBlob.sha256 == sha256).scalar()
+    if data is None:
+        return None
+
+    try:
+        thumbnail = make_thumbnail(data, size)
+    except Exception as e:
+        # Foto yang tidak dapat di-decode disajikan apa adanya
+        logger.warning(f"Gagal membuat thumbnail foto {sha256}: {str(e)}")
+        return data
+
+    try:
+        db.add(FotoThumbnail(sha256=sha256, lebar=size, data=thumbnail))
+        db.commit()
+    except IntegrityError:
+        # Permintaan lain sudah menyimpan thumbnail yang sama lebih dulu
+        db.rollback()
+    return thumbnail
+
+
+def _http_date(value):
+    # Kolom created_at disimpan dalam waktu lokal tanpa zona waktu
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def not_modified(request, etag, last_modified=None):
+    """
+    Memeriksa conditional request (If-None-Match, lalu If-Modified-Since).
+
+    Args:
+        request (Request): Request dari browser
+        etag (str): ETag kuat respons (termasuk tanda kutip)
+        last_modified (datetime, optional): Waktu foto disimpan
+
+    Returns:
+        bool: True jika browser sudah memiliki versi terbaru (jawab 304)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match lebih diutamakan daripada If-Modified-Since (RFC 7232)
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or any(tag.replace("W/", "", 1) == etag for tag in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.astimezone(timezone.utc).replace(microsecond=0) <= since
+    return False
+
+
+def cached_response(request, etag, last_modified, load_content, content_type):
+    """
+    Membuat respons foto dengan header caching, atau 304 tanpa memuat isi foto.
+
+    Args:
+        request (Request): Request dari browser
+        etag (str): ETag kuat respons (termasuk tanda kutip)
+        last_modified (datetime, optional): Waktu foto disimpan
+        load_content (callable): Fungsi tanpa argumen yang mengembalikan isi foto
+        content_type (callable or str): Media type, atau fungsi yang menentukannya dari isi foto
+
+    Returns:
+        Response: 200 berisi foto, 304 jika browser sudah memilikinya, atau None
+                  jika isi foto tidak ditemukan
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    content = load_content()
+    if content is None:
+        return None
+    if callable(content_type):
+        content_type = content_type(content)
+    return Response(content=content, media_type=content_type, headers=headers)
@@ -0,0 +1,89 @@
+"""
+Fungsi SQL lintas dialek (SQLite, PostgreSQL, MySQL) untuk query agregat.
+
+Fungsi tanggal dan waktu berbeda di setiap database, sehingga ekspresi di modul
+ini dikompilasi sesuai dialek engine yang menjalankannya. Dengan begitu agregat
+seperti rekap bulanan tetap dihitung di SQL, apa pun backend DATABASE_URL.
+"""
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import Date, Float, Time
+
+
+class durasi_detik(FunctionElement):
+    """
+    Selisih dua kolom DateTime dalam detik: durasi_detik(mulai, akhir).
+
+    Hasilnya NULL jika salah satu kolom NULL, sehingga diabaikan oleh SUM.
+    """
+    type = Float()
+    name = "durasi_detik"
+    inherit_cache = True
+
+
+@compiles(durasi_detik)
+def _durasi_detik_default(element, compiler, **kw):
+    mulai, akhir = list(element.clauses)
+    return f"EXTRACT(EPOCH FROM ({compiler.process(akhir, **kw)} - {compiler.process(mulai, **kw)}))"
+
+
+@compiles(durasi_detik, "sqlite")
+def _durasi_detik_sqlite(element, compiler, **kw):
+    mulai, akhir = list(element.clauses)
+    return f"((julianday({compiler.process(akhir, **kw)}) - julianday({compiler.process(mulai, **kw)})) * 86400.0)"
+
+
+@compiles(durasi_detik, "mysql")
+def _durasi_detik_mysql(element, compiler, **kw):
+    mulai, akhir = list(element.clauses)
+    return f"TIMESTAMPDIFF(SECOND, {compiler.process(mulai, **kw)}, {compiler.process(akhir, **kw)})"
+
+
+class awal_bulan(FunctionElement):
+    """
+    Tanggal pertama bulan dari kolom Date: awal_bulan(tanggal).
+    """
+    type = Date()
+    name = "awal_bulan"
+    inherit_cache = True
+
+
+@compiles(awal_bulan)
+def _awal_bulan_default(element, compiler, **kw):
+    return f"CAST(date_trunc('month', {compiler.process(element.clauses, **kw)}) AS DATE)"
+
+
+@compiles(awal_bulan, "sqlite")
+def _awal_bulan_sqlite(element, compiler, **kw):
+    return f"date({compiler.process(element.clauses, **kw)}, 'start of month')"
+
+
+@compiles(awal_bulan, "mysql")
+def _awal_bulan_mysql(element, compiler, **kw):
+    tanggal = compiler.process(element.clauses, **kw)
+    return f"DATE_SUB({tanggal}, INTERVAL DAYOFMONTH({tanggal}) - 1 DAY)"
+
+
+class jam_dari(FunctionElement):
+    """
+    Jam (time of day, tanpa pecahan detik) dari kolom DateTime: jam_dari(waktu).
+    """
+    type = Time()
+    name = "jam_dari"
+    inherit_cache = True
+
+
+@compiles(jam_dari)
+def _jam_dari_default(element, compiler, **kw):
+    return f"CAST(date_trunc('second', {compiler.process(element.clauses, **kw)}) AS TIME)"
+
+
+@compiles(jam_dari, "sqlite")
+def _jam_dari_sqlite(element, compiler, **kw):
+    return f"time({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(jam_dari, "mysql")
+def _jam_dari_mysql(element, compiler, **kw):
+    return f"TIME({compiler.process(element.clauses, **kw)})"
@@ -0,0 +1,114 @@
+"""
+Tahap ingest gambar bersama untuk semua endpoint wajah.
+
+Foto dari kamera ponsel bisa berukuran beberapa kali lipat dari yang dibutuhkan
+detektor wajah, padahal waktu deteksi sebanding dengan jumlah piksel. Modul ini:
+1. Membaca ukuran gambar dari header (PIL, tanpa decode piksel)
+2. Jika gambar jauh lebih besar dari batas, decode langsung dalam resolusi
+   1/2, 1/4, atau 1/8 dengan flag IMREAD_REDUCED_COLOR_* OpenCV (untuk JPEG,
+   pengecilan dilakukan di tahap DCT sehingga jauh lebih murah)
+3. Memperkecil sisa kelebihan dengan cv2.resize agar sisi terpanjang tidak
+   melebihi batas
+4. Mengkonversi BGR ke RGB satu kali
+5. Mengembalikan faktor skala agar lokasi wajah dapat dipetakan ke gambar asli
+
+Konfigurasi melalui variabel lingkungan:
+- FACE_INGEST_MAX_SIDE: panjang maksimum sisi terpanjang dalam piksel (default 1024)
+"""
+
+import io
+import os
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Panjang maksimum sisi terpanjang gambar yang diproses detektor wajah
+FACE_INGEST_MAX_SIDE = int(os.getenv("FACE_INGEST_MAX_SIDE", "1024"))
+
+# Flag decode OpenCV per faktor pengecilan
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def image_size(data):
+    """
+    Membaca ukuran gambar dari header tanpa decode piksel.
+
+    Args:
+        data (bytes): Isi file gambar
+
+    Returns:
+        tuple: (width, height), atau None jika header tidak dapat dibaca
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return image.size
+    except Exception:
+        return None
+
+
+def _decode_flag(longest, max_side):
+    # Gunakan decode tereduksi hanya jika hasilnya masih minimal sebesar batas,
+    # sehingga kualitas tidak turun di bawah yang dibutuhkan
+    for factor, flag in _REDUCED_FLAGS:
+        if longest // factor >= max_side:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def ingest_image(data, max_side=None):
+    """
+    Decode gambar menjadi array RGB dengan sisi terpanjang dibatasi.
+
+    Args:
+        data (bytes): Isi file gambar (JPEG, PNG, dll)
+        max_side (int, optional): Panjang maksimum sisi terpanjang, default FACE_INGEST_MAX_SIDE
+
+    Returns:
+        tuple: (rgb_img, scale) di mana scale adalah ukuran hasil dibagi ukuran asli
+               (1.0 jika gambar tidak diperkecil)
+
+    Raises:
+        ValueError: Jika gambar kosong atau tidak dapat di-decode
+    """
+    max_side = max_side or FACE_INGEST_MAX_SIDE
+    if not data:
+        raise ValueError("Data gambar kosong")
+
+    size = image_size(data)
+    flag = cv2.IMREAD_COLOR if size is None else _decode_flag(max(size), max_side)
+
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+    if img is None or img.size == 0:
+        raise ValueError("Gambar tidak dapat di-decode")
+
+    height, width = img.shape[:2]
+    # Sisi terpanjang asli; rotasi EXIF oleh imdecode tidak mengubah sisi terpanjang
+    original_longest = max(size) if size is not None else max(height, width)
+
+    longest = max(height, width)
+    if longest > max_side:
+        factor = max_side / float(longest)
+        img = cv2.resize(img, (max(1, round(width * factor)), max(1, round(height * factor))), interpolation=cv2.INTER_AREA)
+
+    rgb_img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    scale = max(rgb_img.shape[:2]) / float(original_longest)
+    return rgb_img, scale
+
+
+def to_original_locations(face_locations, scale):
+    """
+    Memetakan lokasi wajah dari gambar hasil ingest ke koordinat gambar asli.
+
+    Args:
+        face_locations (list): Lokasi wajah (top, right, bottom, left)
+        scale (float): Faktor skala dari ingest_image()
+
+    Returns:
+        list: Lokasi wajah dalam koordinat gambar asli
+    """
+    return [tuple(int(round(value / scale)) for value in location) for location in face_locations]
@@ -0,0 +1,354 @@
+"""
+Modul query laporan absensi dengan filter di SQL dan keyset pagination.
+
+Halaman laporan absensi tidak lagi memuat seluruh tabel absensi ke template.
+Data diambil per halaman melalui endpoint JSON, dengan filter rentang tanggal,
+karyawan, departemen dan status yang diterapkan di query SQL. Hanya kolom yang
+ditampilkan di laporan yang dipilih (tanpa isi foto, cukup hash-nya).
+
+Pagination memakai keyset (seek) alih-alih OFFSET: halaman berikutnya dimulai
+dari cursor berisi nilai kolom urutan dan ID baris terakhir halaman sebelumnya,
+sehingga biaya satu halaman tetap konstan berapa pun jauhnya halaman tersebut.
+Kolom urutan yang boleh NULL (misalnya jam_keluar) diganti nilai pengganti
+melalui COALESCE agar perbandingan keyset tetap konsisten.
+
+Absensi lama yang sudah dipindahkan ke arsip bulanan (arsip_absensi.py) tetap
+muncul di laporan: jika filter tanggal mencakup bulan arsip, baris arsip yang
+cocok digabungkan dengan baris dari SQL memakai nilai urutan dan cursor yang sama.
+Posisi cursor dan batas limit + 1 baris diterapkan di arsip per bulan
+(arsip_absensi.halaman_arsip), sehingga yang diurutkan di Python hanya
+kandidat halaman ini, bukan seluruh arsip.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+from sqlalchemy import and_, func, literal, or_, select
+
+from models import Absensi, Karyawan
+import arsip_absensi
+
+# Jumlah baris per halaman laporan
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+# Nilai pengganti NULL untuk kolom urutan (diurutkan paling awal pada urutan naik)
+_DATETIME_NULL = datetime(1900, 1, 1)
+_STRING_NULL = ""
+
+# Kolom yang dapat dipakai untuk mengurutkan laporan: nama -> (ekspresi SQL, tipe nilai cursor)
+SORT_COLUMNS = {
+    # tanggal selalu terisi (default waktu insert) sehingga dipakai langsung agar index ix_absensi_tanggal_id terpakai
+    "tanggal": (Absensi.tanggal, "datetime"),
+    "jam_masuk": (func.coalesce(Absensi.jam_masuk, literal(_DATETIME_NULL)), "datetime"),
+    "jam_keluar": (func.coalesce(Absensi.jam_keluar, literal(_DATETIME_NULL)), "datetime"),
+    "nama": (Karyawan.nama, "string"),
+    "departemen": (Karyawan.departemen, "string"),
+    "status": (func.coalesce(Absensi.status, literal(_STRING_NULL)), "string"),
+}
+DEFAULT_SORT = "tanggal"
+
+# Status absensi yang ditawarkan di filter (tanpa memindai tabel absensi)
+STATUS_OPTIONS = ["Hadir", "Terlambat"]
+
+# Kolom yang dipilih untuk setiap baris laporan
+REPORT_COLUMNS = (
+    Absensi.id,
+    Absensi.karyawan_id,
+    Karyawan.nama,
+    Karyawan.departemen,
+    Absensi.tanggal,
+    Absensi.jam_masuk,
+    Absensi.jam_keluar,
+    Absensi.status,
+    Absensi.alamat,
+    Absensi.alamat_keluar,
+    Absensi.foto_masuk_hash,
+    Absensi.foto_keluar_hash,
+    Absensi.uang_makan,
+    Absensi.uang_transport,
+)
+
+
+def _parse_date(value, name):
+    if value is None or value == "":
+        return None
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Format {name} harus YYYY-MM-DD")
+
+
+def parse_filters(tanggal_mulai=None, tanggal_akhir=None, karyawan_id=None, departemen=None, status=None):
+    """
+    Memvalidasi dan menormalkan parameter filter laporan.
+
+    Args:
+        tanggal_mulai (str, optional): Tanggal awal (YYYY-MM-DD), inklusif
+        tanggal_akhir (str, optional): Tanggal akhir (YYYY-MM-DD), inklusif
+        karyawan_id (int, optional): ID karyawan
+        departemen (str, optional): Nama departemen
+        status (str, optional): Status absensi (Hadir, Terlambat, dll)
+
+    Returns:
+        dict: Filter yang sudah dinormalkan (nilai kosong dihapus)
+
+    Raises:
+        ValueError: Jika format tanggal tidak valid atau rentang tanggal terbalik
+    """
+    filters = {
+        "tanggal_mulai": _parse_date(tanggal_mulai, "tanggal_mulai"),
+        "tanggal_akhir": _parse_date(tanggal_akhir, "tanggal_akhir"),
+        "karyawan_id": karyawan_id,
+        "departemen": departemen or None,
+        "status": status or None,
+    }
+    if filters["tanggal_mulai"] and filters["tanggal_akhir"] and filters["tanggal_mulai"] > filters["tanggal_akhir"]:
+        raise ValueError("tanggal_mulai tidak boleh setelah tanggal_akhir")
+    return {key: value for key, value in filters.items() if value is not None}
+
+
+def apply_filters(query, filters):
+    """
+    Menerapkan filter laporan ke query absensi yang sudah di-join dengan karyawan.
+
+    Filter tanggal memakai kolom tanggal_hari sehingga rentang tanggal inklusif
+    dan dapat memakai index.
+
+    Args:
+        query (Query): Query SQLAlchemy
+        filters (dict): Hasil parse_filters
+
+    Returns:
+        Query: Query dengan klausa WHERE tambahan
+    """
+    if "tanggal_mulai" in filters:
+        query = query.filter(Absensi.tanggal_hari >= filters["tanggal_mulai"])
+    if "tanggal_akhir" in filters:
+        query = query.filter(Absensi.tanggal_hari <= filters["tanggal_akhir"])
+    if "karyawan_id" in filters:
+        query = query.filter(Absensi.karyawan_id == filters["karyawan_id"])
+    if "departemen" in filters:
+        query = query.filter(Karyawan.departemen == filters["departemen"])
+    if "status" in filters:
+        query = query.filter(Absensi.status == filters["status"])
+    return query
+
+
+def filter_absensi(filters):
+    """
+    Menyusun filter laporan sebagai klausa pada tabel absensi saja (tanpa join).
+
+    Dipakai untuk UPDATE set-based yang tidak dapat memakai join; filter departemen
+    diterapkan melalui subquery ID karyawan.
+
+    Args:
+        filters (dict): Hasil parse_filters
+
+    Returns:
+        list: Klausa WHERE untuk tabel absensi
+    """
+    kondisi = []
+    if "tanggal_mulai" in filters:
+        kondisi.append(Absensi.tanggal_hari >= filters["tanggal_mulai"])
+    if "tanggal_akhir" in filters:
+        kondisi.append(Absensi.tanggal_hari <= filters["tanggal_akhir"])
+    if "karyawan_id" in filters:
+        kondisi.append(Absensi.karyawan_id == filters["karyawan_id"])
+    if "departemen" in filters:
+        kondisi.append(Absensi.karyawan_id.in_(
+            select(Karyawan.id).where(Karyawan.departemen == filters["departemen"])
+        ))
+    if "status" in filters:
+        kondisi.append(Absensi.status == filters["status"])
+    return kondisi
+
+
+def report_query(db, filters, columns=REPORT_COLUMNS):
+    """
+    Membuat query laporan absensi berfilter dengan kolom minimal.
+
+    Args:
+        db (Session): Session database
+        filters (dict): Hasil parse_filters
+        columns (tuple): Kolom yang dipilih
+
+    Returns:
+        Query: Query absensi join karyawan dengan filter diterapkan
+    """
+    query = db.query(*columns).join(Karyawan, Absensi.karyawan_id == Karyawan.id)
+    return apply_filters(query, filters)
+
+
+def encode_cursor(sort_value, row_id):
+    """
+    Mengubah posisi baris terakhir halaman menjadi cursor string (base64 URL-safe).
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, value_type):
+    """
+    Membaca kembali cursor yang dibuat encode_cursor.
+
+    Args:
+        cursor (str): Cursor dari halaman sebelumnya
+        value_type (str): Tipe nilai kolom urutan ("datetime" atau "string")
+
+    Returns:
+        tuple: (nilai kolom urutan, ID baris)
+
+    Raises:
+        ValueError: Jika cursor tidak valid
+    """
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if value_type == "datetime":
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except Exception:
+        raise ValueError("Cursor halaman tidak valid")
+
+
+def _sort_value(value, value_type):
+    # Nilai urutan tanpa NULL, sama dengan nilai pengganti COALESCE di SORT_COLUMNS
+    if value is None:
+        return _DATETIME_NULL if value_type == "datetime" else _STRING_NULL
+    return value
+
+
+def _arsip_terlewati(sort, direction, last_value, entries, limit):
+    """
+    Memeriksa apakah baris arsip pasti tidak masuk halaman ini (tanpa membaca arsip).
+
+    Semua baris arsip bertanggal sebelum arsip_absensi.awal_live(), sehingga untuk
+    urutan tanggal arsip dapat dilewati jika halaman sudah penuh dengan baris yang
+    lebih baru (urutan turun) atau cursor sudah melewati batas arsip (urutan naik).
+    """
+    if sort != "tanggal":
+        return False
+    awal_live = arsip_absensi.awal_live()
+    if awal_live is None:
+        return True
+    batas = datetime.combine(awal_live, datetime.min.time())
+    if direction == "desc":
+        return len(entries) > limit and entries[limit][0] >= batas
+    return last_value is not None and last_value >= batas
+
+
+def fetch_page(db, filters, sort=DEFAULT_SORT, direction="desc", cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Mengambil satu halaman laporan absensi dengan keyset pagination.
+
+    Args:
+        db (Session): Session database
+        filters (dict): Hasil parse_filters
+        sort (str): Nama kolom urutan (lihat SORT_COLUMNS)
+        direction (str): "asc" atau "desc"
+        cursor (str, optional): Cursor dari halaman sebelumnya (None untuk halaman pertama)
+        limit (int): Jumlah baris per halaman
+
+    Returns:
+        dict: Baris halaman ini ("data"), cursor halaman berikutnya ("next_cursor",
+              None jika sudah halaman terakhir), dan total baris berfilter ("total",
+              hanya dihitung pada halaman pertama)
+
+    Raises:
+        ValueError: Jika kolom urutan, arah urutan atau cursor tidak valid
+    """
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Kolom urutan tidak dikenal: {sort}")
+    if direction not in ("asc", "desc"):
+        raise ValueError("Arah urutan harus asc atau desc")
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    sort_expr, value_type = SORT_COLUMNS[sort]
+    query = report_query(db, filters, REPORT_COLUMNS + (sort_expr.label("sort_key"),))
+
+    total = None
+    last_value = last_id = None
+    if cursor is None:
+        total = report_query(db, filters, (func.count(Absensi.id),)).scalar()
+    else:
+        # Lanjutkan tepat setelah baris terakhir halaman sebelumnya
+        last_value, last_id = decode_cursor(cursor, value_type)
+        if direction == "asc":
+            query = query.filter(or_(sort_expr > last_value, and_(sort_expr == last_value, Absensi.id > last_id)))
+        else:
+            query = query.filter(or_(sort_expr < last_value, and_(sort_expr == last_value, Absensi.id < last_id)))
+
+    if direction == "asc":
+        query = query.order_by(sort_expr.asc(), Absensi.id.asc())
+    else:
+        query = query.order_by(sort_expr.desc(), Absensi.id.desc())
+
+    # Ambil satu baris lebih untuk mengetahui apakah masih ada halaman berikutnya
+    entries = [(_sort_value(row.sort_key, value_type), row.id, row) for row in query.limit(limit + 1)]
+
+    # Gabungkan baris arsip yang cocok dengan filter dan posisi cursor (paling banyak limit + 1 per bulan)
+    if arsip_absensi.ada_arsip(filters):
+        karyawan = arsip_absensi.peta_karyawan(db)
+        if total is not None:
+            total += arsip_absensi.jumlah_arsip(filters, karyawan)
+        if not _arsip_terlewati(sort, direction, last_value, entries, limit):
+            entries.extend(arsip_absensi.halaman_arsip(
+                filters, karyawan, sort, direction == "desc",
+                None if cursor is None else (last_value, last_id),
+                limit + 1, _sort_value(None, value_type)
+            ))
+            entries.sort(key=lambda entry: entry[:2], reverse=direction == "desc")
+
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(entries[-1][0], entries[-1][1])
+
+    return {
+        "data": [serialize_row(row) for _, _, row in entries],
+        "next_cursor": next_cursor,
+        "total": total,
+    }
+
+
+def serialize_row(row):
+    """
+    Mengubah satu baris hasil report_query menjadi dict yang siap dikirim sebagai JSON.
+    """
+    return {
+        "id": row.id,
+        "karyawan_id": row.karyawan_id,
+        "nama": row.nama,
+        "departemen": row.departemen,
+        "tanggal": row.tanggal.strftime("%d/%m/%Y") if row.tanggal else None,
+        "jam_masuk": row.jam_masuk.strftime("%H:%M:%S") if row.jam_masuk else None,
+        "jam_keluar": row.jam_keluar.strftime("%H:%M:%S") if row.jam_keluar else None,
+        "status": row.status,
+        "alamat": row.alamat,
+        "alamat_keluar": row.alamat_keluar,
+        "foto_masuk_hash": row.foto_masuk_hash,
+        "foto_keluar_hash": row.foto_keluar_hash,
+        "uang_makan": bool(row.uang_makan),
+        "uang_transport": bool(row.uang_transport),
+    }
+
+
+def filter_options(db):
+    """
+    Mengambil pilihan filter laporan (daftar karyawan, departemen dan status).
+
+    Returns:
+        dict: karyawan (list of (id, nama)), departemen (list) dan status (list)
+    """
+    return {
+        "karyawan": db.query(Karyawan.id, Karyawan.nama).order_by(Karyawan.nama.asc()).all(),
+        "departemen": [row[0] for row in db.query(Karyawan.departemen).distinct().order_by(Karyawan.departemen.asc())],
+        "status": STATUS_OPTIONS,
+    }
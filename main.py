@@ -7,19 +7,22 @@ from fastapi.templating import Jinja2Templates
 # Import CORSMiddleware untuk menangani Cross-Origin Resource Sharing
 from fastapi.middleware.cors import CORSMiddleware
 # Import berbagai jenis response dari FastAPI
-from fastapi.responses import RedirectResponse, JSONResponse, HTMLResponse, FileResponse
+from fastapi.responses import RedirectResponse, JSONResponse, HTMLResponse, FileResponse, StreamingResponse
 # Import untuk autentikasi HTTP Basic
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 # Import Session dari SQLAlchemy untuk interaksi dengan database
 from sqlalchemy.orm import Session
+# Import AsyncSession dan select untuk query async di endpoint yang sering dipanggil
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 # Import fungsi-fungsi database dari modul database.py
-from database import engine, get_db, init_db
+from database import engine, async_engine, SessionLocal, get_db, get_async_db, init_db, pool_stats
 # Import model-model database dari modul models.py
 from models import Base, Karyawan, Absensi, Pengaturan, FaceEncoding
 # Import secrets untuk keamanan
 import secrets
 # Import datetime untuk manipulasi tanggal dan waktu
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 # Import logging untuk pencatatan log
 import logging
 # Import OpenCV untuk pemrosesan gambar dan deteksi wajah
@@ -36,8 +39,35 @@ import json
 import base64
 # Import uvicorn untuk menjalankan server
 import uvicorn
-# Import face_recognition untuk pengenalan wajah
-import face_recognition
+# Import galeri wajah in-memory untuk pencocokan login
+from face_gallery import face_gallery_service, get_gallery, save_face_template, FACE_MATCH_TOLERANCE
+from face_index import face_index_service
+# Import pool worker untuk deteksi dan encoding wajah di luar event loop
+from face_worker_pool import face_worker_pool, FaceWorkerError
+# Import micro-batcher encoding wajah untuk login yang datang bersamaan
+from face_batcher import face_batcher
+# Import tahap ingest gambar bersama (batas resolusi, decode tereduksi, konversi RGB sekali)
+from image_ingest import ingest_image, to_original_locations
+# Import query laporan absensi berfilter dengan keyset pagination
+import laporan
+# Import ekspor laporan absensi CSV/XLSX yang dialirkan per batch
+import ekspor_laporan
+# Import penyajian foto dengan thumbnail ter-cache dan header caching HTTP
+import foto_thumbnail
+# Import ringkasan absensi harian untuk dashboard
+import ringkasan_harian
+# Import pencarian absensi terbuka untuk absen keluar
+import absensi_terbuka
+# Import rekap absensi bulanan untuk penggajian
+import rekap_bulanan
+# Import cache pengaturan absensi dan penentuan status Hadir/Terlambat
+import pengaturan_absensi
+# Import perubahan massal uang makan dan uang transport absensi
+import tunjangan_absensi
+# Import arsip absensi lama untuk invalidasi peta karyawan di laporan
+import arsip_absensi
+# Import runner migrasi untuk pemeriksaan versi skema saat start
+import migrate
 
 # Konfigurasi logging untuk mencatat aktivitas aplikasi
 logging.basicConfig(
@@ -46,15 +76,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)  # Membuat logger untuk modul ini
 
-# Inisialisasi database dan membuat tabel jika belum ada
+# Periksa versi skema database (database baru dibuat otomatis, skema lama harus dimigrasi)
 try:
     # Pastikan Base memiliki semua model yang diperlukan
     from models import Karyawan, Absensi, Pengaturan, FaceEncoding
     logger.info("Models imported successfully")
 
-    # Membuat tabel berdasarkan model yang telah didefinisikan
-    Base.metadata.create_all(bind=engine)  # Membuat tabel di database
-    logger.info("Database tables created/verified successfully")
+    # Satu query ke schema_version alih-alih create_all dan inspect seluruh tabel
+    versi = migrate.check_schema(engine)
+    logger.info(f"Database schema version {versi:04d} verified successfully")
 except Exception as e:
     logger.error(f"Error initializing database: {str(e)}", exc_info=True)
     raise  # Raise exception jika terjadi error
@@ -78,6 +108,21 @@ app.add_middleware(
 # Menyajikan file statis (CSS, JavaScript, gambar) dari direktori "static"
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# Mulai pool worker wajah saat aplikasi start agar model dlib sudah dimuat sebelum login pertama
+@app.on_event("startup")
+async def start_face_worker_pool():
+    face_worker_pool.start()
+
+# Hentikan pool worker wajah saat aplikasi berhenti
+@app.on_event("shutdown")
+async def stop_face_worker_pool():
+    face_worker_pool.shutdown()
+
+# Tutup koneksi engine async saat aplikasi berhenti
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
 # Endpoint untuk favicon.ico
 @app.get("/favicon.ico", include_in_schema=False)
 async def favicon():
@@ -92,25 +137,6 @@ async def favicon():
 # Konfigurasi template engine Jinja2 untuk merender halaman HTML
 templates = Jinja2Templates(directory="templates")
 
-# Mendaftarkan filter b64encode untuk template Jinja2
-# Filter ini digunakan untuk mengkonversi data biner (foto) ke format base64 untuk ditampilkan di HTML
-def b64encode_filter(data):
-    """
-    Mengkonversi data biner ke format base64 string
-
-    Args:
-        data: Data biner yang akan dikonversi
-
-    Returns:
-        String base64 dari data biner, atau string kosong jika data kosong
-    """
-    if data:
-        return base64.b64encode(data).decode('utf-8')
-    return ''
-
-# Mendaftarkan filter ke template engine
-templates.env.filters['b64encode'] = b64encode_filter
-
 # Kredensial admin untuk login
 # Dalam aplikasi produksi, ini seharusnya disimpan dengan aman (misalnya di environment variables)
 ADMIN_USERNAME = "admin"  # Username admin
@@ -164,35 +190,26 @@ async def admin_login_post(request: Request, username: str = Form(...), password
         )
 
 @app.get("/admin/dashboard")
-async def admin_dashboard(request: Request, db: Session = Depends(get_db)):
+async def admin_dashboard(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Endpoint untuk menampilkan dashboard admin dengan ringkasan data absensi hari ini
 
     Args:
         request (Request): Request object dari FastAPI
-        db (Session): Session database dari dependency
+        db (AsyncSession): Session database async dari dependency
 
     Returns:
         TemplateResponse: Halaman dashboard admin dengan data absensi
     """
     try:
-        # Mendapatkan total jumlah karyawan
-        total_karyawan = db.query(Karyawan).count()  # Hitung jumlah karyawan
-        logger.debug(f"Total karyawan: {total_karyawan}")
-
-        # Mendapatkan data absensi hari ini
-        today = datetime.now().date()  # Tanggal hari ini
-        absensi_hari_ini = db.query(Absensi).filter(
-            Absensi.tanggal >= today  # Filter absensi untuk hari ini
-        ).all()
-        logger.debug(f"Total absensi hari ini: {len(absensi_hari_ini)}")
-
-        # Menghitung jumlah karyawan berdasarkan status kehadiran
-        hadir = len([a for a in absensi_hari_ini if a.status == "Hadir"])  # Jumlah karyawan hadir
-        terlambat = len([a for a in absensi_hari_ini if a.status == "Terlambat"])  # Jumlah karyawan terlambat
-        tidak_hadir = total_karyawan - (hadir + terlambat)  # Jumlah karyawan tidak hadir
+        # Baca satu baris ringkasan hari ini (seluruh perusahaan) dari tabel ringkasan_harian
+        ringkasan = await db.run_sync(ringkasan_harian.ambil_ringkasan)
+        total_karyawan = ringkasan.total_karyawan  # Jumlah karyawan
+        hadir = ringkasan.hadir  # Jumlah karyawan hadir
+        terlambat = ringkasan.terlambat  # Jumlah karyawan terlambat
+        tidak_hadir = ringkasan.belum_absen  # Jumlah karyawan yang belum absen
 
-        logger.debug(f"Hadir: {hadir}, Terlambat: {terlambat}, Tidak Hadir: {tidak_hadir}")
+        logger.debug(f"Total karyawan: {total_karyawan}, Hadir: {hadir}, Terlambat: {terlambat}, Tidak Hadir: {tidak_hadir}")
 
         # Render template dashboard dengan data
         return templates.TemplateResponse(
@@ -234,12 +251,11 @@ async def admin_datakaryawan(request: Request, db: Session = Depends(get_db)):
             logger.debug(f"  Nama: {karyawan.nama}")
             logger.debug(f"  Email: {karyawan.email}")
             logger.debug(f"  Status: {karyawan.status}")
-            logger.debug(f"  Has Foto: {bool(karyawan.foto)}")
+            logger.debug(f"  Has Foto: {bool(karyawan.foto_hash)}")
 
         template_data = {
             "request": request,
-            "karyawan_list": karyawan_list,
-            "b64encode": lambda x: base64.b64encode(x).decode('utf-8') if x else ''
+            "karyawan_list": karyawan_list
         }
 
         logger.debug(f"Rendering template with {len(karyawan_list)} karyawan")
@@ -370,6 +386,7 @@ async def tambah_karyawan(
             db.add(new_karyawan)  # Tambahkan objek ke session
             db.commit()  # Simpan perubahan ke database
             db.refresh(new_karyawan)  # Refresh objek dengan data dari database
+            ringkasan_harian.segarkan_total_karyawan(db)  # Jumlah karyawan di ringkasan hari ini
             logging.info("Committed to database successfully")
 
             # Simpan juga foto ke folder face_data jika ada
@@ -400,30 +417,21 @@ async def tambah_karyawan(
             # Generate dan simpan encoding wajah
             if foto_data:
                 try:
-                    # Load gambar dari bytes
-                    image = face_recognition.load_image_file(io.BytesIO(foto_data))
+                    # Decode gambar dengan resolusi dibatasi dan langsung dalam format RGB
+                    image, _ = ingest_image(foto_data)
 
-                    # Deteksi wajah terlebih dahulu
-                    face_locations = face_recognition.face_locations(image)
-                    logger.info(f"Jumlah wajah terdeteksi dalam foto karyawan baru: {len(face_locations)}")
+                    # Deteksi wajah dan hitung encoding di pool worker agar event loop tidak terblokir
+                    face_locations, encodings, timings = await face_worker_pool.encode_faces(image, strategy="hog")
+                    logger.info(f"Jumlah wajah terdeteksi dalam foto karyawan baru: {len(face_locations)} (waktu ms: {timings})")
 
                     if face_locations:
-                        # Dapatkan encoding wajah
-                        encodings = face_recognition.face_encodings(image, face_locations)
-
                         if encodings:
-                            # Jika wajah terdeteksi, simpan encoding
+                            # Jika wajah terdeteksi, simpan encoding sebagai template wajah pertama
                             face_encoding_array = encodings[0]
-
-                            # Buat objek FaceEncoding baru
-                            new_encoding = FaceEncoding(karyawan_id=new_karyawan.id)
-
-                            # Gunakan metode set_encoding_array untuk menyimpan encoding sebagai JSON
-                            new_encoding.set_encoding_array(face_encoding_array)
-
-                            # Tambahkan ke database
-                            db.add(new_encoding)
+                            new_encoding, _ = save_face_template(db, new_karyawan.id, face_encoding_array)
                             db.commit()
+                            # Tambahkan template ke galeri wajah in-process tanpa memuat ulang galeri
+                            face_gallery_service.add(new_karyawan.id, new_encoding.id, face_encoding_array)
 
                             logger.info(f"Encoding wajah berhasil disimpan untuk karyawan baru (ID: {new_karyawan.id})")
                         else:
@@ -537,6 +545,7 @@ async def update_karyawan(
         karyawan.email = email.lower().strip()
         karyawan.no_telepon = no_telepon
         karyawan.jabatan = jabatan
+        departemen_lama = karyawan.departemen
         karyawan.departemen = departemen
         karyawan.alamat = alamat
         karyawan.tanggal_bergabung = datetime.strptime(tanggal_bergabung, "%Y-%m-%d")
@@ -545,6 +554,14 @@ async def update_karyawan(
             # Simpan perubahan ke database
             db.commit()  # Simpan perubahan ke database
             logging.info(f"Successfully updated karyawan {karyawan_id}")
+            arsip_absensi.invalidasi_karyawan()  # Nama dan departemen baru untuk baris arsip di laporan
+
+            # Perbarui ringkasan hari ini: pindah departemen memindahkan counter absensi
+            if departemen != departemen_lama:
+                today = datetime.now().date()
+                ringkasan_harian.rebuild(db, today, today)
+            else:
+                ringkasan_harian.segarkan_total_karyawan(db)
             return JSONResponse(content={"message": "Data berhasil diperbarui"})
         except Exception as e:
             # Rollback jika terjadi error saat menyimpan data
@@ -622,46 +639,44 @@ async def delete_karyawan(karyawan_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Karyawan tidak ditemukan")
 
     # Hapus karyawan dari database
+    absensi_terbuka.tutup(db, karyawan_id)  # Absensi terbuka karyawan ini tidak berlaku lagi
+    rekap_bulanan.hapus_karyawan(db, karyawan_id)  # Rekap bulanan karyawan ini tidak dipakai lagi
     db.delete(karyawan)  # Hapus objek dari database
     db.commit()  # Simpan perubahan ke database
+    ringkasan_harian.segarkan_total_karyawan(db)  # Jumlah karyawan di ringkasan hari ini
+    face_gallery_service.remove(karyawan_id)  # Encoding wajah karyawan ini tidak boleh lagi cocok saat login
+    arsip_absensi.invalidasi_karyawan()  # Baris arsip karyawan ini tidak lagi muncul di laporan
     return {"status": "success"}
 
 @app.get("/admin/laporanabsensi")
 async def admin_laporanabsensi(request: Request, db: Session = Depends(get_db)):
     """
-    Endpoint untuk menampilkan laporan absensi karyawan
+    Endpoint untuk menampilkan halaman laporan absensi karyawan
+
+    Halaman hanya berisi kerangka tabel dan pilihan filter; baris absensi diambil
+    per halaman dari /admin/laporanabsensi/data.
 
     Args:
         request (Request): Request object dari FastAPI
         db (Session): Session database dari dependency
 
     Returns:
-        TemplateResponse: Halaman laporan absensi dengan data absensi
+        TemplateResponse: Halaman laporan absensi dengan pilihan filter
     """
     try:
-        # Log the start of the function
-        logger.info("Fetching attendance data for admin report")
-
-        # Ambil semua data absensi dari database
-        absensi_list = db.query(Absensi).all()  # Dapatkan semua data absensi
-        logger.info(f"Retrieved {len(absensi_list)} attendance records")
-
-        # Log some details about the records for debugging
-        for absensi in absensi_list:
-            logger.debug(f"Attendance ID: {absensi.id}, Employee: {absensi.karyawan.nama if absensi.karyawan else 'Unknown'}")
-            logger.debug(f"  Date: {absensi.tanggal}")
-            logger.debug(f"  Check-in time: {absensi.jam_masuk}")
-            logger.debug(f"  Check-out time: {absensi.jam_keluar}")
-            logger.debug(f"  Check-in location: {absensi.alamat}")
-            logger.debug(f"  Check-out location: {absensi.alamat_keluar}")
-            logger.debug(f"  Has check-in photo: {bool(absensi.foto_masuk)}")
-            logger.debug(f"  Has check-out photo: {bool(absensi.foto_keluar)}")
-
-        # Render template with attendance data
+        # Ambil pilihan filter (karyawan, departemen, status) tanpa memuat data absensi
+        options = laporan.filter_options(db)
+
         logger.info("Rendering admin-laporanabsensi.html template")
         return templates.TemplateResponse(
             "admin-laporanabsensi.html",
-            {"request": request, "absensi_list": absensi_list}
+            {
+                "request": request,
+                "karyawan_list": options["karyawan"],
+                "departemen_list": options["departemen"],
+                "status_list": options["status"],
+                "page_size": laporan.DEFAULT_PAGE_SIZE
+            }
         )
     except Exception as e:
         # Log any errors that occur
@@ -670,11 +685,111 @@ async def admin_laporanabsensi(request: Request, db: Session = Depends(get_db)):
             "admin-laporanabsensi.html",
             {
                 "request": request,
-                "error": f"Terjadi kesalahan saat memuat data absensi: {str(e)}",
-                "absensi_list": []
+                "error": f"Terjadi kesalahan saat memuat halaman laporan: {str(e)}",
+                "karyawan_list": [],
+                "departemen_list": [],
+                "status_list": [],
+                "page_size": laporan.DEFAULT_PAGE_SIZE
             }
         )
 
+@app.get("/admin/laporanabsensi/data")
+async def admin_laporanabsensi_data(
+    tanggal_mulai: str = None,  # Tanggal awal (YYYY-MM-DD), inklusif
+    tanggal_akhir: str = None,  # Tanggal akhir (YYYY-MM-DD), inklusif
+    karyawan_id: int = None,  # Filter karyawan
+    departemen: str = None,  # Filter departemen
+    status: str = None,  # Filter status absensi
+    sort: str = laporan.DEFAULT_SORT,  # Kolom urutan
+    direction: str = "desc",  # Arah urutan: asc atau desc
+    cursor: str = None,  # Cursor halaman berikutnya dari response sebelumnya
+    limit: int = laporan.DEFAULT_PAGE_SIZE,  # Jumlah baris per halaman
+    db: Session = Depends(get_db)
+):
+    """
+    Endpoint data laporan absensi per halaman (keyset pagination)
+
+    Filter, urutan dan pagination dijalankan di SQL sehingga hanya baris halaman
+    yang diminta (tanpa isi foto) yang dibaca dari database.
+
+    Returns:
+        JSONResponse: data (baris halaman), next_cursor (None jika halaman terakhir),
+                      total (jumlah baris berfilter, hanya pada halaman pertama)
+
+    Raises:
+        HTTPException: 400 jika parameter filter, urutan atau cursor tidak valid
+    """
+    try:
+        filters = laporan.parse_filters(tanggal_mulai, tanggal_akhir, karyawan_id, departemen, status)
+        page = laporan.fetch_page(db, filters, sort=sort, direction=direction, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return JSONResponse(content=page)
+
+@app.get("/admin/laporanabsensi/export")
+async def admin_laporanabsensi_export(
+    format: str = "xlsx",  # Format file: csv atau xlsx
+    judul: str = "Laporan Absensi",  # Judul di kop laporan dan nama file
+    tanggal_mulai: str = None,  # Tanggal awal (YYYY-MM-DD), inklusif
+    tanggal_akhir: str = None,  # Tanggal akhir (YYYY-MM-DD), inklusif
+    karyawan_id: int = None,  # Filter karyawan
+    departemen: str = None,  # Filter departemen
+    status: str = None  # Filter status absensi
+):
+    """
+    Endpoint ekspor laporan absensi ke CSV atau XLSX
+
+    Memakai filter yang sama dengan /admin/laporanabsensi/data. File dikirim
+    secara streaming sambil baris dibaca per batch dari database, tanpa kolom foto.
+
+    Returns:
+        StreamingResponse: File CSV atau XLSX sebagai lampiran unduhan
+
+    Raises:
+        HTTPException: 400 jika format atau parameter filter tidak valid
+    """
+    try:
+        filters = laporan.parse_filters(tanggal_mulai, tanggal_akhir, karyawan_id, departemen, status)
+        content = ekspor_laporan.iter_export(SessionLocal, filters, format, judul)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        content,
+        media_type=ekspor_laporan.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{ekspor_laporan.nama_file(judul, format)}"'}
+    )
+
+@app.get("/admin/rekap-bulanan")
+async def admin_rekap_bulanan(
+    bulan: str = None,  # Bulan rekap (YYYY-MM), default bulan ini
+    departemen: str = None,  # Filter departemen
+    db: Session = Depends(get_db)
+):
+    """
+    Endpoint rekap absensi bulanan per karyawan untuk penggajian
+
+    Data dibaca dari tabel rekap_bulanan (diperbarui setiap kali absensi berubah),
+    bukan dihitung dari tabel absensi.
+
+    Returns:
+        JSONResponse: bulan dan data (hari hadir, jam kerja, hari uang makan dan
+                      hari uang transport per karyawan)
+
+    Raises:
+        HTTPException: 400 jika format bulan tidak valid
+    """
+    try:
+        bulan_rekap = rekap_bulanan.parse_bulan(bulan) if bulan else rekap_bulanan.bulan_dari(datetime.now().date())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return JSONResponse(content={
+        "bulan": bulan_rekap.strftime("%Y-%m"),
+        "data": rekap_bulanan.ambil_rekap(db, bulan_rekap, departemen)
+    })
+
 @app.get("/admin/pengaturan")
 async def admin_pengaturan(request: Request, db: Session = Depends(get_db)):
     """
@@ -702,6 +817,7 @@ async def update_pengaturan(
     jam_masuk: str = Form(...),  # Jam masuk kerja (format HH:MM)
     jam_keluar: str = Form(...),  # Jam keluar kerja (format HH:MM)
     toleransi_keterlambatan: int = Form(...),  # Toleransi keterlambatan dalam menit
+    terapkan_sejak: str = Form(None),  # Hitung ulang status absensi sejak tanggal ini (YYYY-MM-DD), opsional
     db: Session = Depends(get_db)  # Session database
 ):
     """
@@ -712,11 +828,21 @@ async def update_pengaturan(
         jam_masuk (str): Jam masuk kerja (format HH:MM)
         jam_keluar (str): Jam keluar kerja (format HH:MM)
         toleransi_keterlambatan (int): Toleransi keterlambatan dalam menit
+        terapkan_sejak (str, optional): Tanggal awal hitung ulang status Hadir/Terlambat
+                                        absensi lama sampai hari ini
         db (Session): Session database
 
     Returns:
         RedirectResponse: Redirect kembali ke halaman pengaturan
+
+    Raises:
+        HTTPException: 400 jika format terapkan_sejak tidak valid
     """
+    try:
+        tanggal_mulai = date.fromisoformat(terapkan_sejak) if terapkan_sejak else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Format terapkan_sejak harus YYYY-MM-DD")
+
     # Cari pengaturan yang ada atau buat baru jika belum ada
     pengaturan = db.query(Pengaturan).first()
     if not pengaturan:
@@ -730,10 +856,113 @@ async def update_pengaturan(
     # Simpan ke database
     db.add(pengaturan)  # Tambahkan objek ke session
     db.commit()  # Simpan perubahan ke database
+    pengaturan_absensi.invalidasi()  # Absen masuk berikutnya memakai pengaturan baru
+
+    # Terapkan jam masuk dan toleransi baru ke status absensi lama (satu UPDATE)
+    if tanggal_mulai:
+        jumlah = pengaturan_absensi.hitung_ulang_status(db, tanggal_mulai, datetime.now().date())
+        logger.info(f"Status {jumlah} absensi sejak {tanggal_mulai} dihitung ulang")
 
     # Redirect kembali ke halaman pengaturan
     return RedirectResponse(url="/admin/pengaturan", status_code=303)
 
+@app.get("/admin/face-metrics")
+async def admin_face_metrics():
+    """
+    Endpoint untuk melihat metrik pool worker wajah dan micro-batching login
+
+    Returns:
+        JSONResponse: Statistik pool worker dan batcher (termasuk tingkat pengisian batch)
+    """
+    return JSONResponse(content={
+        "worker_pool": face_worker_pool.stats(),
+        "batcher": face_batcher.stats()
+    })
+
+@app.get("/admin/db-metrics")
+async def admin_db_metrics():
+    """
+    Endpoint untuk melihat statistik connection pool database
+
+    Returns:
+        JSONResponse: Backend database, versi skema, dan statistik pool engine sync dan async
+                      (size, checkedin, checkedout dan overflow untuk database server)
+    """
+    return JSONResponse(content={
+        "backend": engine.dialect.name,
+        "schema_version": migrate.versi_skema(),
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine)
+    })
+
+# Endpoint foto bersifat sync: FastAPI menjalankannya di threadpool sehingga
+# pembuatan thumbnail pertama kali tidak memblokir event loop
+@app.get("/foto/{sha256}/thumb")
+def foto_thumb(sha256: str, request: Request, db: Session = Depends(get_db)):
+    """
+    Endpoint untuk menyajikan thumbnail foto karyawan atau absensi
+
+    Thumbnail dibuat sekali lalu disimpan di tabel foto_thumbnail. Hash foto
+    dipakai sebagai ETag kuat sehingga permintaan ulang dijawab 304.
+
+    Args:
+        sha256 (str): Hash SHA-256 foto (kolom foto_hash, foto_masuk_hash atau foto_keluar_hash)
+        request (Request): Request object dari FastAPI
+        db (Session): Session database
+
+    Returns:
+        Response: Thumbnail JPEG, atau 304 Not Modified
+
+    Raises:
+        HTTPException: Jika foto tidak ditemukan
+    """
+    foto = foto_thumbnail.get_foto_info(db, sha256)
+    if not foto:
+        raise HTTPException(status_code=404, detail="Foto tidak ditemukan")
+
+    size = foto_thumbnail.FOTO_THUMBNAIL_SIZE
+    response = foto_thumbnail.cached_response(
+        request,
+        etag=f'"{sha256}-t{size}"',
+        last_modified=foto.created_at,
+        load_content=lambda: foto_thumbnail.get_thumbnail(db, sha256, size),
+        content_type=foto_thumbnail.media_type
+    )
+    if response is None:
+        raise HTTPException(status_code=404, detail="Foto tidak ditemukan")
+    return response
+
+@app.get("/foto/{sha256}")
+def foto_full(sha256: str, request: Request, db: Session = Depends(get_db)):
+    """
+    Endpoint untuk menyajikan foto karyawan atau absensi dalam ukuran asli
+
+    Args:
+        sha256 (str): Hash SHA-256 foto
+        request (Request): Request object dari FastAPI
+        db (Session): Session database
+
+    Returns:
+        Response: Foto asli, atau 304 Not Modified
+
+    Raises:
+        HTTPException: Jika foto tidak ditemukan
+    """
+    foto = foto_thumbnail.get_foto_info(db, sha256)
+    if not foto:
+        raise HTTPException(status_code=404, detail="Foto tidak ditemukan")
+
+    response = foto_thumbnail.cached_response(
+        request,
+        etag=f'"{sha256}"',
+        last_modified=foto.created_at,
+        load_content=lambda: foto.data,  # Kolom deferred, hanya dibaca jika bukan 304
+        content_type=foto_thumbnail.media_type
+    )
+    if response is None:
+        raise HTTPException(status_code=404, detail="Foto tidak ditemukan")
+    return response
+
 @app.get("/admin/logout")
 async def admin_logout():
     """
@@ -749,14 +978,19 @@ async def admin_logout():
 async def upload_foto(
     karyawan_id: int,  # ID karyawan yang akan diupdate fotonya
     foto: UploadFile = File(...),  # File foto yang diupload
+    ganti_semua: bool = Form(False),  # Ganti semua template wajah lama dengan foto ini
     db: Session = Depends(get_db)  # Session database
 ):
     """
-    Endpoint untuk mengupload foto karyawan dan menghasilkan encoding wajah
+    Endpoint untuk mengupload foto karyawan dan menambahkan template encoding wajah
+
+    Setiap foto menambah satu template wajah untuk karyawan (misalnya dengan kacamata
+    atau masker). Jika batas template tercapai, template terlama diganti.
 
     Args:
         karyawan_id (int): ID karyawan yang akan diupdate fotonya
         foto (UploadFile): File foto yang diupload
+        ganti_semua (bool): Jika True, semua template lama dihapus terlebih dahulu
         db (Session): Session database
 
     Returns:
@@ -812,12 +1046,12 @@ async def upload_foto(
 
         # Generate encoding wajah dari foto
         try:
-            # Load gambar dari bytes
-            image = face_recognition.load_image_file(io.BytesIO(foto_data))
+            # Decode gambar dengan resolusi dibatasi dan langsung dalam format RGB
+            image, _ = ingest_image(foto_data)
 
-            # Deteksi wajah terlebih dahulu
-            face_locations = face_recognition.face_locations(image)
-            logger.info(f"Jumlah wajah terdeteksi dalam foto update: {len(face_locations)}")
+            # Deteksi wajah dan hitung encoding di pool worker agar event loop tidak terblokir
+            face_locations, encodings, timings = await face_worker_pool.encode_faces(image, strategy="hog")
+            logger.info(f"Jumlah wajah terdeteksi dalam foto update: {len(face_locations)} (waktu ms: {timings})")
 
             if not face_locations:
                 # Wajah tidak terdeteksi pada foto
@@ -827,9 +1061,6 @@ async def upload_foto(
                     content={"message": "Wajah tidak terdeteksi pada foto yang diupload. Silakan upload foto yang jelas dengan pencahayaan yang baik."}
                 )
 
-            # Dapatkan encoding wajah
-            encodings = face_recognition.face_encodings(image, face_locations)
-
             if not encodings:
                 # Tidak dapat mengekstrak encoding wajah
                 logger.warning(f"Tidak dapat mengekstrak encoding wajah dari foto update untuk karyawan ID: {karyawan_id}")
@@ -842,23 +1073,29 @@ async def upload_foto(
             face_encoding_array = encodings[0]
             logger.info(f"Berhasil mendapatkan encoding wajah dari foto update untuk karyawan ID: {karyawan_id}")
 
-            # Cek apakah encoding sudah ada
-            face_encoding_obj = db.query(FaceEncoding).filter(FaceEncoding.karyawan_id == karyawan_id).first()
+            if ganti_semua:
+                # Hapus semua template lama, foto ini menjadi satu-satunya template
+                logger.info(f"Mengganti semua template wajah untuk karyawan ID: {karyawan_id}")
+                db.query(FaceEncoding).filter(FaceEncoding.karyawan_id == karyawan_id).delete(synchronize_session=False)
 
-            if face_encoding_obj:
-                # Update encoding yang sudah ada menggunakan metode set_encoding_array
-                logger.info(f"Mengupdate encoding wajah yang sudah ada untuk karyawan ID: {karyawan_id}")
-                face_encoding_obj.set_encoding_array(face_encoding_array)
-            else:
-                # Buat encoding baru
-                logger.info(f"Membuat encoding wajah baru untuk karyawan ID: {karyawan_id}")
-                new_encoding = FaceEncoding(karyawan_id=karyawan_id)
-                new_encoding.set_encoding_array(face_encoding_array)
-                db.add(new_encoding)  # Tambahkan encoding ke session
+            # Simpan sebagai template baru; jika batas template tercapai, template terlama diganti
+            template, removed_ids = save_face_template(db, karyawan_id, face_encoding_array)
 
             # Simpan perubahan ke database
             db.commit()  # Simpan perubahan ke database
+
+            # Perbarui galeri wajah in-process
+            if ganti_semua:
+                face_gallery_service.replace(karyawan_id, [(template.id, face_encoding_array)])
+            else:
+                for removed_id in removed_ids:
+                    face_gallery_service.remove_template(removed_id)
+                face_gallery_service.add(karyawan_id, template.id, face_encoding_array)
             logger.info(f"Encoding wajah berhasil disimpan untuk karyawan ID: {karyawan_id}")
+        except FaceWorkerError as e:
+            # Pool worker penuh (429) atau tidak tersedia/timeout (503); foto sudah tersimpan
+            logger.warning(f"Pool worker wajah menolak upload foto karyawan ID {karyawan_id}: {str(e)}")
+            return JSONResponse(status_code=e.status_code, content={"message": e.message})
         except Exception as e:
             # Tangani error jika terjadi
             logger.error(f"Error saat memproses encoding wajah: {str(e)}")
@@ -893,16 +1130,17 @@ async def verify_face(
     try:
         # Baca dan proses gambar yang diupload
         contents = await foto.read()  # Baca konten file
-        nparr = np.frombuffer(contents, np.uint8)  # Konversi ke numpy array
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)  # Decode gambar
 
-        # Konversi ke RGB untuk face_recognition (face_recognition menggunakan format RGB)
-        rgb_img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        # Decode gambar dengan resolusi dibatasi, langsung dalam format RGB untuk face_recognition
+        rgb_img, scale = ingest_image(contents)
 
         # Deteksi wajah menggunakan face_recognition (berbasis CNN)
         # face_recognition menggunakan model deep learning (ResNet) untuk deteksi wajah
         # yang jauh lebih akurat dan fleksibel terhadap variasi pose, jarak, dan pencahayaan
-        face_locations = face_recognition.face_locations(rgb_img, model="cnn")
+        # Strategi (cnn penuh, hog, atau cascade dua tahap) diatur lewat FACE_DETECTION_STRATEGY
+        # Deteksi dijalankan di pool worker agar event loop tidak terblokir
+        face_locations, timings = await face_worker_pool.detect_faces(rgb_img)
+        logger.info(f"Verifikasi wajah: {len(face_locations)} wajah terdeteksi (waktu ms: {timings})")
 
         # Cek apakah ada wajah yang terdeteksi
         if len(face_locations) == 0:
@@ -924,9 +1162,21 @@ async def verify_face(
         # Dalam aplikasi nyata, Anda mungkin ingin mengimplementasikan pengenalan wajah di sini
         return JSONResponse(content={
             "message": "Wajah terdeteksi",
-            "status": "success"
+            "status": "success",
+            # Lokasi wajah (top, right, bottom, left) dalam koordinat foto asli
+            "lokasi_wajah": list(to_original_locations(face_locations, scale)[0])
         })
 
+    except FaceWorkerError as e:
+        # Pool worker penuh (429) atau tidak tersedia/timeout (503)
+        logger.warning(f"Pool worker wajah menolak verifikasi: {str(e)}")
+        return JSONResponse(status_code=e.status_code, content={"message": e.message})
+
+    except ValueError as e:
+        # File bukan gambar yang dapat di-decode
+        logger.warning(f"Gambar verifikasi tidak valid: {str(e)}")
+        return JSONResponse(status_code=400, content={"message": "File bukan gambar yang valid"})
+
     except Exception as e:
         # Tangani error jika terjadi
         logging.error(f"Error verifying face: {str(e)}", exc_info=True)
@@ -953,7 +1203,7 @@ async def employee_login(request: Request):
 async def employee_login_post(
     request: Request,  # Request object dari FastAPI
     imageData: str = Form(...),  # Data gambar dalam format base64
-    db: Session = Depends(get_db)  # Session database
+    db: AsyncSession = Depends(get_async_db)  # Session database async
 ):
     """
     Endpoint untuk memproses login karyawan menggunakan pengenalan wajah
@@ -961,7 +1211,7 @@ async def employee_login_post(
     Args:
         request (Request): Request object dari FastAPI
         imageData (str): Data gambar dalam format base64
-        db (Session): Session database
+        db (AsyncSession): Session database async
 
     Returns:
         RedirectResponse: Redirect ke halaman absensi jika login berhasil
@@ -974,11 +1224,12 @@ async def employee_login_post(
     try:
         header, encoded = imageData.split(",", 1)  # Pisahkan header dan data
         img_bytes = base64.b64decode(encoded)  # Decode base64 menjadi bytes
-        nparr = np.frombuffer(img_bytes, np.uint8)  # Konversi ke numpy array
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)  # Decode gambar
 
-        # Verifikasi kualitas gambar
-        if img is None or img.size == 0:
+        # Decode gambar dengan resolusi dibatasi, langsung dalam format RGB untuk face_recognition
+        try:
+            rgb_img, scale = ingest_image(img_bytes)
+        except ValueError:
+            # Verifikasi kualitas gambar
             logger.error("Gambar tidak valid atau kosong")
             return templates.TemplateResponse(
                 "employee-login.html",
@@ -986,11 +1237,8 @@ async def employee_login_post(
             )
 
         # Cek ukuran gambar
-        height, width, _ = img.shape
-        logger.info(f"Ukuran gambar: {width}x{height} piksel")
-
-        # Konversi ke RGB untuk face_recognition
-        rgb_img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        height, width, _ = rgb_img.shape
+        logger.info(f"Ukuran gambar: {width}x{height} piksel (skala {scale:.2f})")
         logger.info("Berhasil memproses gambar")
     except Exception as e:
         # Gagal memproses gambar
@@ -1004,8 +1252,11 @@ async def employee_login_post(
     try:
         # Deteksi wajah menggunakan model CNN dari face_recognition
         # Model CNN memberikan deteksi yang lebih akurat dan fleksibel terhadap variasi pose dan jarak
-        face_locations = face_recognition.face_locations(rgb_img, model="cnn")
-        logger.info(f"Jumlah wajah terdeteksi: {len(face_locations)}")
+        # Strategi (cnn penuh, hog, atau cascade dua tahap) diatur lewat FACE_DETECTION_STRATEGY
+        # Deteksi dan encoding dijalankan di pool worker agar event loop tidak terblokir;
+        # login yang datang bersamaan digabung menjadi satu batch oleh face_batcher
+        face_locations, unknown_encodings, timings = await face_batcher.encode_faces(rgb_img)
+        logger.info(f"Jumlah wajah terdeteksi: {len(face_locations)} (waktu ms: {timings})")
 
         if not face_locations:
             logger.warning("Tidak ada wajah yang terdeteksi dalam gambar")
@@ -1014,8 +1265,6 @@ async def employee_login_post(
                 {"request": request, "error": "Wajah tidak terdeteksi. Pastikan wajah terlihat jelas dan coba lagi!"}
             )
 
-        # Dapatkan encoding wajah
-        unknown_encodings = face_recognition.face_encodings(rgb_img, face_locations)
         if not unknown_encodings:
             logger.warning("Tidak dapat mengekstrak encoding wajah")
             return templates.TemplateResponse(
@@ -1025,6 +1274,14 @@ async def employee_login_post(
 
         unknown_encoding = unknown_encodings[0]  # Ambil encoding pertama
         logger.info("Berhasil mendapatkan encoding wajah dari gambar")
+    except FaceWorkerError as e:
+        # Pool worker penuh (429) atau tidak tersedia/timeout (503)
+        logger.warning(f"Pool worker wajah menolak login: {str(e)}")
+        return templates.TemplateResponse(
+            "employee-login.html",
+            {"request": request, "error": e.message},
+            status_code=e.status_code
+        )
     except Exception as e:
         logger.error(f"Error saat ekstraksi encoding wajah: {str(e)}")
         return templates.TemplateResponse(
@@ -1032,69 +1289,27 @@ async def employee_login_post(
             {"request": request, "error": "Gagal memproses wajah. Coba lagi!"}
         )
 
-    # Ambil semua face encoding karyawan dari database
+    # Cocokkan encoding dengan galeri wajah in-memory
     try:
-        # Gunakan toleransi yang lebih tinggi untuk meningkatkan tingkat keberhasilan
-        # Nilai default adalah 0.6, semakin tinggi semakin toleran
-        # Meningkatkan ke 0.7 untuk deteksi yang lebih fleksibel terhadap jarak dan posisi
-        tolerance = 0.7
-
-        karyawan_list = db.query(Karyawan).all()
-        logger.info(f"Jumlah karyawan dalam database: {len(karyawan_list)}")
-
-        # Siapkan list untuk menyimpan hasil perbandingan
-        match_results = []
-
-        for karyawan in karyawan_list:
-            # Cari encoding wajah karyawan
-            face_encoding_obj = db.query(FaceEncoding).filter(FaceEncoding.karyawan_id == karyawan.id).first()
-
-            if face_encoding_obj:
-                try:
-                    # Gunakan metode get_encoding_array() untuk mendapatkan encoding dalam format numpy array
-                    import json
-
-                    # Coba parse encoding sebagai JSON
-                    try:
-                        # Jika encoding disimpan sebagai JSON string
-                        known_encoding = np.array(json.loads(face_encoding_obj.encoding))
-                        logger.info(f"Berhasil parse encoding sebagai JSON untuk karyawan {karyawan.nama}")
-                    except json.JSONDecodeError:
-                        # Jika encoding disimpan sebagai bytes
-                        known_encoding = np.frombuffer(face_encoding_obj.encoding, dtype=np.float64)
-                        logger.info(f"Berhasil parse encoding sebagai bytes untuk karyawan {karyawan.nama}")
-
-                    # Bandingkan encoding wajah
-                    face_distance = face_recognition.face_distance([known_encoding], unknown_encoding)[0]
-                    match = face_distance <= tolerance
-
-                    logger.info(f"Perbandingan dengan {karyawan.nama}: jarak={face_distance}, cocok={match}")
-                    match_results.append((karyawan, face_distance, match))
-
-                    if match:
-                        # Login berhasil, redirect ke halaman absensi dengan ID
-                        logger.info(f"Login berhasil untuk karyawan: {karyawan.nama} (ID: {karyawan.id})")
-                        response = RedirectResponse(url=f"/employee-absensi?id={karyawan.id}", status_code=303)
-                        response.set_cookie("notif_login", f"Selamat datang, {karyawan.nama}!")
-                        return response
-                except Exception as e:
-                    logger.error(f"Error saat membandingkan wajah untuk karyawan {karyawan.nama}: {str(e)}")
-            else:
-                logger.warning(f"Tidak ada encoding wajah untuk karyawan: {karyawan.nama} (ID: {karyawan.id})")
-
-        # Log hasil perbandingan
-        if match_results:
-            # Urutkan berdasarkan jarak (terkecil = paling mirip)
-            match_results.sort(key=lambda x: x[1])
-            best_match = match_results[0]
-            logger.info(f"Perbandingan terbaik: {best_match[0].nama}, jarak={best_match[1]}, cocok={best_match[2]}")
-
-            # Jika jarak terbaik cukup dekat tapi masih di atas threshold, coba dengan toleransi yang lebih tinggi
-            if best_match[1] <= 0.7:  # Toleransi yang lebih tinggi untuk kasus edge
-                logger.info(f"Mencoba dengan toleransi yang lebih tinggi untuk {best_match[0].nama}")
-                response = RedirectResponse(url=f"/employee-absensi?id={best_match[0].id}", status_code=303)
-                response.set_cookie("notif_login", f"Selamat datang, {best_match[0].nama}!")
+        # Galeri dimuat sekali dari tabel face_encoding ke dalam satu matriks NumPy,
+        # sehingga semua jarak dihitung dengan satu operasi vektor
+        # Pemuatan pertama galeri memakai Session sync melalui run_sync
+        gallery = await db.run_sync(get_gallery)
+        logger.info(f"Jumlah encoding wajah dalam galeri: {len(gallery)}")
+
+        # Mode pencarian (eksak atau index IVF) diatur lewat FACE_SEARCH_MODE, dengan fallback eksak
+        karyawan_id, best_distance = face_index_service.search(gallery, unknown_encoding, tolerance=FACE_MATCH_TOLERANCE)
+        logger.info(f"Perbandingan terbaik: karyawan ID {karyawan_id}, jarak={best_distance}")
+
+        if karyawan_id is not None:
+            karyawan = await db.get(Karyawan, karyawan_id)
+            if karyawan:
+                # Login berhasil, redirect ke halaman absensi dengan ID
+                logger.info(f"Login berhasil untuk karyawan: {karyawan.nama} (ID: {karyawan.id})")
+                response = RedirectResponse(url=f"/employee-absensi?id={karyawan.id}", status_code=303)
+                response.set_cookie("notif_login", f"Selamat datang, {karyawan.nama}!")
                 return response
+            logger.warning(f"Karyawan ID {karyawan_id} ada di galeri tetapi tidak ditemukan di database")
     except Exception as e:
         logger.error(f"Error saat memproses pengenalan wajah: {str(e)}")
 
@@ -1170,7 +1385,7 @@ async def absen_masuk(
     hari: str = Form(...),
     lat: float = Form(None),
     lon: float = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Endpoint untuk memproses absen masuk karyawan tanpa webcam (versi lama)
@@ -1181,7 +1396,7 @@ async def absen_masuk(
         hari (str): Hari absen
         lat (float): Koordinat latitude lokasi
         lon (float): Koordinat longitude lokasi
-        db (Session): Session database
+        db (AsyncSession): Session database async
 
     Returns:
         RedirectResponse: Redirect ke halaman absensi dengan notifikasi
@@ -1192,7 +1407,7 @@ async def absen_masuk(
         return RedirectResponse(url="/employee-login", status_code=303)
 
     # Ambil data karyawan dari database
-    karyawan = db.query(Karyawan).filter(Karyawan.nama == nama).first()
+    karyawan = (await db.execute(select(Karyawan).where(Karyawan.nama == nama))).scalars().first()
     if not karyawan:
         return RedirectResponse(url="/employee-login", status_code=303)
 
@@ -1200,11 +1415,13 @@ async def absen_masuk(
     today = datetime.now().date()
 
     # Cek apakah karyawan sudah absen masuk hari ini
-    existing_attendance = db.query(Absensi).filter(
-        Absensi.karyawan_id == karyawan.id,
-        Absensi.tanggal >= today,
-        Absensi.tanggal < today + timedelta(days=1)
-    ).first()
+    # Index seek pada ix_absensi_karyawan_tanggal_hari (karyawan_id, tanggal_hari)
+    existing_attendance = (await db.execute(
+        select(Absensi).where(
+            Absensi.karyawan_id == karyawan.id,
+            Absensi.tanggal_hari == today
+        ).limit(1)
+    )).scalars().first()
 
     if existing_attendance:
         # Jika sudah ada absensi dan belum ada jam keluar, berarti karyawan perlu absen keluar
@@ -1221,9 +1438,13 @@ async def absen_masuk(
 
     # Jika belum ada absensi hari ini, buat absensi baru
     try:
+        # Pastikan baris ringkasan hari ini ada sebelum transaksi absensi dimulai
+        await db.run_sync(ringkasan_harian.pastikan_ringkasan, today, karyawan.departemen)
+
         # Buat objek absensi baru
         current_time = datetime.now()
         alamat_str = f"{lat}, {lon}" if lat and lon else "Lokasi tidak tersedia"
+        pengaturan = await db.run_sync(pengaturan_absensi.ambil)  # Dari cache, tanpa query
 
         absensi = Absensi(
             karyawan_id=karyawan.id,
@@ -1233,16 +1454,19 @@ async def absen_masuk(
             hari=hari,
             latitude=lat,
             longitude=lon,
-            status="Hadir",
+            status=pengaturan.status_masuk(current_time),  # Hadir atau Terlambat sesuai jam masuk dan toleransi
             alamat=alamat_str,
             foto_masuk=None,  # Tidak ada foto untuk absen tanpa webcam
             keterangan=None,  # Tidak ada keterangan
             uang_makan=False  # Default uang makan: False
         )
 
-        # Simpan ke database
+        # Simpan ke database bersama counter ringkasan harian (satu transaksi)
         db.add(absensi)
-        db.commit()
+        await db.run_sync(absensi_terbuka.buka, absensi)
+        await db.run_sync(ringkasan_harian.catat_absen_masuk, today, karyawan.departemen, absensi.status)
+        await db.run_sync(rekap_bulanan.segarkan, karyawan.id, today)
+        await db.commit()
 
         # Set cookie notif dan redirect
         response = RedirectResponse(url=f"/employee-absensi?nama={nama}", status_code=303)
@@ -1250,7 +1474,7 @@ async def absen_masuk(
         return response
     except Exception as e:
         # Tangani error jika terjadi
-        db.rollback()
+        await db.rollback()
         response = RedirectResponse(url=f"/employee-absensi?nama={nama}", status_code=303)
         response.set_cookie("notif_absen", f"Gagal menyimpan absensi: {str(e)}")
         return response
@@ -1263,7 +1487,7 @@ async def absen_masuk_webcam_post(
     waktu: str = Form(...),  # Waktu absen (tidak digunakan, diganti dengan datetime.now())
     hari: str = Form(...),  # Hari absen (tidak digunakan)
     alamat: str = Form(...),  # Alamat/lokasi absen
-    db: Session = Depends(get_db)  # Session database
+    db: AsyncSession = Depends(get_async_db)  # Session database async
 ):
     """
     Endpoint untuk memproses absen masuk karyawan menggunakan webcam
@@ -1276,7 +1500,7 @@ async def absen_masuk_webcam_post(
         hari (str): Hari absen (tidak digunakan)
         alamat (str): Alamat/lokasi absen
         uang_makan (bool, optional): Status uang makan (default: False)
-        db (Session): Session database
+        db (AsyncSession): Session database async
 
     Returns:
         RedirectResponse: Redirect ke halaman absensi dengan notifikasi sukses atau error
@@ -1286,7 +1510,7 @@ async def absen_masuk_webcam_post(
     logger.info(f"Check-in location: {alamat}")
 
     # Ambil data karyawan dari database berdasarkan ID
-    karyawan = db.query(Karyawan).filter(Karyawan.id == id).first()
+    karyawan = await db.get(Karyawan, id)
     if not karyawan:
         # Karyawan tidak ditemukan, redirect ke halaman login
         logger.warning(f"Employee with ID {id} not found")
@@ -1299,11 +1523,13 @@ async def absen_masuk_webcam_post(
     logger.info(f"Current date: {today}")
 
     # Cek apakah karyawan sudah absen masuk hari ini
-    existing_attendance = db.query(Absensi).filter(
-        Absensi.karyawan_id == karyawan.id,
-        Absensi.tanggal >= today,
-        Absensi.tanggal < today + timedelta(days=1)
-    ).first()
+    # Index seek pada ix_absensi_karyawan_tanggal_hari (karyawan_id, tanggal_hari)
+    existing_attendance = (await db.execute(
+        select(Absensi).where(
+            Absensi.karyawan_id == karyawan.id,
+            Absensi.tanggal_hari == today
+        ).limit(1)
+    )).scalars().first()
 
     if existing_attendance:
         logger.warning(f"Employee {karyawan.nama} already has attendance record for today (ID: {existing_attendance.id})")
@@ -1337,6 +1563,7 @@ async def absen_masuk_webcam_post(
     # Buat objek absensi baru
     current_time = datetime.now()
     logger.info(f"Creating new attendance record with check-in time: {current_time}")
+    pengaturan = await db.run_sync(pengaturan_absensi.ambil)  # Pengaturan dari cache, tanpa query
 
     absensi = Absensi(
         karyawan_id=karyawan.id,  # ID karyawan
@@ -1344,7 +1571,7 @@ async def absen_masuk_webcam_post(
         jam_masuk=current_time,  # Jam masuk (waktu saat ini)
         waktu=waktu,  # Waktu dari form (untuk kompatibilitas)
         hari=hari,  # Hari dari form (untuk kompatibilitas)
-        status="Hadir",  # Status kehadiran
+        status=pengaturan.status_masuk(current_time),  # Status kehadiran: Hadir atau Terlambat
         alamat=alamat,  # Alamat/lokasi absen
         foto_masuk=foto_bytes,  # Foto saat absen masuk
         uang_makan=False,  # Status uang makan (default: False)
@@ -1352,9 +1579,15 @@ async def absen_masuk_webcam_post(
     )
 
     try:
-        # Simpan ke database
+        # Pastikan baris ringkasan hari ini ada sebelum transaksi absensi dimulai
+        await db.run_sync(ringkasan_harian.pastikan_ringkasan, today, karyawan.departemen)
+
+        # Simpan ke database bersama counter ringkasan harian (satu transaksi)
         db.add(absensi)  # Tambahkan objek ke session
-        db.commit()  # Simpan perubahan ke database
+        await db.run_sync(absensi_terbuka.buka, absensi)  # Catat sebagai absensi terbuka untuk absen keluar
+        await db.run_sync(ringkasan_harian.catat_absen_masuk, today, karyawan.departemen, absensi.status)
+        await db.run_sync(rekap_bulanan.segarkan, karyawan.id, today)  # Rekap bulanan karyawan ini
+        await db.commit()  # Simpan perubahan ke database
         logger.info(f"Successfully saved new attendance record with ID: {absensi.id}")
 
         # Buat response redirect dengan notifikasi
@@ -1365,7 +1598,7 @@ async def absen_masuk_webcam_post(
     except Exception as e:
         # Tangani error jika terjadi
         logger.error(f"Error saving attendance record: {str(e)}")
-        db.rollback()
+        await db.rollback()
 
         # Redirect dengan pesan error
         response = RedirectResponse(url=f"/employee-absensi?id={karyawan.id}", status_code=303)
@@ -1401,7 +1634,7 @@ async def absen_keluar_webcam_post(
     alamat: str = Form(...),  # Alamat/lokasi absen keluar
     uang_makan: bool = Form(False),  # Status uang makan (default: False)
     uang_transport: bool = Form(False),  # Status uang transportasi (default: False)
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Fungsi untuk memproses absen keluar karyawan menggunakan webcam
@@ -1412,7 +1645,7 @@ async def absen_keluar_webcam_post(
     - imageData: Foto karyawan dalam format base64
     - waktu: Waktu absen dari form (tidak digunakan)
     - alamat: Alamat/lokasi saat absen keluar
-    - db: Database session
+    - db: Database session async
 
     Return:
     - Redirect ke halaman employee-absensi dengan notifikasi sukses
@@ -1423,7 +1656,7 @@ async def absen_keluar_webcam_post(
     logger.info(f"Check-out time: {datetime.now()}")
 
     # Ambil data karyawan berdasarkan ID dari form
-    karyawan = db.query(Karyawan).filter(Karyawan.id == id).first()
+    karyawan = await db.get(Karyawan, id)
     if not karyawan:
         logger.error(f"Employee with ID {id} not found")
         return RedirectResponse(url="/employee-login", status_code=303)
@@ -1445,54 +1678,18 @@ async def absen_keluar_webcam_post(
 
     # Cari data absensi karyawan untuk hari ini
     try:
-        # Log the SQL query for debugging
-        query = db.query(Absensi).filter(
-            Absensi.karyawan_id == karyawan.id,
-            Absensi.tanggal == today
-        )
-        logger.info(f"SQL Query: {str(query)}")
-
-        # Try to get all records for this employee to see what's available
-        all_employee_records = db.query(Absensi).filter(
-            Absensi.karyawan_id == karyawan.id
-        ).all()
-
-        logger.info(f"Found {len(all_employee_records)} total records for employee {karyawan.id}")
-        for record in all_employee_records:
-            logger.info(f"Record ID: {record.id}, Date: {record.tanggal}, Type: {type(record.tanggal)}")
-            # Check if this record's date matches today
-            date_match = record.tanggal.date() == today if hasattr(record.tanggal, 'date') else record.tanggal == today
-            logger.info(f"Date match with today ({today})? {date_match}")
-
-        # Try to find the record for today, considering possible date format issues
-        absensi = None
-
-        # First try the original query
-        absensi = query.first()
-
-        # If not found, try to find the record by checking each record's date
-        if not absensi and all_employee_records:
-            logger.info("No record found with exact date match, trying alternative approach")
-            for record in all_employee_records:
-                # Try different ways to compare dates
-                if hasattr(record.tanggal, 'date'):
-                    # If tanggal is a datetime object
-                    if record.tanggal.date() == today:
-                        absensi = record
-                        logger.info(f"Found matching record using datetime.date() method: {record.id}")
-                        break
-                elif isinstance(record.tanggal, datetime):
-                    # Another way to check if it's a datetime
-                    if record.tanggal.date() == today:
-                        absensi = record
-                        logger.info(f"Found matching record using isinstance check: {record.id}")
-                        break
-                else:
-                    # Direct comparison
-                    if record.tanggal == today:
-                        absensi = record
-                        logger.info(f"Found matching record using direct comparison: {record.id}")
-                        break
+        # Absensi hari ini yang belum absen keluar: satu baris berdasarkan primary key karyawan
+        absensi = await db.run_sync(absensi_terbuka.cari, karyawan.id, today)
+
+        if not absensi:
+            # Tidak ada absensi terbuka: bedakan sudah absen keluar dan belum absen masuk
+            # melalui index ix_absensi_karyawan_tanggal_hari (hanya pada jalur ini)
+            absensi = (await db.execute(
+                select(Absensi).where(
+                    Absensi.karyawan_id == karyawan.id,
+                    Absensi.tanggal_hari == today
+                ).limit(1)
+            )).scalars().first()
 
         # Jika tidak ada absensi hari ini, beritahu karyawan untuk absen masuk terlebih dahulu
         if not absensi:
@@ -1515,6 +1712,9 @@ async def absen_keluar_webcam_post(
         logger.info(f"Current check-in time: {absensi.jam_masuk}")
         logger.info(f"Current check-out time: {absensi.jam_keluar}")
 
+        # Pastikan baris ringkasan hari ini ada sebelum perubahan absensi
+        await db.run_sync(ringkasan_harian.pastikan_ringkasan, absensi.tanggal_hari, karyawan.departemen)
+
         # Update data absen keluar
         current_time = datetime.now()
         logger.info(f"Setting check-out time to: {current_time}")
@@ -1525,19 +1725,22 @@ async def absen_keluar_webcam_post(
         absensi.alamat_keluar = alamat  # Simpan lokasi saat absen keluar
         absensi.uang_makan = uang_makan  # Simpan status uang makan
         absensi.uang_transport = uang_transport  # Simpan status uang transportasi
+        await db.run_sync(ringkasan_harian.catat_absen_keluar, absensi.tanggal_hari, karyawan.departemen)
+        await db.run_sync(absensi_terbuka.tutup, karyawan.id)
+        await db.run_sync(rekap_bulanan.segarkan, karyawan.id, absensi.tanggal_hari)  # Jam kerja dan tunjangan bulan ini
 
         try:
-            db.commit()  # Simpan perubahan ke database
+            await db.commit()  # Simpan perubahan ke database (absensi, ringkasan harian, absensi terbuka dan rekap bulanan)
             logger.info("Successfully committed check-out data to database")
 
             # Verify the update was successful
-            db.refresh(absensi)
+            await db.refresh(absensi)
             logger.info(f"After update - check-out time: {absensi.jam_keluar}")
             logger.info(f"After update - check-out location: {absensi.alamat_keluar}")
-            logger.info(f"After update - has check-out photo: {bool(absensi.foto_keluar)}")
+            logger.info(f"After update - has check-out photo: {bool(absensi.foto_keluar_hash)}")
         except Exception as commit_error:
             logger.error(f"Error committing to database: {str(commit_error)}")
-            db.rollback()
+            await db.rollback()
     except Exception as query_error:
         logger.error(f"Error querying attendance record: {str(query_error)}")
 
@@ -1577,8 +1780,12 @@ async def delete_absensi(absensi_id: int, db: Session = Depends(get_db)):
         # Log informasi absensi yang akan dihapus
         logger.info(f"Data absensi ditemukan: ID={absensi.id}, Karyawan={absensi.karyawan.nama if absensi.karyawan else 'Unknown'}, Tanggal={absensi.tanggal}")
 
-        # Hapus data absensi
+        # Hapus data absensi dan kurangi counter ringkasan harian dalam transaksi yang sama
+        if absensi.karyawan:
+            ringkasan_harian.batalkan_absensi(db, absensi, absensi.karyawan.departemen)
+        absensi_terbuka.hapus_absensi(db, absensi.id)
         db.delete(absensi)
+        rekap_bulanan.segarkan(db, absensi.karyawan_id, absensi.tanggal_hari)
         db.commit()
 
         # Log keberhasilan
@@ -1624,12 +1831,56 @@ async def update_uang_makan(
 
     # Update status uang makan
     absensi.uang_makan = data.get("uang_makan", False)
+    rekap_bulanan.segarkan(db, absensi.karyawan_id, absensi.tanggal_hari)  # Jumlah hari uang makan di rekap bulanan
 
     # Simpan perubahan ke database
     db.commit()
 
     return {"status": "success", "message": "Status uang makan berhasil diperbarui"}
 
+@app.put("/admin/absensi/tunjangan")
+async def update_tunjangan_massal(
+    data: dict,
+    db: Session = Depends(get_db)
+):
+    """
+    Endpoint untuk mengubah status uang makan dan/atau uang transport banyak absensi sekaligus
+
+    Absensi dipilih dengan "ids" (daftar ID absensi) atau dengan filter yang sama
+    dengan laporan (tanggal_mulai, tanggal_akhir, karyawan_id, departemen, status).
+    Perubahan diterapkan dengan satu UPDATE dalam satu transaksi.
+
+    Args:
+        data (dict): Pilihan absensi beserta nilai baru "uang_makan" dan/atau "uang_transport"
+        db (Session): Session database
+
+    Returns:
+        dict: Status hasil operasi dan jumlah absensi yang diubah
+
+    Raises:
+        HTTPException: 400 jika nilai, ids atau filter tidak valid
+    """
+    try:
+        # Tipe JSON diperiksa ketat: "false" bukan boolean, "123" atau 1.9 bukan daftar ID
+        permintaan = tunjangan_absensi.PerubahanTunjangan.parse_obj(data)
+        nilai = permintaan.nilai()
+        filters = None
+        if permintaan.ids is None:
+            filters = laporan.parse_filters(
+                permintaan.tanggal_mulai, permintaan.tanggal_akhir, permintaan.karyawan_id,
+                permintaan.departemen, permintaan.status
+            )
+        jumlah = tunjangan_absensi.ubah_massal(db, nilai, ids=permintaan.ids, filters=filters)
+    except (TypeError, ValueError) as e:  # ValidationError pydantic adalah turunan ValueError
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Simpan perubahan absensi dan rekap bulanan sekaligus
+    db.commit()
+    logger.info(f"Tunjangan {jumlah} absensi diubah: {nilai}")
+
+    return {"status": "success", "jumlah": jumlah}
+
 @app.get("/absen-keluar-webcam", response_class=HTMLResponse)
 async def absen_keluar_webcam(request: Request, id: int = None, db: Session = Depends(get_db)):
     if not id:
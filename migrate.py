@@ -0,0 +1,410 @@
+"""
+Runner migrasi skema database berversi.
+
+Penggunaan:
+    python migrate.py [--dry-run] [--batch-size 1000] [--gc]
+
+Migrasi berada di package migrations/ (lihat migrations/__init__.py) dan
+diterapkan berurutan berdasarkan nomor versinya. Versi yang sudah diterapkan
+dicatat di tabel schema_version:
+1. upgrade() setiap migrasi dijalankan dalam satu transaksi bersama baris
+   schema_version-nya (DDL SQLite ikut transaksi, lihat create_migration_engine)
+2. Backfill dijalankan per batch berdasarkan urutan ID; setiap batch di-commit
+   bersama posisi terakhirnya (langkah, last_id) di schema_version, sehingga
+   migrasi yang terhenti dilanjutkan dari batch berikutnya saat dijalankan ulang
+3. finalize() dijalankan dan migrasi ditandai selesai dalam satu transaksi
+
+Dengan --dry-run, runner hanya melaporkan migrasi yang belum diterapkan beserta
+perkiraan jumlah baris yang akan diubah, tanpa menulis apa pun. Dengan --gc,
+foto di foto_blob yang tidak lagi direferensikan (misalnya setelah absensi atau
+karyawan dihapus) dihapus beserta thumbnail-nya; foto yang direferensikan arsip
+absensi tetap disimpan.
+
+Database baru (belum ada tabel karyawan) dibuat langsung dari models.py lalu
+ditandai pada versi terbaru. Saat startup, aplikasi hanya membaca versi skema
+dari schema_version (lihat check_schema) alih-alih create_all dan inspect
+seluruh tabel.
+
+Konfigurasi melalui variabel lingkungan:
+- MIGRATE_ON_STARTUP: jika 1, migrasi yang belum diterapkan dijalankan saat
+  aplikasi start; default aplikasi menolak start dengan skema lama
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import pkgutil
+import re
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Integer, MetaData, String, Table, bindparam, event, inspect, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+import arsip_absensi
+import migrations
+from database import Base, SQLALCHEMY_DATABASE_URL, create_db_engine, is_sqlite
+import models  # noqa: F401  Mendaftarkan semua model ke Base.metadata
+
+logger = logging.getLogger(__name__)
+
+# Jumlah baris yang diisi dalam satu transaksi backfill
+DEFAULT_BATCH_SIZE = 1000
+
+# Jalankan migrasi yang belum diterapkan saat aplikasi start
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "").lower() in ("1", "true", "yes")
+
+# Tabel versi skema: satu baris per migrasi yang sudah (mulai) diterapkan
+schema_version = Table(
+    "schema_version", MetaData(),
+    Column("version", Integer, primary_key=True),  # Nomor versi migrasi
+    Column("nama", String(100), nullable=False),  # Nama modul migrasi
+    Column("selesai", Boolean, nullable=False, default=False),  # False selama backfill belum selesai
+    Column("langkah", Integer, nullable=False, default=0),  # Indeks backfill yang sedang berjalan
+    Column("last_id", Integer, nullable=False, default=0),  # ID terakhir batch yang sudah di-commit
+    Column("applied_at", DateTime, default=datetime.now),  # Waktu migrasi diterapkan
+)
+
+Migration = namedtuple("Migration", ["version", "nama", "module"])
+
+_MODULE_PATTERN = re.compile(r"^(\d{4})_(\w+)$")
+
+# Versi skema database yang terakhir diperiksa (diisi oleh check_schema)
+_versi_skema = None
+
+
+def _module_names():
+    # Nama modul migrasi NNNN_deskripsi di package migrations, tanpa mengimpornya
+    for info in pkgutil.iter_modules(migrations.__path__):
+        match = _MODULE_PATTERN.match(info.name)
+        if match:
+            yield int(match.group(1)), match.group(2), info.name
+
+
+def discover():
+    """
+    Memuat semua modul migrasi, berurutan berdasarkan versi.
+
+    Returns:
+        list: Migration(version, nama, module)
+
+    Raises:
+        ValueError: Jika ada dua migrasi dengan nomor versi yang sama
+    """
+    found = {}
+    for version, nama, module_name in _module_names():
+        if version in found:
+            raise ValueError(f"Versi migrasi {version:04d} terdaftar dua kali")
+        found[version] = Migration(version, nama, importlib.import_module(f"migrations.{module_name}"))
+    return [found[version] for version in sorted(found)]
+
+
+def versi_terbaru():
+    """
+    Nomor versi migrasi terbaru yang dikenal aplikasi (0 jika belum ada migrasi).
+    """
+    return max((version for version, _, _ in _module_names()), default=0)
+
+
+def versi_skema():
+    """
+    Versi skema database hasil check_schema terakhir (None jika belum diperiksa).
+    """
+    return _versi_skema
+
+
+def create_migration_engine(url=SQLALCHEMY_DATABASE_URL):
+    """
+    Membuat engine untuk migrasi.
+
+    Driver pysqlite tidak memulai transaksi sebelum DDL (ALTER, CREATE), sehingga
+    perubahan skema langsung ter-commit. Untuk SQLite, transaksi dikelola sendiri
+    dengan BEGIN agar upgrade() dan pencatatan versinya benar-benar atomik.
+
+    Returns:
+        Engine: SQLAlchemy engine
+    """
+    engine = create_db_engine(url)
+    if is_sqlite(url):
+        @event.listens_for(engine, "connect")
+        def disable_pysqlite_transaction(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def begin_sqlite_transaction(conn):
+            conn.exec_driver_sql("BEGIN")
+    return engine
+
+
+def _applied(conn):
+    # Baris schema_version per versi ({} jika tabel belum ada)
+    if not inspect(conn).has_table("schema_version"):
+        return {}
+    return {row.version: row for row in conn.execute(select(schema_version))}
+
+
+def _is_fresh(conn):
+    # Database baru: tabel utama aplikasi belum ada
+    return not inspect(conn).has_table("karyawan")
+
+
+def _vacuum(engine):
+    # VACUUM tidak dapat dijalankan di dalam transaksi
+    connection = engine.raw_connection()
+    try:
+        logger.info("Menjalankan VACUUM...")
+        connection.cursor().execute("VACUUM")
+    finally:
+        connection.close()
+
+
+def dry_run(engine):
+    """
+    Melaporkan migrasi yang belum diterapkan beserta perkiraan baris yang diubah.
+
+    Returns:
+        int: Total perkiraan baris yang diubah
+    """
+    total = 0
+    with engine.connect() as conn:
+        if _is_fresh(conn):
+            logger.info(f"[dry-run] Database baru: semua tabel dibuat dari models.py dan ditandai versi {versi_terbaru():04d}")
+            return 0
+
+        applied = _applied(conn)
+        pending = [m for m in discover() if m.version not in applied or not applied[m.version].selesai]
+        for migration in pending:
+            row = applied.get(migration.version)
+            status = "baru" if row is None else f"dilanjutkan dari langkah {row.langkah}, ID {row.last_id}"
+            estimasi = migration.module.estimasi(conn) if hasattr(migration.module, "estimasi") else 0
+            total += estimasi
+            logger.info(f"[dry-run] {migration.version:04d}_{migration.nama} ({status}): perkiraan {estimasi} baris diubah")
+
+    logger.info(f"[dry-run] {len(pending)} migrasi belum diterapkan, perkiraan total {total} baris diubah")
+    return total
+
+
+def apply_migration(engine, migration, row=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Menerapkan satu migrasi, atau melanjutkan backfill-nya yang terhenti.
+
+    Args:
+        engine (Engine): Engine dari create_migration_engine
+        migration (Migration): Migrasi yang diterapkan
+        row (Row, optional): Baris schema_version jika migrasi sudah dimulai
+        batch_size (int): Jumlah baris per batch backfill
+
+    Returns:
+        int: Jumlah baris yang diubah oleh backfill
+    """
+    module = migration.module
+    backfills = getattr(module, "BACKFILLS", [])
+    finalize = getattr(module, "finalize", None)
+
+    if row is None:
+        with engine.begin() as conn:
+            estimasi = module.estimasi(conn) if hasattr(module, "estimasi") else 0
+            if hasattr(module, "upgrade"):
+                module.upgrade(conn)
+            if not backfills and finalize:
+                finalize(conn)
+            conn.execute(schema_version.insert().values(
+                version=migration.version,
+                nama=migration.nama,
+                selesai=not backfills,
+                langkah=0,
+                last_id=0,
+                applied_at=datetime.now()
+            ))
+        langkah, last_id = 0, 0
+        logger.info(f"Migrasi {migration.version:04d}_{migration.nama} diterapkan")
+    else:
+        with engine.connect() as conn:
+            estimasi = module.estimasi(conn) if hasattr(module, "estimasi") else 0
+        langkah, last_id = row.langkah, row.last_id
+        logger.info(f"Melanjutkan migrasi {migration.version:04d}_{migration.nama} dari langkah {langkah}, ID {last_id}")
+
+    if not backfills:
+        return 0
+
+    total_updated = 0
+    while langkah < len(backfills):
+        backfill = backfills[langkah]
+        with engine.begin() as conn:
+            batch_last_id, updated = backfill(conn, last_id, batch_size)
+            if batch_last_id is None:
+                # Backfill ini selesai, lanjut ke backfill berikutnya dari awal
+                langkah, last_id = langkah + 1, 0
+            else:
+                last_id = batch_last_id
+            # Posisi di-commit bersama batch sehingga dapat dilanjutkan jika terhenti
+            conn.execute(schema_version.update().where(
+                schema_version.c.version == migration.version
+            ).values(langkah=langkah, last_id=last_id))
+
+        if batch_last_id is not None:
+            total_updated += updated
+            logger.info(
+                f"Migrasi {migration.version:04d} {backfill.__name__}: batch sampai ID {last_id}, "
+                f"{updated} baris ({total_updated}/{estimasi} perkiraan)"
+            )
+
+    with engine.begin() as conn:
+        if finalize:
+            finalize(conn)
+        conn.execute(schema_version.update().where(
+            schema_version.c.version == migration.version
+        ).values(selesai=True))
+    logger.info(f"Migrasi {migration.version:04d}_{migration.nama} selesai: {total_updated} baris diubah")
+    return total_updated
+
+
+def upgrade(engine=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Menerapkan semua migrasi yang belum diterapkan.
+
+    Args:
+        engine (Engine, optional): Engine dari create_migration_engine
+        batch_size (int): Jumlah baris per batch backfill
+
+    Returns:
+        int: Versi skema setelah migrasi
+    """
+    engine = engine or create_migration_engine()
+    all_migrations = discover()
+
+    with engine.begin() as conn:
+        fresh = _is_fresh(conn)
+        schema_version.create(conn, checkfirst=True)
+        if fresh:
+            # Database baru langsung dibuat dari models.py dalam bentuk terbarunya
+            Base.metadata.create_all(conn)
+            now = datetime.now()
+            for migration in all_migrations:
+                conn.execute(schema_version.insert().values(
+                    version=migration.version, nama=migration.nama, selesai=True,
+                    langkah=0, last_id=0, applied_at=now
+                ))
+            logger.info(f"Database baru dibuat pada versi skema {versi_terbaru():04d}")
+        applied = _applied(conn)
+
+    vacuum = False
+    for migration in all_migrations:
+        row = applied.get(migration.version)
+        if row is not None and row.selesai:
+            continue
+        updated = apply_migration(engine, migration, row, batch_size)
+        vacuum = vacuum or (updated and getattr(migration.module, "VACUUM", False))
+
+    if vacuum and engine.dialect.name == "sqlite":
+        # Kembalikan ruang yang dibebaskan backfill ke sistem file
+        _vacuum(engine)
+
+    with engine.connect() as conn:
+        return _current_version(conn)
+
+
+def _current_version(conn):
+    # Versi migrasi tertinggi yang sudah selesai (0 jika belum ada)
+    return conn.execute(
+        select(schema_version.c.version).where(schema_version.c.selesai.is_(True)).order_by(schema_version.c.version.desc()).limit(1)
+    ).scalar() or 0
+
+
+def check_schema(engine):
+    """
+    Memeriksa versi skema database saat aplikasi start.
+
+    Hanya membaca satu baris dari schema_version dan menyimpannya di memori.
+    Database baru dibuat otomatis; database dengan skema lama ditolak kecuali
+    MIGRATE_ON_STARTUP=1.
+
+    Args:
+        engine (Engine): Engine aplikasi
+
+    Returns:
+        int: Versi skema database
+
+    Raises:
+        RuntimeError: Jika masih ada migrasi yang belum diterapkan
+    """
+    global _versi_skema
+    head = versi_terbaru()
+    try:
+        with engine.connect() as conn:
+            versi = _current_version(conn)
+    except (OperationalError, ProgrammingError):
+        # Tabel schema_version belum ada: database baru atau dibuat sebelum runner migrasi
+        versi = None
+
+    if versi is not None and versi >= head:
+        _versi_skema = versi
+        return versi
+
+    if versi is None:
+        with engine.connect() as conn:
+            fresh = _is_fresh(conn)
+    else:
+        fresh = False
+
+    if fresh or MIGRATE_ON_STARTUP:
+        _versi_skema = upgrade(create_migration_engine(str(engine.url)))
+        return _versi_skema
+
+    raise RuntimeError(
+        f"Skema database versi {versi or 0:04d}, aplikasi membutuhkan versi {head:04d}. "
+        "Jalankan python migrate.py (lihat --dry-run) atau set MIGRATE_ON_STARTUP=1"
+    )
+
+
+def hapus_foto_tanpa_referensi(engine):
+    """
+    Menghapus foto di foto_blob yang tidak direferensikan baris mana pun maupun
+    arsip absensi (arsip_absensi.py), beserta thumbnail-nya di foto_thumbnail.
+
+    Returns:
+        int: Jumlah foto yang dihapus
+    """
+    diarsipkan = arsip_absensi.hash_foto_arsip()
+    with engine.begin() as conn:
+        candidates = [row[0] for row in conn.execute(text("""
+            SELECT sha256 FROM foto_blob WHERE sha256 NOT IN (
+                SELECT foto_masuk_hash FROM absensi WHERE foto_masuk_hash IS NOT NULL
+                UNION SELECT foto_keluar_hash FROM absensi WHERE foto_keluar_hash IS NOT NULL
+                UNION SELECT foto_hash FROM karyawan WHERE foto_hash IS NOT NULL
+            )
+        """)) if row[0] not in diarsipkan]
+        removed = 0
+        for start in range(0, len(candidates), DEFAULT_BATCH_SIZE):
+            batch = candidates[start:start + DEFAULT_BATCH_SIZE]
+            removed += conn.execute(
+                text("DELETE FROM foto_blob WHERE sha256 IN :hashes").bindparams(bindparam("hashes", expanding=True)),
+                {"hashes": batch}
+            ).rowcount
+        conn.execute(text("DELETE FROM foto_thumbnail WHERE sha256 NOT IN (SELECT sha256 FROM foto_blob)"))
+    return removed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s', force=True)
+
+    parser = argparse.ArgumentParser(description="Terapkan migrasi skema database")
+    parser.add_argument("--dry-run", action="store_true", help="Laporkan migrasi dan perkiraan baris tanpa menulis")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Jumlah baris per batch backfill")
+    parser.add_argument("--gc", action="store_true", help="Hapus foto yang tidak lagi direferensikan")
+    args = parser.parse_args()
+
+    migration_engine = create_migration_engine()
+    if args.dry_run:
+        dry_run(migration_engine)
+    else:
+        logger.info("Memulai migrasi database...")
+        versi = upgrade(migration_engine, args.batch_size)
+        logger.info(f"Migrasi selesai, versi skema {versi:04d}")
+
+        if args.gc:
+            removed = hapus_foto_tanpa_referensi(migration_engine)
+            logger.info(f"Foto tanpa referensi dihapus: {removed}")
+            if removed and migration_engine.dialect.name == "sqlite":
+                _vacuum(migration_engine)
@@ -0,0 +1,14 @@
+"""
+Menambahkan kolom waktu, hari, latitude dan longitude ke tabel absensi.
+
+Menggantikan migrate_db.py.
+"""
+
+from migrations import tambah_kolom
+
+
+def upgrade(conn):
+    tambah_kolom(conn, "absensi", "waktu", "TEXT")
+    tambah_kolom(conn, "absensi", "hari", "TEXT")
+    tambah_kolom(conn, "absensi", "latitude", "REAL")
+    tambah_kolom(conn, "absensi", "longitude", "REAL")
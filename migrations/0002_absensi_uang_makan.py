@@ -0,0 +1,12 @@
+"""
+Menambahkan kolom uang_makan ke tabel absensi.
+
+Kolom uang_makan menandai apakah karyawan sudah menerima uang makan atau belum.
+Menggantikan migrate_add_uang_makan.py.
+"""
+
+from migrations import tambah_kolom
+
+
+def upgrade(conn):
+    tambah_kolom(conn, "absensi", "uang_makan", "BOOLEAN DEFAULT 0")
@@ -0,0 +1,12 @@
+"""
+Menambahkan kolom alamat_keluar ke tabel absensi.
+
+Kolom ini menyimpan lokasi karyawan saat melakukan absen keluar.
+Menggantikan migrate_add_alamat_keluar.py.
+"""
+
+from migrations import tambah_kolom
+
+
+def upgrade(conn):
+    tambah_kolom(conn, "absensi", "alamat_keluar", "TEXT")
@@ -0,0 +1,11 @@
+"""
+Menambahkan kolom uang_transport ke tabel absensi (default False untuk data lama).
+
+Menggantikan migrate_add_uang_transport.py.
+"""
+
+from migrations import tambah_kolom
+
+
+def upgrade(conn):
+    tambah_kolom(conn, "absensi", "uang_transport", "BOOLEAN DEFAULT 0")
@@ -0,0 +1,65 @@
+"""
+Mengkonversi kolom face_encoding.encoding ke format biner berversi.
+
+Encoding berformat JSON atau bytes float64 mentah dikonversi ke header 8 byte +
+128 float32 (lihat face_encoding_format.py) per batch. Baris yang sudah dalam
+format baru dilewati. Menggantikan migrate_face_encoding_blob.py.
+"""
+
+import logging
+
+from sqlalchemy import text
+
+import face_encoding_format
+from migrations import hitung, tabel_ada
+from models import FaceEncoding
+
+logger = logging.getLogger(__name__)
+
+# Ruang dari encoding JSON yang lebih besar dikembalikan setelah konversi
+VACUUM = True
+
+
+def upgrade(conn):
+    FaceEncoding.__table__.create(conn, checkfirst=True)
+
+
+def estimasi(conn):
+    # Format baris tidak diketahui tanpa membaca isinya: batas atas seluruh baris
+    if not tabel_ada(conn, "face_encoding"):
+        return 0
+    return hitung(conn, "SELECT COUNT(*) FROM face_encoding")
+
+
+def konversi_encoding(conn, last_id, batch_size):
+    """
+    Mengkonversi satu batch baris face_encoding.
+
+    Returns:
+        tuple: (ID terakhir yang dibaca atau None jika selesai, jumlah dikonversi)
+    """
+    rows = conn.execute(
+        text("SELECT id, encoding FROM face_encoding WHERE id > :last_id ORDER BY id LIMIT :batch_size"),
+        {"last_id": last_id, "batch_size": batch_size}
+    ).fetchall()
+    if not rows:
+        return None, 0
+
+    updates = []
+    for row_id, raw in rows:
+        if face_encoding_format.is_current(raw):
+            continue
+        try:
+            vector = face_encoding_format.decode(raw)
+        except (ValueError, TypeError) as e:
+            # Baris yang gagal tetap dibaca oleh FaceEncodingBlob dalam format lamanya
+            logger.error(f"Encoding ID {row_id} tidak dapat dikonversi: {str(e)}")
+            continue
+        updates.append({"encoding": face_encoding_format.encode(vector), "id": row_id})
+
+    if updates:
+        conn.execute(text("UPDATE face_encoding SET encoding = :encoding WHERE id = :id"), updates)
+    return rows[-1][0], len(updates)
+
+
+BACKFILLS = [konversi_encoding]
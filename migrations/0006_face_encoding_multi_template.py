@@ -0,0 +1,58 @@
+"""
+Menghapus constraint UNIQUE pada face_encoding.karyawan_id agar seorang karyawan
+dapat memiliki beberapa template wajah.
+
+SQLite tidak mendukung ALTER TABLE DROP CONSTRAINT, sehingga tabel dibuat ulang
+dan semua baris disalin dengan ID yang sama. Database server selalu dibuat
+langsung dari models.py tanpa constraint tersebut. Menggantikan
+migrate_face_encoding_multi_template.py.
+"""
+
+import logging
+
+from sqlalchemy import text
+
+from migrations import buat_index, hitung
+
+logger = logging.getLogger(__name__)
+
+
+def _has_unique_karyawan_id(conn):
+    for index in conn.execute(text("PRAGMA index_list(face_encoding)")).fetchall():
+        index_name, is_unique = index[1], index[2]
+        if not is_unique:
+            continue
+        columns = [info[2] for info in conn.execute(text(f"PRAGMA index_info('{index_name}')")).fetchall()]
+        if columns == ["karyawan_id"]:
+            return True
+    return False
+
+
+def estimasi(conn):
+    if conn.dialect.name != "sqlite" or not _has_unique_karyawan_id(conn):
+        return 0
+    return hitung(conn, "SELECT COUNT(*) FROM face_encoding")
+
+
+def upgrade(conn):
+    if conn.dialect.name == "sqlite" and _has_unique_karyawan_id(conn):
+        conn.execute(text("""
+            CREATE TABLE face_encoding_new (
+                id INTEGER NOT NULL,
+                karyawan_id INTEGER,
+                encoding BLOB NOT NULL,
+                created_at DATETIME,
+                updated_at DATETIME,
+                PRIMARY KEY (id),
+                FOREIGN KEY(karyawan_id) REFERENCES karyawan (id)
+            )
+        """))
+        copied = conn.execute(text("""
+            INSERT INTO face_encoding_new (id, karyawan_id, encoding, created_at, updated_at)
+            SELECT id, karyawan_id, encoding, created_at, updated_at FROM face_encoding
+        """)).rowcount
+        logger.info(f"{copied} baris face_encoding disalin")
+        conn.execute(text("DROP TABLE face_encoding"))
+        conn.execute(text("ALTER TABLE face_encoding_new RENAME TO face_encoding"))
+
+    buat_index(conn, "ix_face_encoding_karyawan_id", "face_encoding", ["karyawan_id"])
@@ -0,0 +1,60 @@
+"""
+Menambahkan kolom tanggal_hari (DATE) dan index per hari ke tabel absensi.
+
+tanggal_hari diisi dari tanggal per batch berdasarkan urutan ID, lalu index
+gabungan ix_absensi_karyawan_tanggal_hari (karyawan_id, tanggal_hari) dibuat
+setelah pengisian selesai agar tidak diperbarui berulang kali. Menggantikan
+migrate_add_tanggal_hari.py.
+"""
+
+from sqlalchemy import text
+
+from migrations import buat_index, hitung, kolom_ada, tambah_kolom
+
+
+def upgrade(conn):
+    tambah_kolom(conn, "absensi", "tanggal_hari", "DATE")
+
+
+def estimasi(conn):
+    if not kolom_ada(conn, "absensi", "tanggal_hari"):
+        return hitung(conn, "SELECT COUNT(*) FROM absensi WHERE tanggal IS NOT NULL")
+    return hitung(conn, "SELECT COUNT(*) FROM absensi WHERE tanggal_hari IS NULL AND tanggal IS NOT NULL")
+
+
+def _ekspresi_tanggal(dialect):
+    # SQLite menyimpan DATETIME sebagai teks, sehingga CAST ke DATE tidak dapat dipakai
+    if dialect.name in ("sqlite", "mysql"):
+        return "date(tanggal)"
+    return "CAST(tanggal AS DATE)"
+
+
+def isi_tanggal_hari(conn, last_id, batch_size):
+    """
+    Mengisi kolom tanggal_hari untuk satu batch baris absensi.
+
+    Returns:
+        tuple: (ID terakhir batch ini atau None jika selesai, jumlah baris diisi)
+    """
+    batch_last_id = conn.execute(
+        text("SELECT MAX(id) FROM (SELECT id FROM absensi WHERE id > :last_id ORDER BY id LIMIT :batch_size) AS batch"),
+        {"last_id": last_id, "batch_size": batch_size}
+    ).scalar()
+    if batch_last_id is None:
+        return None, 0
+
+    updated = conn.execute(
+        text(
+            f"UPDATE absensi SET tanggal_hari = {_ekspresi_tanggal(conn.dialect)} "
+            "WHERE id > :last_id AND id <= :batch_last_id AND tanggal_hari IS NULL AND tanggal IS NOT NULL"
+        ),
+        {"last_id": last_id, "batch_last_id": batch_last_id}
+    ).rowcount
+    return batch_last_id, updated
+
+
+BACKFILLS = [isi_tanggal_hari]
+
+
+def finalize(conn):
+    buat_index(conn, "ix_absensi_karyawan_tanggal_hari", "absensi", ["karyawan_id", "tanggal_hari"])
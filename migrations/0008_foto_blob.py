@@ -0,0 +1,102 @@
+"""
+Memindahkan foto dari baris absensi dan karyawan ke tabel foto_blob.
+
+Isi foto disimpan sekali di foto_blob dengan kunci SHA-256 isinya, baris asal
+hanya menyimpan hash (foto_masuk_hash, foto_keluar_hash, foto_hash) dan kolom
+foto lama dikosongkan. Baris yang sudah dipindahkan dilewati. Menggantikan
+migrate_foto_blob.py (penghapusan foto tanpa referensi: python migrate.py --gc).
+"""
+
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import text
+
+from migrations import hitung, kolom_ada, tambah_kolom
+from models import FotoBlob
+
+# Ruang dari kolom foto lama yang sudah dikosongkan dikembalikan setelah migrasi
+VACUUM = True
+
+# Tabel asal beserta pasangan kolom foto lama -> kolom hash
+PHOTO_COLUMNS = {
+    "absensi": [("foto_masuk", "foto_masuk_hash"), ("foto_keluar", "foto_keluar_hash")],
+    "karyawan": [("foto", "foto_hash")],
+}
+
+
+def _legacy_pairs(conn, table):
+    # Pasangan kolom yang kolom foto lamanya masih ada di tabel
+    return [(legacy, hash_column) for legacy, hash_column in PHOTO_COLUMNS[table] if kolom_ada(conn, table, legacy)]
+
+
+def upgrade(conn):
+    FotoBlob.__table__.create(conn, checkfirst=True)
+    for table, pairs in PHOTO_COLUMNS.items():
+        for _, hash_column in pairs:
+            tambah_kolom(conn, table, hash_column, "VARCHAR(64)")
+
+
+def estimasi(conn):
+    total = 0
+    for table in PHOTO_COLUMNS:
+        pairs = _legacy_pairs(conn, table)
+        if pairs:
+            has_photo = " OR ".join(f"{legacy} IS NOT NULL" for legacy, _ in pairs)
+            total += hitung(conn, f"SELECT COUNT(*) FROM {table} WHERE {has_photo}")
+    return total
+
+
+def _move_batch(conn, table, last_id, batch_size):
+    """
+    Memindahkan foto satu batch baris dari satu tabel ke foto_blob.
+
+    Returns:
+        tuple: (ID terakhir yang dibaca atau None jika selesai, jumlah baris yang fotonya dipindahkan)
+    """
+    pairs = _legacy_pairs(conn, table)
+    if not pairs:
+        return None, 0
+
+    legacy_columns = [legacy for legacy, _ in pairs]
+    has_photo = " OR ".join(f"{column} IS NOT NULL" for column in legacy_columns)
+    rows = conn.execute(
+        text(f"SELECT id, {', '.join(legacy_columns)} FROM {table} WHERE id > :last_id AND ({has_photo}) ORDER BY id LIMIT :batch_size"),
+        {"last_id": last_id, "batch_size": batch_size}
+    ).fetchall()
+    if not rows:
+        return None, 0
+
+    now = datetime.now()
+    stored = set()
+    for row in rows:
+        row_id, photos = row[0], row[1:]
+        assignments = []
+        values = {"id": row_id}
+        for (legacy_column, hash_column), data in zip(pairs, photos):
+            if data is None:
+                continue
+            data = bytes(data)
+            sha256 = hashlib.sha256(data).hexdigest()
+            if sha256 not in stored and hitung(conn, "SELECT COUNT(*) FROM foto_blob WHERE sha256 = :sha256", sha256=sha256) == 0:
+                conn.execute(
+                    text("INSERT INTO foto_blob (sha256, data, ukuran, created_at) VALUES (:sha256, :data, :ukuran, :created_at)"),
+                    {"sha256": sha256, "data": data, "ukuran": len(data), "created_at": now}
+                )
+            stored.add(sha256)
+            assignments.append(f"{hash_column} = :{hash_column}, {legacy_column} = NULL")
+            values[hash_column] = sha256
+        conn.execute(text(f"UPDATE {table} SET {', '.join(assignments)} WHERE id = :id"), values)
+
+    return rows[-1][0], len(rows)
+
+
+def pindahkan_foto_absensi(conn, last_id, batch_size):
+    return _move_batch(conn, "absensi", last_id, batch_size)
+
+
+def pindahkan_foto_karyawan(conn, last_id, batch_size):
+    return _move_batch(conn, "karyawan", last_id, batch_size)
+
+
+BACKFILLS = [pindahkan_foto_absensi, pindahkan_foto_karyawan]
@@ -0,0 +1,19 @@
+"""
+Membuat index ix_absensi_tanggal_id (tanggal, id) pada tabel absensi.
+
+Index ini dipakai keyset pagination laporan absensi yang diurutkan berdasarkan
+tanggal. Menggantikan migrate_add_index_laporan.py.
+"""
+
+from migrations import buat_index, hitung, index_ada
+
+
+def estimasi(conn):
+    # Pembuatan index membaca seluruh baris absensi
+    if index_ada(conn, "absensi", "ix_absensi_tanggal_id"):
+        return 0
+    return hitung(conn, "SELECT COUNT(*) FROM absensi")
+
+
+def upgrade(conn):
+    buat_index(conn, "ix_absensi_tanggal_id", "absensi", ["tanggal", "id"])
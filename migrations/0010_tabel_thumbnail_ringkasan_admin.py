@@ -0,0 +1,14 @@
+"""
+Membuat tabel foto_thumbnail, ringkasan_harian dan admin.
+
+Sebelumnya tabel baru dibuat oleh create_all saat aplikasi start. Ringkasan
+harian dihitung ulang dari tabel absensi saat pertama kali dibaca, sehingga
+tidak perlu backfill (lihat juga python ringkasan_harian.py).
+"""
+
+from models import Admin, FotoThumbnail, RingkasanHarian
+
+
+def upgrade(conn):
+    for model in (FotoThumbnail, RingkasanHarian, Admin):
+        model.__table__.create(conn, checkfirst=True)
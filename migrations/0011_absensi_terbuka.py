@@ -0,0 +1,34 @@
+"""
+Membuat tabel absensi_terbuka dan mengisinya dari absensi yang belum absen keluar.
+
+Untuk setiap karyawan hanya absensi pada tanggal absen masuk terakhirnya yang
+dicatat, sehingga karyawan yang sudah absen masuk hari ini sebelum migrasi tetap
+dapat absen keluar. Lihat absensi_terbuka.py.
+"""
+
+from sqlalchemy import text
+
+from migrations import hitung
+from models import AbsensiTerbuka
+
+
+def estimasi(conn):
+    return hitung(conn, "SELECT COUNT(DISTINCT karyawan_id) FROM absensi WHERE jam_keluar IS NULL AND karyawan_id IS NOT NULL")
+
+
+def upgrade(conn):
+    AbsensiTerbuka.__table__.create(conn, checkfirst=True)
+    conn.execute(text("""
+        INSERT INTO absensi_terbuka (karyawan_id, absensi_id, tanggal_hari)
+        SELECT a.karyawan_id, MAX(a.id), a.tanggal_hari
+        FROM absensi a
+        JOIN (
+            SELECT karyawan_id, MAX(tanggal_hari) AS tanggal_hari
+            FROM absensi
+            WHERE karyawan_id IS NOT NULL
+            GROUP BY karyawan_id
+        ) terakhir ON terakhir.karyawan_id = a.karyawan_id AND terakhir.tanggal_hari = a.tanggal_hari
+        WHERE a.jam_keluar IS NULL
+          AND a.karyawan_id NOT IN (SELECT karyawan_id FROM absensi_terbuka)
+        GROUP BY a.karyawan_id, a.tanggal_hari
+    """))
@@ -0,0 +1,33 @@
+"""
+Membuat tabel rekap_bulanan dan mengisinya dari seluruh riwayat absensi.
+
+Rekap dihitung per batch karyawan berdasarkan urutan ID. Lihat rekap_bulanan.py.
+"""
+
+from sqlalchemy import text
+
+from migrations import hitung
+from models import RekapBulanan
+import rekap_bulanan
+
+
+def estimasi(conn):
+    return hitung(conn, "SELECT COUNT(DISTINCT karyawan_id) FROM absensi WHERE karyawan_id IS NOT NULL")
+
+
+def upgrade(conn):
+    RekapBulanan.__table__.create(conn, checkfirst=True)
+
+
+def isi_rekap(conn, last_id, batch_size):
+    ids = [row[0] for row in conn.execute(
+        text("SELECT DISTINCT karyawan_id FROM absensi WHERE karyawan_id > :last_id ORDER BY karyawan_id LIMIT :batch_size"),
+        {"last_id": last_id, "batch_size": batch_size}
+    )]
+    if not ids:
+        return None, 0
+    rekap_bulanan.hitung_ulang(conn, karyawan_ids=ids)
+    return ids[-1], len(ids)
+
+
+BACKFILLS = [isi_rekap]
@@ -0,0 +1,87 @@
+"""
+Migrasi skema database berversi, dijalankan oleh migrate.py.
+
+Setiap migrasi adalah modul NNNN_deskripsi.py di package ini dan diterapkan
+berurutan berdasarkan nomor versinya (NNNN). Modul migrasi berisi:
+- upgrade(conn): perubahan skema, dijalankan dalam satu transaksi bersama
+  pencatatan versinya di tabel schema_version
+- estimasi(conn) (opsional): perkiraan jumlah baris yang diubah, untuk --dry-run
+- BACKFILLS (opsional): daftar fungsi backfill(conn, last_id, batch_size) yang
+  mengisi data satu batch berdasarkan urutan ID dan mengembalikan (ID terakhir
+  batch atau None jika selesai, jumlah baris diubah)
+- finalize(conn) (opsional): langkah setelah semua backfill selesai, misalnya
+  membuat index setelah kolomnya terisi
+- VACUUM (opsional): True jika ruang database perlu dikembalikan setelah migrasi
+
+upgrade() harus aman untuk database lama yang sebagian perubahannya sudah
+diterapkan oleh script migrate_* sebelumnya, karena itu kolom, tabel dan index
+selalu diperiksa lebih dulu dengan fungsi-fungsi di bawah ini.
+"""
+
+from sqlalchemy import inspect, text
+
+
+def tabel_ada(conn, table):
+    """
+    Memeriksa apakah tabel sudah ada di database.
+    """
+    return inspect(conn).has_table(table)
+
+
+def kolom_ada(conn, table, column):
+    """
+    Memeriksa apakah kolom sudah ada di tabel.
+    """
+    return column in {kolom["name"] for kolom in inspect(conn).get_columns(table)}
+
+
+def index_ada(conn, table, name):
+    """
+    Memeriksa apakah index sudah ada di tabel.
+    """
+    return name in {index["name"] for index in inspect(conn).get_indexes(table)}
+
+
+def tambah_kolom(conn, table, column, column_type):
+    """
+    Menambahkan kolom ke tabel jika belum ada.
+
+    Args:
+        conn (Connection): Koneksi dalam transaksi migrasi
+        table (str): Nama tabel
+        column (str): Nama kolom
+        column_type (str): Tipe kolom SQL, misalnya "BOOLEAN DEFAULT 0"
+
+    Returns:
+        bool: True jika kolom baru ditambahkan
+    """
+    if kolom_ada(conn, table, column):
+        return False
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+    return True
+
+
+def buat_index(conn, name, table, columns):
+    """
+    Membuat index jika belum ada.
+
+    Args:
+        conn (Connection): Koneksi dalam transaksi migrasi
+        name (str): Nama index
+        table (str): Nama tabel
+        columns (list): Nama kolom index, berurutan
+
+    Returns:
+        bool: True jika index baru dibuat
+    """
+    if index_ada(conn, table, name):
+        return False
+    conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+    return True
+
+
+def hitung(conn, sql, **params):
+    """
+    Menjalankan query COUNT dan mengembalikan hasilnya (0 jika kosong).
+    """
+    return conn.execute(text(sql), params).scalar() or 0
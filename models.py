@@ -1,10 +1,168 @@
 # Import library SQLAlchemy untuk definisi model database
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, LargeBinary, Float  # Tipe kolom database
-from sqlalchemy.orm import relationship  # Untuk relasi antar tabel
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, LargeBinary, Float, Index  # Tipe kolom database
+from sqlalchemy import event, insert  # Hook sebelum insert/update dan statement INSERT
+from sqlalchemy.types import TypeDecorator  # Untuk tipe kolom kustom
+from sqlalchemy.dialects.mysql import LONGBLOB  # Kolom biner besar khusus MySQL
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert  # INSERT ... ON CONFLICT DO NOTHING SQLite
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert  # INSERT ... ON CONFLICT DO NOTHING PostgreSQL
+from sqlalchemy.orm import relationship, deferred, object_session, Session  # Relasi, lazy loading kolom, dan session
 from database import Base  # Base class dari modul database.py
 from datetime import datetime  # Untuk manipulasi tanggal dan waktu
 import numpy as np  # Untuk operasi array dan matriks
+import hashlib  # Untuk hash SHA-256 isi foto
 import sqlite3  # Untuk interaksi langsung dengan SQLite jika diperlukan
+import face_encoding_format  # Format biner berversi untuk encoding wajah
+
+class FaceEncodingBlob(TypeDecorator):
+    """
+    Tipe kolom BLOB untuk encoding wajah.
+
+    Selalu mengembalikan bytes, termasuk untuk baris lama yang masih tersimpan
+    sebagai string JSON (TEXT) sebelum migrasi 0005_face_encoding_biner diterapkan.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None:
+                return None
+            if isinstance(value, str):
+                return value.encode("utf-8")
+            return bytes(value)
+        return process
+
+# Tipe kolom isi foto: BLOB MySQL dibatasi 64 KB sehingga memakai LONGBLOB
+FotoData = LargeBinary().with_variant(LONGBLOB, "mysql")
+
+class FotoBlob(Base):
+    """
+    Model penyimpanan foto content-addressed (dialamatkan dengan hash isi)
+
+    Foto karyawan dan foto absensi disimpan sekali di tabel ini dengan kunci hash
+    SHA-256 isinya. Baris karyawan dan absensi hanya menyimpan hash, sehingga
+    memuat baris tersebut (dashboard, laporan, absen keluar) tidak ikut membaca JPEG.
+
+    Atribut:
+    - sha256: Hash SHA-256 isi foto dalam hex (primary key)
+    - data: Isi foto, kolom deferred yang hanya dibaca saat diakses
+    - ukuran: Ukuran foto dalam byte
+    - created_at: Waktu foto disimpan
+    """
+    __tablename__ = "foto_blob"  # Nama tabel di database
+
+    sha256 = Column(String(64), primary_key=True)  # Hash SHA-256 isi foto
+    data = deferred(Column(FotoData, nullable=False))  # Isi foto, tidak ikut dimuat secara default
+    ukuran = Column(Integer)  # Ukuran foto dalam byte
+    created_at = Column(DateTime, default=datetime.now)  # Waktu penyimpanan
+
+class FotoThumbnail(Base):
+    """
+    Model cache thumbnail foto dari tabel foto_blob
+
+    Thumbnail dibuat sekali saat pertama kali diminta lalu disimpan, sehingga
+    permintaan berikutnya (dari browser lain atau proses worker lain) tidak perlu
+    men-decode dan memperkecil foto asli lagi.
+
+    Atribut:
+    - sha256: Hash foto asli di tabel foto_blob
+    - lebar: Sisi terpanjang thumbnail dalam piksel
+    - data: Isi thumbnail (JPEG)
+    - created_at: Waktu thumbnail dibuat
+    """
+    __tablename__ = "foto_thumbnail"  # Nama tabel di database
+
+    sha256 = Column(String(64), primary_key=True)  # Hash foto asli
+    lebar = Column(Integer, primary_key=True)  # Sisi terpanjang thumbnail (piksel)
+    data = Column(FotoData, nullable=False)  # Isi thumbnail JPEG
+    created_at = Column(DateTime, default=datetime.now)  # Waktu thumbnail dibuat
+
+def _get_foto(instance, sha256):
+    """
+    Membaca isi foto dari tabel foto_blob berdasarkan hash, dengan cache per objek
+
+    Args:
+        instance: Objek Karyawan atau Absensi pemilik foto
+        sha256 (str): Hash foto, None jika tidak ada foto
+
+    Returns:
+        bytes: Isi foto, atau None jika tidak ada
+    """
+    if sha256 is None:
+        return None
+    cache = instance.__dict__.setdefault("_foto_cache", {})
+    if sha256 not in cache:
+        session = object_session(instance)
+        if session is None:
+            return None
+        cache[sha256] = session.query(FotoBlob.data).filter(FotoBlob.sha256 == sha256).scalar()
+    return cache[sha256]
+
+def _set_foto(instance, hash_attr, data):
+    """
+    Menyimpan referensi foto pada objek; isi foto ditulis ke foto_blob saat flush
+
+    Args:
+        instance: Objek Karyawan atau Absensi pemilik foto
+        hash_attr (str): Nama kolom hash foto pada objek
+        data (bytes): Isi foto, None untuk menghapus referensi
+    """
+    if not data:
+        setattr(instance, hash_attr, None)
+        return
+    data = bytes(data)
+    sha256 = hashlib.sha256(data).hexdigest()
+    instance.__dict__.setdefault("_foto_cache", {})[sha256] = data
+    instance.__dict__.setdefault("_foto_pending", {})[sha256] = data
+    setattr(instance, hash_attr, sha256)
+
+@event.listens_for(Session, "before_flush")
+def simpan_foto_baru(session, flush_context, instances):
+    """
+    Menulis foto baru ke tabel foto_blob sebelum baris pemiliknya disimpan
+
+    Foto dengan isi yang sama hanya disimpan sekali.
+    """
+    pending = {}
+    for obj in list(session.new) + list(session.dirty):
+        fotos = obj.__dict__.pop("_foto_pending", None)
+        if fotos:
+            pending.update(fotos)
+    if not pending:
+        return
+
+    with session.no_autoflush:
+        existing = {
+            sha256 for (sha256,) in
+            session.query(FotoBlob.sha256).filter(FotoBlob.sha256.in_(list(pending)))
+        }
+        baru = [
+            {"sha256": sha256, "data": data, "ukuran": len(data)}
+            for sha256, data in pending.items() if sha256 not in existing
+        ]
+        if baru:
+            # Absensi lain dapat menyimpan foto yang sama di antara SELECT di atas dan INSERT ini;
+            # hash yang sudah ada diabaikan alih-alih menggagalkan seluruh transaksi
+            dialect = session.get_bind(mapper=FotoBlob.__mapper__).dialect.name
+            session.execute(_insert_abaikan_duplikat(dialect), baru)
+
+def _insert_abaikan_duplikat(dialect):
+    """
+    Statement INSERT ke foto_blob yang melewati hash yang sudah tersimpan
+
+    Args:
+        dialect (str): Nama dialect database (sqlite, postgresql, mysql)
+
+    Returns:
+        Insert: Statement INSERT sesuai dialect
+    """
+    if dialect == "sqlite":
+        return sqlite_insert(FotoBlob).on_conflict_do_nothing(index_elements=["sha256"])
+    if dialect == "postgresql":
+        return postgresql_insert(FotoBlob).on_conflict_do_nothing(index_elements=["sha256"])
+    if dialect == "mysql":
+        return insert(FotoBlob).prefix_with("IGNORE")
+    return insert(FotoBlob)
 
 class Karyawan(Base):
     """
@@ -20,11 +178,11 @@ class Karyawan(Base):
     - alamat: Alamat karyawan
     - tanggal_bergabung: Tanggal karyawan bergabung
     - status: Status aktif karyawan (True/False)
-    - foto: Foto karyawan dalam format biner
+    - foto_hash: Hash foto karyawan di tabel foto_blob (isi foto melalui properti foto)
 
     Relasi:
     - absensi: Relasi one-to-many ke tabel Absensi
-    - face_encoding: Relasi one-to-one ke tabel FaceEncoding
+    - face_encodings: Relasi one-to-many ke tabel FaceEncoding (beberapa template wajah)
     """
     __tablename__ = "karyawan"  # Nama tabel di database
 
@@ -38,20 +196,32 @@ class Karyawan(Base):
     alamat = Column(String(200), nullable=False)  # Alamat karyawan
     tanggal_bergabung = Column(DateTime, nullable=False, default=datetime.now)  # Tanggal bergabung
     status = Column(Boolean, default=True)  # Status aktif karyawan
-    foto = Column(LargeBinary, nullable=True)  # Foto karyawan dalam format biner
+    foto_hash = Column(String(64), nullable=True)  # Hash foto karyawan di tabel foto_blob
 
     # Definisi relasi
     absensi = relationship("Absensi", back_populates="karyawan")  # Relasi ke tabel Absensi
-    face_encoding = relationship("FaceEncoding", back_populates="karyawan", uselist=False)  # Relasi ke tabel FaceEncoding
+    face_encodings = relationship("FaceEncoding", back_populates="karyawan", order_by="FaceEncoding.id")  # Relasi ke tabel FaceEncoding
+
+    @property
+    def foto(self):
+        """Foto karyawan dalam format biner, dibaca dari foto_blob saat diakses"""
+        return _get_foto(self, self.foto_hash)
+
+    @foto.setter
+    def foto(self, data):
+        _set_foto(self, "foto_hash", data)
 
 class FaceEncoding(Base):
     """
-    Model untuk menyimpan encoding wajah karyawan
+    Model untuk menyimpan template encoding wajah karyawan
+
+    Seorang karyawan dapat memiliki beberapa template wajah (dibatasi oleh
+    face_gallery.MAX_TEMPLATES_PER_KARYAWAN).
 
     Atribut:
     - id: Primary key
     - karyawan_id: Foreign key ke tabel karyawan
-    - encoding: Encoding wajah dalam format string JSON
+    - encoding: Encoding wajah dalam format biner berversi (lihat face_encoding_format.py)
     - created_at: Waktu pembuatan encoding
     - updated_at: Waktu terakhir update encoding
 
@@ -59,40 +229,38 @@ class FaceEncoding(Base):
     - karyawan: Relasi many-to-one ke tabel Karyawan
 
     Metode:
-    - get_encoding_array: Konversi string encoding ke numpy array
-    - set_encoding_array: Konversi numpy array ke string untuk penyimpanan
+    - get_encoding_array: Konversi encoding biner ke numpy array
+    - set_encoding_array: Konversi numpy array ke format biner untuk penyimpanan
     """
     __tablename__ = "face_encoding"  # Nama tabel di database
 
     # Definisi kolom-kolom tabel
     id = Column(Integer, primary_key=True)  # ID unik encoding
-    karyawan_id = Column(Integer, ForeignKey("karyawan.id"), unique=True)  # ID karyawan, harus unik
-    encoding = Column(String, nullable=False)  # Encoding wajah sebagai string JSON
+    karyawan_id = Column(Integer, ForeignKey("karyawan.id"), index=True)  # ID karyawan pemilik template
+    encoding = Column(FaceEncodingBlob, nullable=False)  # Encoding wajah: header + 128 float32
     created_at = Column(DateTime, default=datetime.now)  # Waktu pembuatan
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)  # Waktu update
 
     # Definisi relasi
-    karyawan = relationship("Karyawan", back_populates="face_encoding")  # Relasi ke tabel Karyawan
+    karyawan = relationship("Karyawan", back_populates="face_encodings")  # Relasi ke tabel Karyawan
 
     def get_encoding_array(self):
         """
-        Konversi string encoding yang tersimpan kembali ke numpy array
+        Konversi encoding yang tersimpan kembali ke numpy array
 
         Returns:
-            numpy.ndarray: Array encoding wajah
+            numpy.ndarray: Array encoding wajah (float32)
         """
-        import json
-        return np.array(json.loads(self.encoding))
+        return face_encoding_format.decode(self.encoding)
 
     def set_encoding_array(self, encoding_array):
         """
-        Konversi numpy array ke string untuk penyimpanan
+        Konversi numpy array ke format biner untuk penyimpanan
 
         Args:
             encoding_array (numpy.ndarray): Array encoding wajah
         """
-        import json
-        self.encoding = json.dumps(encoding_array.tolist())
+        self.encoding = face_encoding_format.encode(encoding_array)
 
 class Absensi(Base):
     """
@@ -102,14 +270,15 @@ class Absensi(Base):
     - id: Primary key
     - karyawan_id: Foreign key ke tabel karyawan
     - tanggal: Tanggal absensi (default: tanggal hari ini)
+    - tanggal_hari: Tanggal absensi tanpa jam, diisi otomatis dari tanggal
     - jam_masuk: Waktu absen masuk dalam format DateTime
     - jam_keluar: Waktu absen keluar dalam format DateTime
     - waktu: Waktu absensi dalam format string (untuk kompatibilitas)
     - hari: Hari absensi dalam format string (untuk kompatibilitas)
     - status: Status absensi (Hadir, Terlambat, dll)
     - keterangan: Keterangan tambahan
-    - foto_masuk: Foto karyawan saat absen masuk
-    - foto_keluar: Foto karyawan saat absen keluar
+    - foto_masuk_hash: Hash foto saat absen masuk di tabel foto_blob (isi foto melalui properti foto_masuk)
+    - foto_keluar_hash: Hash foto saat absen keluar di tabel foto_blob (isi foto melalui properti foto_keluar)
     - alamat: Lokasi saat absen masuk
     - alamat_keluar: Lokasi saat absen keluar
     - latitude: Latitude lokasi absen masuk
@@ -121,14 +290,15 @@ class Absensi(Base):
     id = Column(Integer, primary_key=True)  # ID unik untuk setiap record absensi
     karyawan_id = Column(Integer, ForeignKey("karyawan.id"))  # ID karyawan yang melakukan absensi
     tanggal = Column(DateTime, default=datetime.now)  # Tanggal absensi, default hari ini
+    tanggal_hari = Column(Date)  # Tanggal absensi tanpa jam untuk pencarian per hari (diisi otomatis)
     jam_masuk = Column(DateTime)  # Waktu absen masuk dalam format DateTime
     jam_keluar = Column(DateTime)  # Waktu absen keluar dalam format DateTime
     waktu = Column(String(20), nullable=True)  # Waktu absensi dalam format string (untuk kompatibilitas)
     hari = Column(String(20), nullable=True)  # Hari absensi dalam format string (untuk kompatibilitas)
     status = Column(String(20))  # Status absensi: Hadir, Terlambat, dll
     keterangan = Column(String(200), nullable=True)  # Keterangan tambahan jika diperlukan
-    foto_masuk = Column(LargeBinary, nullable=True)  # Foto karyawan saat absen masuk
-    foto_keluar = Column(LargeBinary, nullable=True)  # Foto karyawan saat absen keluar
+    foto_masuk_hash = Column(String(64), nullable=True)  # Hash foto saat absen masuk di tabel foto_blob
+    foto_keluar_hash = Column(String(64), nullable=True)  # Hash foto saat absen keluar di tabel foto_blob
     alamat = Column(String(255), nullable=True)  # Lokasi saat absen masuk
     alamat_keluar = Column(String(255), nullable=True)  # Lokasi saat absen keluar
     latitude = Column(Float, nullable=True)  # Latitude lokasi absen masuk
@@ -139,6 +309,132 @@ class Absensi(Base):
     # Relasi ke tabel karyawan
     karyawan = relationship("Karyawan", back_populates="absensi")
 
+    # Index gabungan agar pencarian "absensi karyawan X hari ini" berupa index seek,
+    # dan index (tanggal, id) untuk keyset pagination laporan absensi
+    __table_args__ = (
+        Index("ix_absensi_karyawan_tanggal_hari", "karyawan_id", "tanggal_hari"),
+        Index("ix_absensi_tanggal_id", "tanggal", "id"),
+    )
+
+    @property
+    def foto_masuk(self):
+        """Foto saat absen masuk dalam format biner, dibaca dari foto_blob saat diakses"""
+        return _get_foto(self, self.foto_masuk_hash)
+
+    @foto_masuk.setter
+    def foto_masuk(self, data):
+        _set_foto(self, "foto_masuk_hash", data)
+
+    @property
+    def foto_keluar(self):
+        """Foto saat absen keluar dalam format biner, dibaca dari foto_blob saat diakses"""
+        return _get_foto(self, self.foto_keluar_hash)
+
+    @foto_keluar.setter
+    def foto_keluar(self, data):
+        _set_foto(self, "foto_keluar_hash", data)
+
+@event.listens_for(Absensi, "before_insert")
+@event.listens_for(Absensi, "before_update")
+def sync_tanggal_hari(mapper, connection, target):
+    """
+    Mengisi kolom tanggal_hari dari kolom tanggal sebelum data disimpan
+
+    Args:
+        mapper: Mapper SQLAlchemy
+        connection: Koneksi database
+        target (Absensi): Objek absensi yang akan disimpan
+    """
+    if target.tanggal is None:
+        target.tanggal = datetime.now()  # Sama dengan default kolom tanggal
+    # Kolom tanggal dapat berisi datetime atau date
+    target.tanggal_hari = target.tanggal.date() if isinstance(target.tanggal, datetime) else target.tanggal
+
+class AbsensiTerbuka(Base):
+    """
+    Model absensi hari ini yang sudah absen masuk tetapi belum absen keluar
+
+    Satu baris per karyawan, ditulis saat absen masuk dan dihapus saat absen keluar
+    dalam transaksi yang sama, sehingga absen keluar cukup membaca satu baris
+    berdasarkan primary key tanpa memindai riwayat absensi. Lihat absensi_terbuka.py.
+
+    Atribut:
+    - karyawan_id: ID karyawan (primary key)
+    - absensi_id: ID absensi yang belum absen keluar
+    - tanggal_hari: Tanggal absen masuk
+    """
+    __tablename__ = "absensi_terbuka"  # Nama tabel di database
+
+    karyawan_id = Column(Integer, ForeignKey("karyawan.id"), primary_key=True)  # ID karyawan
+    absensi_id = Column(Integer, ForeignKey("absensi.id"), nullable=False)  # ID absensi yang masih terbuka
+    tanggal_hari = Column(Date, nullable=False)  # Tanggal absen masuk
+
+class RingkasanHarian(Base):
+    """
+    Model ringkasan absensi harian per departemen untuk dashboard admin
+
+    Baris diperbarui dalam transaksi yang sama dengan absen masuk, absen keluar dan
+    hapus absensi, sehingga dashboard cukup membaca satu baris (departemen "*" untuk
+    seluruh perusahaan) tanpa memindai tabel absensi. Lihat ringkasan_harian.py.
+
+    Atribut:
+    - tanggal: Tanggal ringkasan
+    - departemen: Nama departemen, atau "*" untuk seluruh perusahaan
+    - total_karyawan: Jumlah karyawan yang sudah bergabung pada tanggal tersebut
+    - hadir: Jumlah absen masuk dengan status Hadir
+    - terlambat: Jumlah absen masuk dengan status Terlambat
+    - pulang: Jumlah absensi yang sudah absen keluar
+    """
+    __tablename__ = "ringkasan_harian"  # Nama tabel di database
+
+    tanggal = Column(Date, primary_key=True)  # Tanggal ringkasan
+    departemen = Column(String(50), primary_key=True)  # Departemen, "*" untuk seluruh perusahaan
+    total_karyawan = Column(Integer, nullable=False, default=0)  # Jumlah karyawan
+    hadir = Column(Integer, nullable=False, default=0)  # Jumlah karyawan hadir
+    terlambat = Column(Integer, nullable=False, default=0)  # Jumlah karyawan terlambat
+    pulang = Column(Integer, nullable=False, default=0)  # Jumlah karyawan yang sudah absen keluar
+
+    @property
+    def belum_absen(self):
+        """Jumlah karyawan yang belum absen masuk"""
+        return max(0, self.total_karyawan - self.hadir - self.terlambat)
+
+class RekapBulanan(Base):
+    """
+    Model rekap absensi bulanan per karyawan untuk penggajian
+
+    Berisi jam kerja (jumlah jam_keluar - jam_masuk) dan jumlah hari uang makan
+    serta uang transport per karyawan per bulan, dihitung di SQL. Baris karyawan
+    dan bulan yang absensinya berubah dihitung ulang dalam transaksi yang sama,
+    sehingga tutup buku penggajian cukup membaca rekap satu bulan tanpa memindai
+    tabel absensi. Lihat rekap_bulanan.py.
+
+    Atribut:
+    - bulan: Tanggal pertama bulan rekap
+    - karyawan_id: ID karyawan
+    - hari_hadir: Jumlah hari dengan absen masuk
+    - hari_pulang: Jumlah absensi yang sudah absen keluar
+    - detik_kerja: Jumlah durasi kerja (jam_keluar - jam_masuk) dalam detik
+    - hari_uang_makan: Jumlah absensi dengan uang makan
+    - hari_uang_transport: Jumlah absensi dengan uang transport
+    - diperbarui_at: Waktu rekap terakhir dihitung
+    """
+    __tablename__ = "rekap_bulanan"  # Nama tabel di database
+
+    bulan = Column(Date, primary_key=True)  # Tanggal pertama bulan (primary key pertama agar satu bulan dibaca berurutan)
+    karyawan_id = Column(Integer, ForeignKey("karyawan.id"), primary_key=True)  # ID karyawan
+    hari_hadir = Column(Integer, nullable=False, default=0)  # Jumlah hari hadir
+    hari_pulang = Column(Integer, nullable=False, default=0)  # Jumlah absensi yang sudah absen keluar
+    detik_kerja = Column(Integer, nullable=False, default=0)  # Total durasi kerja dalam detik
+    hari_uang_makan = Column(Integer, nullable=False, default=0)  # Jumlah hari uang makan
+    hari_uang_transport = Column(Integer, nullable=False, default=0)  # Jumlah hari uang transport
+    diperbarui_at = Column(DateTime, default=datetime.now)  # Waktu rekap terakhir dihitung
+
+    @property
+    def jam_kerja(self):
+        """Total jam kerja (dibulatkan dua angka desimal)"""
+        return round(self.detik_kerja / 3600, 2)
+
 class Pengaturan(Base):
     """
     Model untuk menyimpan pengaturan sistem absensi
@@ -155,4 +451,28 @@ class Pengaturan(Base):
     id = Column(Integer, primary_key=True)  # ID unik pengaturan
     jam_masuk = Column(String(5))  # Jam masuk kerja (format HH:MM)
     jam_keluar = Column(String(5))  # Jam keluar kerja (format HH:MM)
-    toleransi_keterlambatan = Column(Integer)  # Toleransi keterlambatan dalam menit
\ No newline at end of file
+    toleransi_keterlambatan = Column(Integer)  # Toleransi keterlambatan dalam menit
+
+class Admin(Base):
+    """
+    Model untuk menyimpan data admin yang mengelola sistem absensi
+
+    Atribut:
+    - id: Primary key
+    - username: Username admin (unik)
+    - password: Password admin (dalam bentuk hash)
+    - email: Email admin (unik)
+    - is_active: Status aktif admin
+    - created_at: Waktu pembuatan data
+    - updated_at: Waktu terakhir data diubah
+    """
+    __tablename__ = "admin"  # Nama tabel di database
+
+    # Definisi kolom-kolom tabel
+    id = Column(Integer, primary_key=True)  # ID unik admin
+    username = Column(String(100), unique=True, nullable=False)  # Username admin, harus unik
+    password = Column(String(100), nullable=False)  # Password admin (dalam bentuk hash)
+    email = Column(String(100), unique=True, nullable=False)  # Email admin, harus unik
+    is_active = Column(Boolean, default=True)  # Status aktif admin
+    created_at = Column(DateTime, default=datetime.now)  # Waktu pembuatan data
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)  # Waktu terakhir diubah
\ No newline at end of file
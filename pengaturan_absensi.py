@@ -0,0 +1,203 @@
+"""
+Cache pengaturan absensi dan penentuan status Hadir/Terlambat.
+
+Pengaturan (jam masuk, jam keluar, toleransi keterlambatan) dibaca sekali dari
+tabel pengaturan lalu disimpan di memori proses. Absen masuk menentukan statusnya
+dari snapshot ini saat absensi ditulis, tanpa query tambahan. update_pengaturan
+memanggil invalidasi() sehingga permintaan berikutnya memuat ulang pengaturan.
+
+Cache berlaku per proses; jika aplikasi dijalankan dengan beberapa worker, worker
+lain memuat ulang pengaturan setelah PENGATURAN_CACHE_TTL detik.
+
+Status absensi lama dapat dihitung ulang untuk rentang tanggal dengan satu
+UPDATE set-based (hitung_ulang_status), misalnya setelah jam masuk atau
+toleransi diubah. Ringkasan harian rentang tersebut ikut dihitung ulang.
+
+Konfigurasi melalui variabel lingkungan:
+- PENGATURAN_CACHE_TTL: umur cache dalam detik, 0 untuk tanpa batas (default 300)
+
+Penggunaan hitung ulang dari command line:
+    python pengaturan_absensi.py --mulai YYYY-MM-DD [--akhir YYYY-MM-DD]
+"""
+
+import argparse
+import logging
+import os
+import threading
+import time as time_module
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, literal, update
+from sqlalchemy.types import Time
+
+from fungsi_sql import jam_dari
+from models import Absensi, Pengaturan
+import ringkasan_harian
+
+logger = logging.getLogger(__name__)
+
+# Umur cache pengaturan dalam detik (0 = hanya dimuat ulang saat invalidasi)
+PENGATURAN_CACHE_TTL = float(os.getenv("PENGATURAN_CACHE_TTL", "300"))
+
+# Status absen masuk yang ditentukan dari jam masuk
+STATUS_HADIR = "Hadir"
+STATUS_TERLAMBAT = "Terlambat"
+
+
+def _parse_jam(value):
+    # Jam dalam format HH:MM dari tabel pengaturan, None jika kosong atau tidak valid
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except (TypeError, ValueError):
+        return None
+
+
+class PengaturanAbsensi:
+    """
+    Snapshot pengaturan absensi yang tidak berubah (read-only).
+
+    Attributes:
+        jam_masuk (time): Jam masuk kerja, None jika belum diatur
+        jam_keluar (time): Jam keluar kerja, None jika belum diatur
+        toleransi_keterlambatan (int): Toleransi keterlambatan dalam menit
+    """
+
+    def __init__(self, jam_masuk=None, jam_keluar=None, toleransi_keterlambatan=0):
+        self.jam_masuk = jam_masuk
+        self.jam_keluar = jam_keluar
+        self.toleransi_keterlambatan = toleransi_keterlambatan or 0
+
+    @classmethod
+    def dari_model(cls, pengaturan):
+        """
+        Membuat snapshot dari baris Pengaturan (None jika belum ada pengaturan).
+        """
+        if pengaturan is None:
+            return cls()
+        return cls(
+            jam_masuk=_parse_jam(pengaturan.jam_masuk),
+            jam_keluar=_parse_jam(pengaturan.jam_keluar),
+            toleransi_keterlambatan=pengaturan.toleransi_keterlambatan
+        )
+
+    @property
+    def batas_terlambat(self):
+        """Jam masuk ditambah toleransi, None jika jam masuk belum diatur"""
+        if self.jam_masuk is None:
+            return None
+        batas = datetime.combine(date.min, self.jam_masuk) + timedelta(minutes=self.toleransi_keterlambatan)
+        # Toleransi yang melewati tengah malam dibatasi di akhir hari
+        return batas.time() if batas.date() == date.min else time.max.replace(microsecond=0)
+
+    def status_masuk(self, jam_masuk):
+        """
+        Menentukan status absen masuk dari jam absen masuk.
+
+        Args:
+            jam_masuk (datetime): Waktu absen masuk
+
+        Returns:
+            str: "Terlambat" jika melewati jam masuk ditambah toleransi, selain itu "Hadir"
+        """
+        batas = self.batas_terlambat
+        # Dibandingkan per detik, sama dengan hitung_ulang_status di SQL
+        if batas is not None and jam_masuk is not None and jam_masuk.time().replace(microsecond=0) > batas:
+            return STATUS_TERLAMBAT
+        return STATUS_HADIR
+
+
+_lock = threading.Lock()
+_snapshot = None
+_dimuat_pada = 0.0
+
+
+def ambil(db):
+    """
+    Mengembalikan snapshot pengaturan dari cache, dimuat dari database jika perlu.
+
+    Args:
+        db (Session): Session database (hanya dipakai saat cache kosong atau kedaluwarsa);
+                      dari AsyncSession panggil melalui await db.run_sync(ambil)
+
+    Returns:
+        PengaturanAbsensi: Snapshot pengaturan
+    """
+    global _snapshot, _dimuat_pada
+    snapshot = _snapshot
+    if snapshot is not None and (PENGATURAN_CACHE_TTL <= 0 or time_module.monotonic() - _dimuat_pada < PENGATURAN_CACHE_TTL):
+        return snapshot
+
+    with _lock:
+        if _snapshot is snapshot:
+            _snapshot = PengaturanAbsensi.dari_model(db.query(Pengaturan).first())
+            _dimuat_pada = time_module.monotonic()
+            logger.info("Pengaturan absensi dimuat ke cache")
+        return _snapshot
+
+
+def invalidasi():
+    """
+    Mengosongkan cache pengaturan (dipanggil setelah pengaturan diubah dan di-commit).
+    """
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def hitung_ulang_status(db, tanggal_mulai, tanggal_akhir, pengaturan=None):
+    """
+    Menghitung ulang status Hadir/Terlambat absensi dalam rentang tanggal (inklusif).
+
+    Status dihitung dengan satu UPDATE set-based di database, lalu ringkasan
+    harian rentang tersebut dihitung ulang; semuanya di-commit bersama.
+    Absensi dengan status lain (misalnya izin) tidak diubah.
+
+    Args:
+        db (Session): Session database
+        tanggal_mulai (date): Tanggal awal
+        tanggal_akhir (date): Tanggal akhir
+        pengaturan (PengaturanAbsensi, optional): Pengaturan yang dipakai, default dari cache
+
+    Returns:
+        int: Jumlah absensi yang diperiksa
+    """
+    pengaturan = pengaturan or ambil(db)
+    batas = pengaturan.batas_terlambat
+    if batas is None:
+        status_baru = literal(STATUS_HADIR)
+    else:
+        status_baru = case(
+            (jam_dari(Absensi.jam_masuk) > literal(batas, Time), STATUS_TERLAMBAT),
+            else_=STATUS_HADIR
+        )
+
+    result = db.execute(
+        update(Absensi).where(
+            Absensi.tanggal_hari >= tanggal_mulai,
+            Absensi.tanggal_hari <= tanggal_akhir,
+            Absensi.jam_masuk.isnot(None),
+            Absensi.status.in_([STATUS_HADIR, STATUS_TERLAMBAT])
+        ).values(status=status_baru).execution_options(synchronize_session=False)
+    )
+    # Counter hadir/terlambat ringkasan harian mengikuti status baru (rebuild melakukan commit)
+    ringkasan_harian.rebuild(db, tanggal_mulai, tanggal_akhir)
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Hitung ulang status Hadir/Terlambat absensi")
+    parser.add_argument("--mulai", type=date.fromisoformat, required=True, help="Tanggal awal")
+    parser.add_argument("--akhir", type=date.fromisoformat, help="Tanggal akhir (default: hari ini)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        akhir = args.akhir or datetime.now().date()
+        jumlah = hitung_ulang_status(db, args.mulai, akhir)
+        logger.info(f"Status absensi {args.mulai} sampai {akhir} dihitung ulang: {jumlah} baris")
+    finally:
+        db.close()
@@ -0,0 +1,225 @@
+"""
+Rekap absensi bulanan (materialized) untuk penggajian.
+
+Tabel rekap_bulanan menyimpan per karyawan per bulan jumlah hari hadir, jam kerja
+(jumlah jam_keluar - jam_masuk) dan jumlah hari uang makan serta uang transport.
+Agregatnya dihitung di SQL dengan INSERT ... SELECT ... GROUP BY, memakai fungsi
+lintas dialek dari fungsi_sql.py untuk durasi dan awal bulan.
+
+Alur pembaruan:
+1. segarkan() menghitung ulang satu baris (karyawan, bulan) setelah absensinya
+   berubah (absen masuk, absen keluar, ubah uang makan, hapus absensi), di
+   transaksi yang sama dengan perubahan absensi; query-nya hanya membaca absensi
+   karyawan itu pada bulan itu melalui index ix_absensi_karyawan_tanggal_hari
+2. hitung_ulang() menghitung ulang rentang bulan dan/atau sekumpulan karyawan
+   sekaligus (set-based), misalnya setelah perubahan massal atau dari command line
+3. ambil_rekap() membaca rekap satu bulan untuk endpoint penggajian
+
+Penggunaan hitung ulang dari command line:
+    python rekap_bulanan.py [--mulai YYYY-MM] [--akhir YYYY-MM]
+"""
+
+import argparse
+import logging
+from datetime import date, datetime
+
+from sqlalchemy import Integer, case, cast, delete, func, insert, literal, select
+from sqlalchemy.types import DateTime
+
+from fungsi_sql import awal_bulan, durasi_detik
+from models import Absensi, Karyawan, RekapBulanan
+import arsip_absensi
+
+logger = logging.getLogger(__name__)
+
+# Kolom rekap_bulanan yang diisi dari query agregat, sesuai urutan kolom _query_rekap
+KOLOM_REKAP = [
+    "bulan",
+    "karyawan_id",
+    "hari_hadir",
+    "hari_pulang",
+    "detik_kerja",
+    "hari_uang_makan",
+    "hari_uang_transport",
+    "diperbarui_at",
+]
+
+
+def bulan_dari(tanggal):
+    """
+    Mengembalikan tanggal pertama bulan dari tanggal tersebut.
+    """
+    return date(tanggal.year, tanggal.month, 1)
+
+
+def parse_bulan(value):
+    """
+    Membaca bulan dalam format YYYY-MM.
+
+    Returns:
+        date: Tanggal pertama bulan tersebut
+
+    Raises:
+        ValueError: Jika format bulan tidak valid
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except (TypeError, ValueError):
+        raise ValueError("Format bulan harus YYYY-MM")
+
+
+def _bulan_berikutnya(bulan):
+    return date(bulan.year + 1, 1, 1) if bulan.month == 12 else date(bulan.year, bulan.month + 1, 1)
+
+
+def _query_rekap(kondisi):
+    """
+    Query agregat absensi per karyawan dan bulan.
+
+    Args:
+        kondisi (list): Klausa WHERE tambahan pada tabel absensi
+
+    Returns:
+        Select: Kolom sesuai urutan KOLOM_REKAP
+    """
+    bulan = awal_bulan(Absensi.tanggal_hari)
+    detik = func.coalesce(func.sum(durasi_detik(Absensi.jam_masuk, Absensi.jam_keluar)), 0)
+    return select(
+        bulan,
+        Absensi.karyawan_id,
+        func.count(func.distinct(Absensi.tanggal_hari)),
+        func.sum(case((Absensi.jam_keluar.isnot(None), 1), else_=0)),
+        cast(func.round(detik), Integer),
+        func.sum(case((Absensi.uang_makan == True, 1), else_=0)),  # noqa: E712
+        func.sum(case((Absensi.uang_transport == True, 1), else_=0)),  # noqa: E712
+        literal(datetime.now(), DateTime),
+    ).where(
+        Absensi.karyawan_id.isnot(None),
+        Absensi.tanggal_hari.isnot(None),
+        *kondisi
+    ).group_by(Absensi.karyawan_id, bulan)
+
+
+def hitung_ulang(db, bulan_mulai=None, bulan_akhir=None, karyawan_ids=None):
+    """
+    Menghitung ulang rekap untuk rentang bulan dan/atau karyawan tertentu (set-based).
+
+    Baris rekap lama dalam cakupan dihapus lalu diisi ulang dengan satu
+    INSERT ... SELECT, di transaksi yang sedang berjalan (tidak di-commit).
+    Bulan yang absensinya sudah diarsipkan (lihat arsip_absensi.awal_live) tidak
+    disentuh sehingga rekapnya tetap.
+
+    Args:
+        db (Session | Connection): Session atau koneksi database
+        bulan_mulai (date, optional): Bulan awal (tanggal berapa pun di bulan itu), default tanpa batas
+        bulan_akhir (date, optional): Bulan akhir, inklusif, default tanpa batas
+        karyawan_ids (list, optional): Batasi ke karyawan tertentu, default semua karyawan
+
+    Returns:
+        int: Jumlah baris rekap yang ditulis (-1 jika driver tidak melaporkannya)
+    """
+    kondisi_absensi = []
+    kondisi_rekap = []
+    awal_live = arsip_absensi.awal_live()
+    if awal_live is not None and (bulan_mulai is None or bulan_mulai < awal_live):
+        bulan_mulai = awal_live
+    if bulan_mulai is not None and bulan_akhir is not None and bulan_dari(bulan_akhir) < bulan_dari(bulan_mulai):
+        return 0
+    if bulan_mulai is not None:
+        bulan_mulai = bulan_dari(bulan_mulai)
+        # Rentang pada tanggal_hari agar index terpakai
+        kondisi_absensi.append(Absensi.tanggal_hari >= bulan_mulai)
+        kondisi_rekap.append(RekapBulanan.bulan >= bulan_mulai)
+    if bulan_akhir is not None:
+        batas = _bulan_berikutnya(bulan_dari(bulan_akhir))
+        kondisi_absensi.append(Absensi.tanggal_hari < batas)
+        kondisi_rekap.append(RekapBulanan.bulan < batas)
+    if karyawan_ids is not None:
+        kondisi_absensi.append(Absensi.karyawan_id.in_(karyawan_ids))
+        kondisi_rekap.append(RekapBulanan.karyawan_id.in_(karyawan_ids))
+
+    db.execute(delete(RekapBulanan).where(*kondisi_rekap))
+    result = db.execute(insert(RekapBulanan).from_select(KOLOM_REKAP, _query_rekap(kondisi_absensi)))
+    return result.rowcount
+
+
+def segarkan(db, karyawan_id, tanggal):
+    """
+    Menghitung ulang rekap satu karyawan pada bulan tanggal tersebut.
+
+    Dipanggil setelah absensi karyawan diubah di session; perubahan di-flush lebih
+    dulu agar ikut terhitung, dan rekap ikut di-rollback jika transaksi gagal.
+
+    Args:
+        db (Session): Session database
+        karyawan_id (int): ID karyawan
+        tanggal (date): Tanggal absensi yang berubah
+    """
+    if karyawan_id is None or tanggal is None:
+        return
+    db.flush()
+    bulan = bulan_dari(tanggal)
+    hitung_ulang(db, bulan, bulan, [karyawan_id])
+
+
+def hapus_karyawan(db, karyawan_id):
+    """
+    Menghapus seluruh rekap karyawan (sebelum karyawan dihapus).
+    """
+    db.query(RekapBulanan).filter(
+        RekapBulanan.karyawan_id == karyawan_id
+    ).delete(synchronize_session=False)
+
+
+def ambil_rekap(db, bulan, departemen=None):
+    """
+    Membaca rekap satu bulan beserta nama dan departemen karyawan.
+
+    Args:
+        db (Session): Session database
+        bulan (date): Tanggal pertama bulan
+        departemen (str, optional): Filter departemen
+
+    Returns:
+        list: dict per karyawan yang siap dikirim sebagai JSON, urut nama
+    """
+    query = db.query(RekapBulanan, Karyawan.nama, Karyawan.departemen).join(
+        Karyawan, RekapBulanan.karyawan_id == Karyawan.id
+    ).filter(RekapBulanan.bulan == bulan_dari(bulan))
+    if departemen:
+        query = query.filter(Karyawan.departemen == departemen)
+
+    return [
+        {
+            "karyawan_id": rekap.karyawan_id,
+            "nama": nama,
+            "departemen": departemen_karyawan,
+            "bulan": rekap.bulan.strftime("%Y-%m"),
+            "hari_hadir": rekap.hari_hadir,
+            "hari_pulang": rekap.hari_pulang,
+            "jam_kerja": rekap.jam_kerja,
+            "hari_uang_makan": rekap.hari_uang_makan,
+            "hari_uang_transport": rekap.hari_uang_transport,
+            "diperbarui_at": rekap.diperbarui_at.isoformat() if rekap.diperbarui_at else None,
+        }
+        for rekap, nama, departemen_karyawan in query.order_by(Karyawan.nama.asc())
+    ]
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Hitung ulang tabel rekap_bulanan")
+    parser.add_argument("--mulai", type=parse_bulan, help="Bulan awal YYYY-MM (default: seluruh riwayat)")
+    parser.add_argument("--akhir", type=parse_bulan, help="Bulan akhir YYYY-MM (default: seluruh riwayat)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        jumlah = hitung_ulang(db, args.mulai, args.akhir)
+        db.commit()
+        logger.info(f"Rekap bulanan dihitung ulang: {jumlah} baris")
+    finally:
+        db.close()
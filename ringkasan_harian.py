@@ -0,0 +1,302 @@
+"""
+Ringkasan absensi harian (materialized) untuk dashboard admin.
+
+Tabel ringkasan_harian menyimpan per tanggal dan per departemen jumlah karyawan,
+jumlah hadir, terlambat dan yang sudah absen keluar, ditambah satu baris
+departemen "*" untuk seluruh perusahaan. Dashboard cukup membaca satu baris
+berdasarkan primary key (tanggal, departemen), sebesar apa pun riwayat absensi.
+
+Alur pembaruan:
+1. pastikan_ringkasan() membuat baris hari itu (dihitung dari tabel absensi) jika
+   belum ada, dalam transaksi terpisah sebelum absensi ditulis
+2. catat_absen_masuk(), catat_absen_keluar() dan batalkan_absensi() menaikkan atau
+   menurunkan counter dengan UPDATE atomik di transaksi yang sama dengan absensi,
+   sehingga ringkasan ikut di-rollback jika absensi gagal disimpan
+3. rebuild() menghitung ulang ringkasan untuk rentang tanggal mana pun
+
+Penggunaan rebuild dari command line:
+    python ringkasan_harian.py [--mulai YYYY-MM-DD] [--akhir YYYY-MM-DD]
+"""
+
+import argparse
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+
+from models import Absensi, Karyawan, RingkasanHarian
+import arsip_absensi
+
+logger = logging.getLogger(__name__)
+
+# Nilai kolom departemen untuk ringkasan seluruh perusahaan
+SEMUA_DEPARTEMEN = "*"
+
+# Kolom counter untuk setiap status absen masuk
+KOLOM_STATUS = {
+    "Hadir": "hadir",
+    "Terlambat": "terlambat",
+}
+
+
+def _hitung_absensi(db, tanggal_mulai, tanggal_akhir):
+    """
+    Menghitung counter absensi per tanggal dan departemen dari tabel absensi.
+
+    Returns:
+        dict: Peta (tanggal, departemen) -> Counter(hadir, terlambat, pulang),
+              termasuk departemen SEMUA_DEPARTEMEN
+    """
+    rows = db.query(
+        Absensi.tanggal_hari,
+        Karyawan.departemen,
+        func.sum(case((Absensi.status == "Hadir", 1), else_=0)),
+        func.sum(case((Absensi.status == "Terlambat", 1), else_=0)),
+        func.sum(case((Absensi.jam_keluar.isnot(None), 1), else_=0)),
+    ).join(
+        Karyawan, Absensi.karyawan_id == Karyawan.id
+    ).filter(
+        # Rentang pada kolom tanggal agar index ix_absensi_tanggal_id terpakai
+        Absensi.tanggal >= datetime.combine(tanggal_mulai, time.min),
+        Absensi.tanggal < datetime.combine(tanggal_akhir + timedelta(days=1), time.min),
+        Absensi.tanggal_hari >= tanggal_mulai,
+        Absensi.tanggal_hari <= tanggal_akhir
+    ).group_by(Absensi.tanggal_hari, Karyawan.departemen).all()
+
+    counts = defaultdict(Counter)
+    for tanggal, departemen, hadir, terlambat, pulang in rows:
+        for key in ((tanggal, departemen), (tanggal, SEMUA_DEPARTEMEN)):
+            counts[key].update(hadir=hadir or 0, terlambat=terlambat or 0, pulang=pulang or 0)
+    return counts
+
+
+def _hitung_total_karyawan(db, tanggal_mulai, tanggal_akhir):
+    """
+    Menghitung jumlah karyawan yang sudah bergabung per tanggal dan departemen.
+
+    Returns:
+        dict: Peta tanggal -> Counter(departemen -> jumlah), termasuk SEMUA_DEPARTEMEN
+    """
+    karyawan = db.query(Karyawan.departemen, Karyawan.tanggal_bergabung).all()
+
+    totals = {}
+    tanggal = tanggal_mulai
+    while tanggal <= tanggal_akhir:
+        total = Counter()
+        for departemen, tanggal_bergabung in karyawan:
+            if tanggal_bergabung is None or tanggal_bergabung.date() <= tanggal:
+                total[departemen] += 1
+                total[SEMUA_DEPARTEMEN] += 1
+        totals[tanggal] = total
+        tanggal += timedelta(days=1)
+    return totals
+
+
+def _buat_baris(db, tanggal_mulai, tanggal_akhir, hanya=None):
+    """
+    Membuat objek RingkasanHarian hasil hitung ulang untuk rentang tanggal.
+
+    Args:
+        hanya (set, optional): Batasi ke pasangan (tanggal, departemen) tertentu
+
+    Returns:
+        list: Objek RingkasanHarian (belum ditambahkan ke session)
+    """
+    counts = _hitung_absensi(db, tanggal_mulai, tanggal_akhir)
+    totals = _hitung_total_karyawan(db, tanggal_mulai, tanggal_akhir)
+
+    keys = set(counts)
+    for tanggal, total in totals.items():
+        keys.update((tanggal, departemen) for departemen in total)
+        keys.add((tanggal, SEMUA_DEPARTEMEN))
+    if hanya is not None:
+        keys = set(hanya)
+
+    rows = []
+    for tanggal, departemen in sorted(keys):
+        counter = counts.get((tanggal, departemen), Counter())
+        rows.append(RingkasanHarian(
+            tanggal=tanggal,
+            departemen=departemen,
+            total_karyawan=totals.get(tanggal, Counter())[departemen],
+            hadir=counter["hadir"],
+            terlambat=counter["terlambat"],
+            pulang=counter["pulang"]
+        ))
+    return rows
+
+
+def pastikan_ringkasan(db, tanggal, departemen=None):
+    """
+    Memastikan baris ringkasan tanggal tersebut (seluruh perusahaan dan departemen) ada.
+
+    Baris yang belum ada dihitung dari tabel absensi lalu di-commit dalam transaksi
+    sendiri, sehingga harus dipanggil sebelum perubahan absensi ditambahkan ke
+    session. Jika permintaan lain membuat baris yang sama lebih dulu, baris
+    tersebut yang dipakai.
+
+    Args:
+        db (Session): Session database
+        tanggal (date): Tanggal ringkasan
+        departemen (str, optional): Departemen karyawan yang akan dicatat
+    """
+    wanted = {SEMUA_DEPARTEMEN}
+    if departemen:
+        wanted.add(departemen)
+
+    existing = {
+        row[0] for row in db.query(RingkasanHarian.departemen).filter(
+            RingkasanHarian.tanggal == tanggal,
+            RingkasanHarian.departemen.in_(wanted)
+        )
+    }
+    missing = {(tanggal, name) for name in wanted - existing}
+    if not missing:
+        return
+
+    try:
+        db.add_all(_buat_baris(db, tanggal, tanggal, hanya=missing))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+
+
+def _ubah_counter(db, tanggal, departemen, perubahan):
+    # UPDATE atomik kolom = kolom + delta untuk baris departemen dan seluruh perusahaan
+    values = {getattr(RingkasanHarian, kolom): getattr(RingkasanHarian, kolom) + delta for kolom, delta in perubahan.items()}
+    db.query(RingkasanHarian).filter(
+        RingkasanHarian.tanggal == tanggal,
+        RingkasanHarian.departemen.in_([SEMUA_DEPARTEMEN, departemen])
+    ).update(values, synchronize_session=False)
+
+
+def catat_absen_masuk(db, tanggal, departemen, status):
+    """
+    Menaikkan counter status absen masuk di transaksi yang sedang berjalan.
+
+    Args:
+        db (Session): Session database
+        tanggal (date): Tanggal absensi
+        departemen (str): Departemen karyawan
+        status (str): Status absensi (Hadir atau Terlambat)
+    """
+    kolom = KOLOM_STATUS.get(status)
+    if kolom:
+        _ubah_counter(db, tanggal, departemen, {kolom: 1})
+
+
+def catat_absen_keluar(db, tanggal, departemen):
+    """
+    Menaikkan counter absen keluar di transaksi yang sedang berjalan.
+    """
+    _ubah_counter(db, tanggal, departemen, {"pulang": 1})
+
+
+def batalkan_absensi(db, absensi, departemen):
+    """
+    Menurunkan counter untuk absensi yang akan dihapus, di transaksi yang sama.
+
+    Args:
+        db (Session): Session database
+        absensi (Absensi): Absensi yang akan dihapus
+        departemen (str): Departemen karyawan pemilik absensi
+    """
+    perubahan = {}
+    kolom = KOLOM_STATUS.get(absensi.status)
+    if kolom:
+        perubahan[kolom] = -1
+    if absensi.jam_keluar:
+        perubahan["pulang"] = -1
+    if perubahan and absensi.tanggal_hari:
+        _ubah_counter(db, absensi.tanggal_hari, departemen, perubahan)
+
+
+def segarkan_total_karyawan(db, tanggal=None):
+    """
+    Menghitung ulang kolom total_karyawan untuk baris ringkasan yang sudah ada.
+
+    Dipanggil setelah karyawan ditambah, diubah atau dihapus, lalu di-commit.
+
+    Args:
+        db (Session): Session database
+        tanggal (date, optional): Tanggal ringkasan (default hari ini)
+    """
+    tanggal = tanggal or datetime.now().date()
+    totals = _hitung_total_karyawan(db, tanggal, tanggal)[tanggal]
+    for row in db.query(RingkasanHarian).filter(RingkasanHarian.tanggal == tanggal):
+        row.total_karyawan = totals[row.departemen]
+    db.commit()
+
+
+def ambil_ringkasan(db, tanggal=None, departemen=SEMUA_DEPARTEMEN):
+    """
+    Membaca satu baris ringkasan (dibuat lebih dulu jika belum ada).
+
+    Args:
+        db (Session): Session database
+        tanggal (date, optional): Tanggal ringkasan (default hari ini)
+        departemen (str): Departemen, atau SEMUA_DEPARTEMEN untuk seluruh perusahaan
+
+    Returns:
+        RingkasanHarian: Baris ringkasan
+    """
+    tanggal = tanggal or datetime.now().date()
+    pastikan_ringkasan(db, tanggal, departemen)
+    return db.query(RingkasanHarian).filter(
+        RingkasanHarian.tanggal == tanggal,
+        RingkasanHarian.departemen == departemen
+    ).first()
+
+
+def rebuild(db, tanggal_mulai, tanggal_akhir):
+    """
+    Menghitung ulang seluruh ringkasan untuk rentang tanggal (inklusif).
+
+    Tanggal yang absensinya sudah diarsipkan (lihat arsip_absensi.awal_live) dilewati
+    sehingga ringkasannya tetap.
+
+    Args:
+        db (Session): Session database
+        tanggal_mulai (date): Tanggal awal
+        tanggal_akhir (date): Tanggal akhir
+
+    Returns:
+        int: Jumlah baris ringkasan yang ditulis
+    """
+    awal_live = arsip_absensi.awal_live()
+    if awal_live is not None and tanggal_mulai < awal_live:
+        tanggal_mulai = awal_live
+    if tanggal_mulai > tanggal_akhir:
+        db.commit()
+        return 0
+
+    db.query(RingkasanHarian).filter(
+        RingkasanHarian.tanggal >= tanggal_mulai,
+        RingkasanHarian.tanggal <= tanggal_akhir
+    ).delete(synchronize_session=False)
+    rows = _buat_baris(db, tanggal_mulai, tanggal_akhir)
+    db.add_all(rows)
+    db.commit()
+    return len(rows)
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Hitung ulang tabel ringkasan_harian")
+    parser.add_argument("--mulai", type=date.fromisoformat, help="Tanggal awal (default: absensi paling awal)")
+    parser.add_argument("--akhir", type=date.fromisoformat, help="Tanggal akhir (default: hari ini)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        mulai = args.mulai or db.query(func.min(Absensi.tanggal_hari)).scalar() or datetime.now().date()
+        akhir = args.akhir or datetime.now().date()
+        jumlah = rebuild(db, mulai, akhir)
+        logger.info(f"Ringkasan harian {mulai} sampai {akhir} dihitung ulang: {jumlah} baris")
+    finally:
+        db.close()
@@ -0,0 +1,155 @@
+"""
+Fixture bersama test: database SQLite sementara, direktori arsip sementara dan data absensi contoh.
+
+Test dijalankan dari root proyek:
+    pip install -r requirements-dev.txt
+    python -m pytest -q
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+import pytest
+
+# Modul database membuat engine dari DATABASE_URL saat diimpor; arahkan ke file sementara
+# agar absensi.db di direktori proyek tidak tersentuh
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="absensi-test-"), "app.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import absensi_terbuka  # noqa: E402
+import arsip_absensi  # noqa: E402
+import ringkasan_harian  # noqa: E402
+from models import Absensi, Base, Karyawan  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def arsip_dir(tmp_path, monkeypatch):
+    """
+    Direktori arsip kosong per test, dengan semua cache arsip dikosongkan.
+    """
+    path = tmp_path / "arsip"
+    monkeypatch.setattr(arsip_absensi, "ARSIP_DIR", str(path))
+    arsip_absensi._cache_clear()
+    arsip_absensi._invalidasi_daftar()
+    arsip_absensi.invalidasi_karyawan()
+    yield path
+    arsip_absensi._cache_clear()
+    arsip_absensi._invalidasi_daftar()
+    arsip_absensi.invalidasi_karyawan()
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """
+    Pembuat Session untuk database SQLite baru berisi skema terbaru dari models.py.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    """
+    Session database untuk satu test.
+    """
+    session = session_factory()
+    yield session
+    session.close()
+
+
+def tambah_karyawan(db, nama, departemen):
+    """
+    Menambahkan satu karyawan dengan data wajib minimal.
+    """
+    karyawan = Karyawan(
+        nama=nama, email=f"{nama.lower()}@contoh.id", no_telepon="0800", jabatan="Staf",
+        departemen=departemen, alamat="Jakarta"
+    )
+    db.add(karyawan)
+    db.flush()
+    return karyawan
+
+
+def tambah_absensi(db, karyawan, jam_masuk, jam_keluar=None, status="Hadir", uang_makan=False, uang_transport=False):
+    """
+    Menambahkan satu absensi; tanggal dan tanggal_hari mengikuti jam_masuk.
+    """
+    absensi = Absensi(
+        karyawan_id=karyawan.id, tanggal=jam_masuk, jam_masuk=jam_masuk, jam_keluar=jam_keluar,
+        status=status, uang_makan=uang_makan, uang_transport=uang_transport
+    )
+    db.add(absensi)
+    return absensi
+
+
+def absen_masuk(db, karyawan, jam_masuk, status="Hadir"):
+    """
+    Absen masuk seperti endpoint absensi: ringkasan dipastikan ada, lalu absensi,
+    absensi terbuka dan counter ringkasan di-commit dalam satu transaksi.
+    """
+    ringkasan_harian.pastikan_ringkasan(db, jam_masuk.date(), karyawan.departemen)
+    absensi = tambah_absensi(db, karyawan, jam_masuk, status=status)
+    absensi_terbuka.buka(db, absensi)
+    ringkasan_harian.catat_absen_masuk(db, jam_masuk.date(), karyawan.departemen, status)
+    db.commit()
+    return absensi
+
+
+def absen_keluar(db, absensi, jam_keluar):
+    """
+    Absen keluar seperti endpoint absensi untuk absensi yang ditemukan.
+    """
+    departemen = absensi.karyawan.departemen
+    ringkasan_harian.pastikan_ringkasan(db, absensi.tanggal_hari, departemen)
+    absensi.jam_keluar = jam_keluar
+    ringkasan_harian.catat_absen_keluar(db, absensi.tanggal_hari, departemen)
+    absensi_terbuka.tutup(db, absensi.karyawan_id)
+    db.commit()
+
+
+def hapus_absensi(db, absensi):
+    """
+    Menghapus absensi seperti endpoint hapus absensi admin.
+    """
+    ringkasan_harian.batalkan_absensi(db, absensi, absensi.karyawan.departemen)
+    absensi_terbuka.hapus_absensi(db, absensi.id)
+    db.delete(absensi)
+    db.commit()
+
+
+@pytest.fixture
+def data_absensi(db):
+    """
+    Absensi tiga karyawan (dua departemen) dari Januari sampai April 2024.
+
+    Data sengaja berisi nilai urutan yang sama (jam masuk dan status), jam_keluar
+    dan status NULL, sehingga urutan keyset harus memakai ID sebagai penentu.
+
+    Returns:
+        list: Karyawan yang dibuat
+    """
+    karyawan = [
+        tambah_karyawan(db, "Budi", "Produksi"),
+        tambah_karyawan(db, "Ani", "Keuangan"),
+        tambah_karyawan(db, "Citra", "Produksi"),
+    ]
+    hari = date(2024, 1, 8)
+    nomor = 0
+    while hari < date(2024, 4, 20):
+        for i, orang in enumerate(karyawan):
+            nomor += 1
+            # Budi dan Citra masuk pada jam yang sama
+            jam_masuk = datetime.combine(hari, datetime.min.time()) + timedelta(hours=7, minutes=30 if i == 1 else 0)
+            jam_keluar = None if nomor % 4 == 0 else jam_masuk + timedelta(hours=8, minutes=nomor % 50)
+            status = [None, "Hadir", "Terlambat"][nomor % 3]
+            tambah_absensi(db, orang, jam_masuk, jam_keluar, status, uang_makan=nomor % 2 == 0)
+        hari += timedelta(days=3)
+    db.commit()
+    return karyawan
@@ -0,0 +1,76 @@
+from datetime import date, datetime
+
+import absensi_terbuka
+from conftest import absen_keluar, absen_masuk, hapus_absensi, tambah_karyawan
+from models import Absensi, AbsensiTerbuka
+
+SENIN = date(2024, 3, 4)
+SELASA = date(2024, 3, 5)
+
+
+def cari_untuk_absen_keluar(db, karyawan_id, tanggal):
+    # Urutan pencarian endpoint absen keluar: absensi terbuka, lalu index tanggal_hari
+    absensi = absensi_terbuka.cari(db, karyawan_id, tanggal)
+    if absensi is not None:
+        return absensi, True
+    absensi = db.query(Absensi).filter(
+        Absensi.karyawan_id == karyawan_id,
+        Absensi.tanggal_hari == tanggal
+    ).first()
+    return absensi, False
+
+
+def test_absen_masuk_membuka_dan_absen_keluar_menutup(db):
+    budi = tambah_karyawan(db, "Budi", "Produksi")
+    ani = tambah_karyawan(db, "Ani", "Keuangan")
+    absensi = absen_masuk(db, budi, datetime(2024, 3, 4, 7, 55))
+    absen_masuk(db, ani, datetime(2024, 3, 4, 8, 0))
+
+    terbuka = db.get(AbsensiTerbuka, budi.id)
+    assert (terbuka.absensi_id, terbuka.tanggal_hari) == (absensi.id, SENIN)
+    assert absensi_terbuka.cari(db, budi.id, SENIN) is absensi
+    assert absensi_terbuka.cari(db, budi.id, SELASA) is None
+
+    absen_keluar(db, absensi, datetime(2024, 3, 4, 16, 0))
+    assert db.get(AbsensiTerbuka, budi.id) is None
+    assert absensi_terbuka.cari(db, budi.id, SENIN) is None
+    # Absensi terbuka karyawan lain tidak ikut tertutup
+    assert absensi_terbuka.cari(db, ani.id, SENIN) is not None
+
+
+def test_absen_keluar_kedua_terdeteksi_dari_tanggal_hari(db):
+    budi = tambah_karyawan(db, "Budi", "Produksi")
+    assert cari_untuk_absen_keluar(db, budi.id, SENIN) == (None, False)
+
+    absensi = absen_masuk(db, budi, datetime(2024, 3, 4, 7, 55))
+    assert cari_untuk_absen_keluar(db, budi.id, SENIN) == (absensi, True)
+
+    absen_keluar(db, absensi, datetime(2024, 3, 4, 16, 0))
+    ditemukan, terbuka = cari_untuk_absen_keluar(db, budi.id, SENIN)
+    assert ditemukan is absensi and not terbuka
+    assert ditemukan.jam_keluar == datetime(2024, 3, 4, 16, 0)
+
+
+def test_absensi_hari_sebelumnya_tertimpa(db):
+    budi = tambah_karyawan(db, "Budi", "Produksi")
+    # Lupa absen keluar hari Senin
+    senin = absen_masuk(db, budi, datetime(2024, 3, 4, 7, 55))
+    selasa = absen_masuk(db, budi, datetime(2024, 3, 5, 7, 50))
+
+    assert db.query(AbsensiTerbuka).count() == 1
+    assert absensi_terbuka.cari(db, budi.id, SENIN) is None
+    assert absensi_terbuka.cari(db, budi.id, SELASA) is selasa
+    assert senin.jam_keluar is None
+
+
+def test_hapus_absensi_menghapus_absensi_terbuka(db):
+    budi = tambah_karyawan(db, "Budi", "Produksi")
+    ani = tambah_karyawan(db, "Ani", "Keuangan")
+    absensi = absen_masuk(db, budi, datetime(2024, 3, 4, 7, 55))
+    absen_masuk(db, ani, datetime(2024, 3, 4, 8, 0))
+
+    hapus_absensi(db, absensi)
+
+    assert db.get(AbsensiTerbuka, budi.id) is None
+    assert cari_untuk_absen_keluar(db, budi.id, SENIN) == (None, False)
+    assert db.get(AbsensiTerbuka, ani.id) is not None
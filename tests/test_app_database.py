@@ -0,0 +1,8 @@
+import app.database.models
+from models import Base
+
+
+def test_semua_model_diekspos_ulang():
+    # Setiap model di models.py harus tersedia juga melalui app.database.models
+    for mapper in Base.registry.mappers:
+        assert getattr(app.database.models, mapper.class_.__name__, None) is mapper.class_
@@ -0,0 +1,112 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+import arsip_absensi
+import laporan
+from models import Absensi
+
+FILTERS = [
+    {},
+    {"departemen": "Produksi"},
+    {"tanggal_mulai": date(2024, 2, 15), "tanggal_akhir": date(2024, 3, 20)},
+    {"status": "Hadir"},
+]
+
+
+def semua_halaman(db, filters, sort, direction, limit):
+    # Membaca semua halaman laporan dengan cursor, mengembalikan (ID berurutan, total halaman pertama)
+    ids, cursor, total = [], None, None
+    while True:
+        page = laporan.fetch_page(db, filters, sort, direction, cursor, limit)
+        if cursor is None:
+            total = page["total"]
+        assert len(page["data"]) <= limit
+        ids.extend(row["id"] for row in page["data"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids, total
+
+
+@pytest.fixture
+def urutan_sebelum_arsip(db, data_absensi):
+    # Urutan laporan dari SQL saja (satu halaman besar) sebelum absensi diarsipkan
+    return {
+        (i, sort, direction): laporan.fetch_page(db, filters, sort, direction, None, laporan.MAX_PAGE_SIZE)
+        for i, filters in enumerate(FILTERS)
+        for sort in laporan.SORT_COLUMNS
+        for direction in ("asc", "desc")
+    }
+
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+@pytest.mark.parametrize("sort", sorted(laporan.SORT_COLUMNS))
+def test_halaman_melintasi_batas_arsip(db, urutan_sebelum_arsip, sort, direction):
+    dipindahkan = arsip_absensi.arsipkan(db, date(2024, 3, 1))
+    assert dipindahkan > 0
+    assert arsip_absensi.bulan_arsip() == (date(2024, 1, 1), date(2024, 2, 1))
+    assert db.query(Absensi).filter(Absensi.tanggal_hari < date(2024, 3, 1)).count() == 0
+
+    for i, filters in enumerate(FILTERS):
+        expected = urutan_sebelum_arsip[(i, sort, direction)]
+        assert expected["next_cursor"] is None
+        ids, total = semua_halaman(db, filters, sort, direction, limit=7)
+        assert ids == [row["id"] for row in expected["data"]]
+        assert total == expected["total"]
+
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+def test_jam_keluar_null_di_arsip_dan_tabel(db, data_absensi, direction):
+    tanpa_keluar = sorted(row.id for row in db.query(Absensi.id).filter(Absensi.jam_keluar.is_(None)))
+    arsip_absensi.arsipkan(db, date(2024, 3, 1))
+    sisa = {row.id for row in db.query(Absensi.id)}
+    assert set(tanpa_keluar) - sisa and set(tanpa_keluar) & sisa
+
+    # NULL diurutkan sebagai nilai terkecil (sama dengan COALESCE di SQL), sesama NULL urut ID
+    ids, _ = semua_halaman(db, {}, "jam_keluar", direction, limit=5)
+    if direction == "asc":
+        assert ids[:len(tanpa_keluar)] == tanpa_keluar
+    else:
+        assert ids[-len(tanpa_keluar):] == tanpa_keluar[::-1]
+
+
+def test_halaman_arsip_membuat_baris_terbatas(db, data_absensi, monkeypatch):
+    arsip_absensi.arsipkan(db, date(2024, 3, 1))
+    dibuat = []
+    asli = arsip_absensi._baris
+
+    def hitung(columns, indeks, karyawan):
+        dibuat.append(len(indeks))
+        return asli(columns, indeks, karyawan)
+
+    monkeypatch.setattr(arsip_absensi, "_baris", hitung)
+    page = laporan.fetch_page(db, {}, "nama", "asc", None, 3)
+    laporan.fetch_page(db, {}, "nama", "asc", page["next_cursor"], 3)
+
+    # Paling banyak limit + 1 baris per bulan arsip per halaman
+    assert dibuat and max(dibuat) <= 4
+
+
+def test_peta_karyawan_di_cache_sampai_invalidasi(db, data_absensi):
+    peta = arsip_absensi.peta_karyawan(db)
+    data_absensi[0].nama = "Bambang"
+    db.commit()
+    assert arsip_absensi.peta_karyawan(db) is peta
+
+    arsip_absensi.invalidasi_karyawan()
+    assert "Bambang" in arsip_absensi.peta_karyawan(db).nama.tolist()
+
+
+@pytest.mark.parametrize("turun", [False, True])
+@pytest.mark.parametrize("jumlah", [1, 5, 40, 100])
+def test_teratas_sama_dengan_urutan_penuh(turun, jumlah):
+    rng = np.random.default_rng(7)
+    keys = rng.choice(np.array(["Hadir", "Terlambat", ""]), size=60)
+    ids = rng.permutation(1000)[:60]
+
+    urutan = np.lexsort((ids, keys))
+    if turun:
+        urutan = urutan[::-1]
+    pilihan = arsip_absensi._teratas(keys, ids, jumlah, turun)
+    assert pilihan.tolist() == urutan[:jumlah].tolist()
@@ -0,0 +1,63 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import date
+
+import pytest
+
+import arsip_absensi
+import ekspor_laporan
+from models import Absensi
+
+
+@pytest.fixture
+def batch_kecil(monkeypatch):
+    # Beberapa batch per ekspor agar pemotongan output ikut teruji
+    monkeypatch.setattr(ekspor_laporan, "LAPORAN_EKSPOR_BATCH", 7)
+
+
+def baca_csv(session_factory, filters):
+    chunks = list(ekspor_laporan.iter_csv(session_factory, filters))
+    assert len(chunks) > 2
+    text = b"".join(chunks).decode("utf-8")
+    assert text.startswith("\ufeff")
+    return list(csv.reader(io.StringIO(text[1:])))
+
+
+def test_csv_berisi_semua_baris_urut_tanggal(db, session_factory, data_absensi, batch_kecil):
+    rows = baca_csv(session_factory, {})
+    assert rows[0] == [header for header, _ in ekspor_laporan.HEADERS]
+    assert len(rows) - 1 == db.query(Absensi).count()
+    assert [row[0] for row in rows[1:]] == [str(nomor) for nomor in range(1, len(rows))]
+
+    tanggal = [row[2][6:] + row[2][3:5] + row[2][:2] for row in rows[1:]]
+    assert tanggal == sorted(tanggal)
+
+
+def test_csv_menyertakan_arsip_lebih_dulu(db, session_factory, data_absensi, batch_kecil):
+    sebelum = baca_csv(session_factory, {"departemen": "Produksi"})
+    arsip_absensi.arsipkan(db, date(2024, 3, 1))
+    assert baca_csv(session_factory, {"departemen": "Produksi"}) == sebelum
+
+
+def test_xlsx_valid_dan_lengkap(db, session_factory, data_absensi, batch_kecil):
+    arsip_absensi.arsipkan(db, date(2024, 2, 1))
+    data = b"".join(ekspor_laporan.iter_xlsx(session_factory, {}, "Semua Karyawan"))
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert "xl/workbook.xml" in archive.namelist()
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+
+    row_numbers = [int(value) for value in re.findall(r'<row r="(\d+)"', sheet)]
+    assert row_numbers == sorted(row_numbers)
+    # Kop (4 baris), judul kolom, baris data dan 3 baris tanda tangan
+    assert len(row_numbers) == 4 + 1 + db.query(Absensi).count() + arsip_absensi.jumlah_arsip(
+        {}, arsip_absensi.peta_karyawan(db)
+    ) + 3
+
+
+def test_format_tidak_dikenal(session_factory):
+    with pytest.raises(ValueError):
+        ekspor_laporan.iter_export(session_factory, {}, "pdf", "Laporan")
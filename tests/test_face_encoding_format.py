@@ -0,0 +1,97 @@
+import json
+
+import numpy as np
+import pytest
+
+import face_encoding_format
+from face_encoding_format import ENCODING_DIM, HEADER_SIZE, RECORD_SIZE
+
+
+@pytest.fixture
+def encoding():
+    return np.random.default_rng(3).normal(0, 0.1, ENCODING_DIM)
+
+
+def test_v1_bolak_balik(encoding):
+    raw = face_encoding_format.encode(encoding)
+    assert len(raw) == RECORD_SIZE
+    assert face_encoding_format.is_current(raw)
+
+    hasil = face_encoding_format.decode(raw)
+    assert hasil.dtype == np.float32 and hasil.shape == (ENCODING_DIM,)
+    np.testing.assert_array_equal(hasil, encoding.astype(np.float32))
+    assert face_encoding_format.encode(hasil) == raw
+    np.testing.assert_array_equal(face_encoding_format.decode(memoryview(raw)), hasil)
+
+
+@pytest.mark.parametrize("format_lama", ["json", "json_bytes", "float64"])
+def test_format_lama(encoding, format_lama):
+    raw = {
+        "json": lambda: json.dumps(encoding.tolist()),
+        "json_bytes": lambda: json.dumps(encoding.tolist()).encode("utf-8"),
+        "float64": lambda: encoding.astype(np.float64).tobytes(),
+    }[format_lama]()
+
+    assert not face_encoding_format.is_current(raw)
+    hasil = face_encoding_format.decode(raw)
+    assert hasil.dtype == np.float32
+    np.testing.assert_array_equal(hasil, encoding.astype(np.float32))
+
+
+def ganti_header(raw, offset, value):
+    raw = bytearray(raw)
+    raw[offset:offset + len(value)] = value
+    return bytes(raw)
+
+
+@pytest.mark.parametrize("rusak", [
+    lambda raw: ganti_header(raw, 2, b"\x02"),  # versi
+    lambda raw: ganti_header(raw, 3, b"\x02"),  # kode dtype
+    lambda raw: ganti_header(raw, 4, (64).to_bytes(2, "little")),  # dimensi
+    lambda raw: raw[:HEADER_SIZE + 16],  # payload terpotong
+    lambda raw: b"XX" + raw[2:],  # magic
+    lambda raw: json.dumps([0.1] * 64),  # JSON dengan dimensi salah
+    lambda raw: np.zeros(ENCODING_DIM, dtype=np.float32).tobytes(),  # float32 mentah tanpa header
+])
+def test_format_tidak_valid_ditolak(encoding, rusak):
+    raw = rusak(face_encoding_format.encode(encoding))
+    assert not face_encoding_format.is_current(raw)
+    with pytest.raises(ValueError):
+        face_encoding_format.decode(raw)
+
+
+def test_encode_dimensi_salah_ditolak():
+    with pytest.raises(ValueError):
+        face_encoding_format.encode(np.zeros(ENCODING_DIM + 1))
+
+
+def test_decode_many_sama_dengan_decode_per_baris():
+    rng = np.random.default_rng(7)
+    encodings = rng.normal(0, 0.1, (6, ENCODING_DIM))
+    current = [face_encoding_format.encode(item) for item in encodings]
+
+    # Jalur cepat: semua record versi saat ini
+    matrix, valid = face_encoding_format.decode_many(current)
+    assert valid.all() and matrix.shape == (6, ENCODING_DIM)
+    for row, raw in zip(matrix, current):
+        np.testing.assert_array_equal(row, face_encoding_format.decode(raw))
+
+    # Jalur campuran: format lama didekode per baris, record rusak dilewati
+    mixed = [
+        current[0],
+        json.dumps(encodings[1].tolist()),
+        b"rusak",
+        encodings[3].tobytes(),
+        ganti_header(current[4], 3, b"\x02"),
+        current[5],
+    ]
+    matrix, valid = face_encoding_format.decode_many(mixed)
+    assert valid.tolist() == [True, True, False, True, False, True]
+    assert matrix.shape == (4, ENCODING_DIM)
+    for row, raw in zip(matrix, [raw for raw, ok in zip(mixed, valid) if ok]):
+        np.testing.assert_array_equal(row, face_encoding_format.decode(raw))
+
+
+def test_decode_many_kosong():
+    matrix, valid = face_encoding_format.decode_many([])
+    assert matrix.shape == (0, ENCODING_DIM) and valid.shape == (0,)
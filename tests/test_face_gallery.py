@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from conftest import tambah_karyawan
+from face_encoding_format import ENCODING_DIM
+from face_gallery import FaceGallery, FaceGalleryService, save_face_template
+
+
+def galeri_baru(model):
+    # Galeri yang dibangun dari awal dari isi model {template_id: (karyawan_id, encoding)}
+    template_ids = sorted(model)
+    return FaceGallery(
+        [model[template_id][0] for template_id in template_ids],
+        np.array([model[template_id][1] for template_id in template_ids]).reshape(-1, ENCODING_DIM),
+        template_ids=template_ids
+    )
+
+
+def sama(snapshot, expected, queries):
+    assert len(snapshot) == len(expected)
+    for query in queries:
+        owners, distances = snapshot.owner_distances(query)
+        expected_owners, expected_distances = expected.owner_distances(query)
+        np.testing.assert_array_equal(owners, expected_owners)
+        np.testing.assert_allclose(distances, expected_distances, rtol=1e-5, atol=1e-5)
+        assert snapshot.match(query, tolerance=np.inf) == pytest.approx(expected.match(query, tolerance=np.inf))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_perubahan_acak_sama_dengan_galeri_baru(db, monkeypatch, seed):
+    rng = np.random.default_rng(seed)
+    vektor = lambda: rng.normal(0, 0.1, ENCODING_DIM).astype(np.float32)  # noqa: E731
+
+    model = {}
+    karyawan_ids = []
+    for nama in ("Budi", "Ani", "Citra"):
+        karyawan = tambah_karyawan(db, nama, "Produksi")
+        karyawan_ids.append(karyawan.id)
+        for _ in range(2):
+            encoding = vektor()
+            template, _ = save_face_template(db, karyawan.id, encoding)
+            model[template.id] = (karyawan.id, encoding)
+    db.commit()
+    owners = karyawan_ids + [101, 102, 103]
+
+    service = FaceGalleryService()
+    monkeypatch.setattr(service, "INITIAL_CAPACITY", 4)
+    pemadatan = []
+    compact = service._compact
+    monkeypatch.setattr(service, "_compact", lambda grow: (pemadatan.append(grow), compact(grow)))
+    service.reload(db)
+
+    queries = [vektor() for _ in range(3)]
+    sama(service.snapshot(), galeri_baru(model), queries)
+    next_id = max(model) + 1
+    lama = []
+
+    for _ in range(150):
+        operasi = rng.choice(["add", "add", "recycle", "replace", "remove", "remove_template"])
+        if operasi == "add":
+            owner = int(rng.choice(owners))
+            model[next_id] = (owner, vektor())
+            service.add(owner, next_id, model[next_id][1])
+            next_id += 1
+        elif operasi == "recycle" and model:
+            # Template terlama didaur ulang saat batas template tercapai
+            template_id = int(rng.choice(sorted(model)))
+            owner = model[template_id][0]
+            model[template_id] = (owner, vektor())
+            service.add(owner, template_id, model[template_id][1])
+        elif operasi == "replace":
+            owner = int(rng.choice(owners))
+            model = {key: value for key, value in model.items() if value[0] != owner}
+            templates = []
+            for _ in range(int(rng.integers(0, 4))):
+                model[next_id] = (owner, vektor())
+                templates.append((next_id, model[next_id][1]))
+                next_id += 1
+            service.replace(owner, templates)
+        elif operasi == "remove":
+            owner = int(rng.choice(owners))
+            model = {key: value for key, value in model.items() if value[0] != owner}
+            service.remove(owner)
+        elif operasi == "remove_template":
+            # Termasuk template yang tidak ada di galeri
+            template_id = int(rng.integers(1, next_id + 1))
+            model.pop(template_id, None)
+            service.remove_template(template_id)
+
+        snapshot = service.snapshot()
+        expected = galeri_baru(model)
+        sama(snapshot, expected, queries)
+        if rng.random() < 0.1:
+            lama.append((snapshot, expected))
+
+    # Pemadatan (buffer penuh dan banyak baris mati) ikut teruji
+    assert True in pemadatan and False in pemadatan
+    # Snapshot lama tidak berubah oleh penulis, termasuk setelah pemadatan
+    for snapshot, expected in lama:
+        snapshot._segments = None  # Pengelompokan pemilik dihitung ulang dari owner_ids snapshot
+        sama(snapshot, expected, queries)
+
+
+def test_galeri_kosong():
+    service = FaceGalleryService()
+    with pytest.raises(RuntimeError):
+        service.snapshot()
+
+    gallery = galeri_baru({})
+    assert gallery.match(np.zeros(ENCODING_DIM)) == (None, None)
@@ -0,0 +1,69 @@
+from datetime import date, datetime
+
+import pytest
+
+import laporan
+from models import Absensi, Karyawan
+
+# Nilai urutan setiap kolom laporan dihitung di Python, NULL sebagai nilai terkecil
+NILAI_URUTAN = {
+    "tanggal": lambda absensi, karyawan: absensi.tanggal,
+    "jam_masuk": lambda absensi, karyawan: absensi.jam_masuk or datetime(1900, 1, 1),
+    "jam_keluar": lambda absensi, karyawan: absensi.jam_keluar or datetime(1900, 1, 1),
+    "nama": lambda absensi, karyawan: karyawan.nama,
+    "departemen": lambda absensi, karyawan: karyawan.departemen,
+    "status": lambda absensi, karyawan: absensi.status or "",
+}
+
+
+def urutan_python(db, sort, direction, filters=None):
+    rows = db.query(Absensi, Karyawan).join(Karyawan, Absensi.karyawan_id == Karyawan.id).all()
+    if filters and "departemen" in filters:
+        rows = [(absensi, karyawan) for absensi, karyawan in rows if karyawan.departemen == filters["departemen"]]
+    rows.sort(key=lambda pair: (NILAI_URUTAN[sort](*pair), pair[0].id), reverse=direction == "desc")
+    return [absensi.id for absensi, _ in rows]
+
+
+def semua_halaman(db, filters, sort, direction, limit):
+    ids, cursor = [], None
+    while True:
+        page = laporan.fetch_page(db, filters, sort, direction, cursor, limit)
+        assert len(page["data"]) <= limit
+        ids.extend(row["id"] for row in page["data"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("value", [datetime(2024, 3, 5, 7, 30, 15), "Produksi", ""])
+def test_cursor_bolak_balik(value):
+    value_type = "datetime" if isinstance(value, datetime) else "string"
+    cursor = laporan.encode_cursor(value, 42)
+    assert laporan.decode_cursor(cursor, value_type) == (value, 42)
+
+
+def test_cursor_tidak_valid():
+    with pytest.raises(ValueError):
+        laporan.decode_cursor("bukan-cursor", "datetime")
+
+
+def test_filter_tanggal_terbalik_ditolak():
+    with pytest.raises(ValueError):
+        laporan.parse_filters("2024-03-01", "2024-02-01")
+
+
+@pytest.mark.parametrize("direction", ["asc", "desc"])
+@pytest.mark.parametrize("sort", sorted(laporan.SORT_COLUMNS))
+def test_keyset_pagination_sama_dengan_urutan_penuh(db, data_absensi, sort, direction):
+    for filters in ({}, {"departemen": "Produksi"}):
+        assert semua_halaman(db, filters, sort, direction, limit=6) == urutan_python(db, sort, direction, filters)
+
+
+def test_total_hanya_di_halaman_pertama(db, data_absensi):
+    filters = laporan.parse_filters("2024-02-01", "2024-02-29")
+    page = laporan.fetch_page(db, filters, limit=5)
+    expected = db.query(Absensi).filter(
+        Absensi.tanggal_hari >= date(2024, 2, 1), Absensi.tanggal_hari <= date(2024, 2, 29)
+    ).count()
+    assert page["total"] == expected
+    assert laporan.fetch_page(db, filters, cursor=page["next_cursor"], limit=5)["total"] is None
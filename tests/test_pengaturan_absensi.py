@@ -0,0 +1,131 @@
+from datetime import date, datetime, time
+
+import pytest
+
+import pengaturan_absensi
+import ringkasan_harian
+from conftest import tambah_absensi, tambah_karyawan
+from models import Pengaturan, RingkasanHarian
+from pengaturan_absensi import PengaturanAbsensi
+
+
+@pytest.fixture(autouse=True)
+def cache_kosong():
+    # Cache pengaturan adalah state modul; setiap test mulai dari cache kosong
+    pengaturan_absensi.invalidasi()
+    yield
+    pengaturan_absensi.invalidasi()
+
+
+def simpan_pengaturan(db, jam_masuk, toleransi):
+    # Langkah yang sama dengan endpoint update_pengaturan: ubah, commit, invalidasi
+    pengaturan = db.query(Pengaturan).first() or Pengaturan()
+    pengaturan.jam_masuk = jam_masuk
+    pengaturan.jam_keluar = "16:00"
+    pengaturan.toleransi_keterlambatan = toleransi
+    db.add(pengaturan)
+    db.commit()
+    pengaturan_absensi.invalidasi()
+
+
+def ringkasan(db, tanggal):
+    return {
+        row.departemen: (row.hadir, row.terlambat, row.pulang)
+        for row in db.query(RingkasanHarian).filter(RingkasanHarian.tanggal == tanggal)
+    }
+
+
+@pytest.mark.parametrize("jam, status", [
+    (time(7, 0), "Hadir"),
+    (time(8, 15, 0), "Hadir"),
+    (time(8, 15, 0, 999999), "Hadir"),
+    (time(8, 15, 1), "Terlambat"),
+    (time(13, 0), "Terlambat"),
+])
+def test_status_masuk_di_sekitar_batas(jam, status):
+    pengaturan = PengaturanAbsensi(time(8, 0), time(16, 0), 15)
+    assert pengaturan.batas_terlambat == time(8, 15)
+    assert pengaturan.status_masuk(datetime.combine(date(2024, 3, 4), jam)) == status
+
+
+def test_batas_tidak_melewati_tengah_malam():
+    pengaturan = PengaturanAbsensi(time(23, 50), None, 20)
+    assert pengaturan.batas_terlambat == time(23, 59, 59)
+    assert pengaturan.status_masuk(datetime(2024, 3, 4, 23, 59, 59)) == "Hadir"
+
+
+def test_tanpa_pengaturan_selalu_hadir():
+    pengaturan = PengaturanAbsensi.dari_model(None)
+    assert pengaturan.batas_terlambat is None
+    assert pengaturan.status_masuk(datetime(2024, 3, 4, 23, 0)) == "Hadir"
+
+
+def test_cache_dimuat_ulang_setelah_invalidasi(db):
+    simpan_pengaturan(db, "08:00", 15)
+    assert pengaturan_absensi.ambil(db).batas_terlambat == time(8, 15)
+
+    # Perubahan tanpa invalidasi belum terlihat dari cache
+    db.query(Pengaturan).first().toleransi_keterlambatan = 30
+    db.commit()
+    assert pengaturan_absensi.ambil(db).batas_terlambat == time(8, 15)
+
+    simpan_pengaturan(db, "07:30", 5)
+    assert pengaturan_absensi.ambil(db).batas_terlambat == time(7, 35)
+
+
+def test_cache_kedaluwarsa_setelah_ttl(db, monkeypatch):
+    monkeypatch.setattr(pengaturan_absensi, "PENGATURAN_CACHE_TTL", 60)
+    simpan_pengaturan(db, "08:00", 15)
+    snapshot = pengaturan_absensi.ambil(db)
+
+    db.query(Pengaturan).first().toleransi_keterlambatan = 30
+    db.commit()
+    assert pengaturan_absensi.ambil(db) is snapshot
+
+    monkeypatch.setattr(pengaturan_absensi, "_dimuat_pada", pengaturan_absensi._dimuat_pada - 61)
+    assert pengaturan_absensi.ambil(db).batas_terlambat == time(8, 30)
+
+
+def test_ttl_nol_tidak_pernah_kedaluwarsa(db, monkeypatch):
+    monkeypatch.setattr(pengaturan_absensi, "PENGATURAN_CACHE_TTL", 0)
+    simpan_pengaturan(db, "08:00", 15)
+    snapshot = pengaturan_absensi.ambil(db)
+
+    monkeypatch.setattr(pengaturan_absensi, "_dimuat_pada", pengaturan_absensi._dimuat_pada - 10 ** 6)
+    assert pengaturan_absensi.ambil(db) is snapshot
+
+
+def test_hitung_ulang_status_sejak_tanggal(db):
+    budi = tambah_karyawan(db, "Budi", "Produksi")
+    ani = tambah_karyawan(db, "Ani", "Keuangan")
+    sebelum = [
+        tambah_absensi(db, budi, datetime(2024, 3, 4, 8, 20), status="Hadir"),
+        tambah_absensi(db, ani, datetime(2024, 3, 4, 7, 50), status="Terlambat"),
+    ]
+    sesudah = [
+        tambah_absensi(db, budi, datetime(2024, 3, 5, 8, 20), datetime(2024, 3, 5, 16, 0), status="Hadir"),
+        tambah_absensi(db, ani, datetime(2024, 3, 5, 8, 15), status="Terlambat"),
+        tambah_absensi(db, budi, datetime(2024, 3, 6, 8, 15, 0, 500000), status="Terlambat"),
+        tambah_absensi(db, ani, datetime(2024, 3, 6, 8, 15, 1), status="Hadir"),
+    ]
+    izin = tambah_absensi(db, budi, datetime(2024, 3, 7, 9, 0), status="Izin")
+    db.commit()
+    ringkasan_harian.rebuild(db, date(2024, 3, 4), date(2024, 3, 7))
+    ringkasan_4_maret = ringkasan(db, date(2024, 3, 4))
+
+    # Sama dengan update_pengaturan dengan terapkan_sejak=2024-03-05
+    simpan_pengaturan(db, "08:00", 15)
+    jumlah = pengaturan_absensi.hitung_ulang_status(db, date(2024, 3, 5), date(2024, 3, 7))
+
+    assert jumlah == len(sesudah)
+    db.expire_all()
+    pengaturan = pengaturan_absensi.ambil(db)
+    assert [absensi.status for absensi in sesudah] == [pengaturan.status_masuk(absensi.jam_masuk) for absensi in sesudah]
+    assert [absensi.status for absensi in sesudah] == ["Terlambat", "Hadir", "Hadir", "Terlambat"]
+    assert [absensi.status for absensi in sebelum] == ["Hadir", "Terlambat"]
+    assert izin.status == "Izin"
+
+    # Ringkasan tanggal yang dihitung ulang mengikuti status baru, tanggal sebelumnya tetap
+    assert ringkasan(db, date(2024, 3, 4)) == ringkasan_4_maret
+    assert ringkasan(db, date(2024, 3, 5)) == {"*": (1, 1, 1), "Produksi": (0, 1, 1), "Keuangan": (1, 0, 0)}
+    assert ringkasan(db, date(2024, 3, 6)) == {"*": (1, 1, 0), "Produksi": (1, 0, 0), "Keuangan": (0, 1, 0)}
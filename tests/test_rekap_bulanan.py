@@ -0,0 +1,90 @@
+from datetime import date, datetime
+
+import pytest
+
+import arsip_absensi
+import rekap_bulanan
+from conftest import tambah_absensi, tambah_karyawan
+from models import RekapBulanan
+
+
+def rekap(db, bulan):
+    return {
+        row["nama"]: {key: value for key, value in row.items() if key != "diperbarui_at"}
+        for row in rekap_bulanan.ambil_rekap(db, bulan)
+    }
+
+
+@pytest.fixture
+def februari(db):
+    """
+    Absensi Februari 2024 dengan nilai rekap yang dihitung manual, ditambah absensi di bulan tetangga.
+    """
+    budi = tambah_karyawan(db, "Budi", "Produksi")
+    ani = tambah_karyawan(db, "Ani", "Keuangan")
+    tambah_absensi(db, budi, datetime(2024, 1, 31, 7, 0), datetime(2024, 1, 31, 15, 0), uang_makan=True)
+    tambah_absensi(db, budi, datetime(2024, 2, 5, 7, 0), datetime(2024, 2, 5, 15, 30), uang_makan=True, uang_transport=True)
+    tambah_absensi(db, budi, datetime(2024, 2, 6, 8, 0), datetime(2024, 2, 6, 16, 15), uang_makan=True)
+    terbuka = tambah_absensi(db, budi, datetime(2024, 2, 7, 7, 45))
+    tambah_absensi(db, budi, datetime(2024, 3, 1, 7, 0), datetime(2024, 3, 1, 15, 0), uang_transport=True)
+    tambah_absensi(db, ani, datetime(2024, 2, 10, 9, 0), datetime(2024, 2, 10, 17, 0), status="Terlambat")
+    db.commit()
+    return budi, ani, terbuka
+
+
+def test_hitung_ulang_sama_dengan_hitungan_manual(db, februari):
+    budi, ani, _ = februari
+    rekap_bulanan.hitung_ulang(db)
+    db.commit()
+
+    assert rekap(db, date(2024, 2, 1)) == {
+        # 8,5 jam + 8,25 jam; absensi 7 Februari belum absen keluar
+        "Budi": {
+            "karyawan_id": budi.id, "nama": "Budi", "departemen": "Produksi", "bulan": "2024-02",
+            "hari_hadir": 3, "hari_pulang": 2, "jam_kerja": 16.75,
+            "hari_uang_makan": 2, "hari_uang_transport": 1,
+        },
+        "Ani": {
+            "karyawan_id": ani.id, "nama": "Ani", "departemen": "Keuangan", "bulan": "2024-02",
+            "hari_hadir": 1, "hari_pulang": 1, "jam_kerja": 8.0,
+            "hari_uang_makan": 0, "hari_uang_transport": 0,
+        },
+    }
+    assert db.get(RekapBulanan, (date(2024, 2, 1), budi.id)).detik_kerja == 60300
+    assert rekap(db, date(2024, 1, 15))["Budi"]["jam_kerja"] == 8.0
+    assert rekap(db, date(2024, 3, 1))["Budi"]["hari_uang_transport"] == 1
+
+
+def test_segarkan_satu_karyawan_satu_bulan(db, februari):
+    budi, ani, terbuka = februari
+    rekap_bulanan.hitung_ulang(db)
+    db.commit()
+
+    terbuka.jam_keluar = datetime(2024, 2, 7, 16, 0)
+    rekap_bulanan.segarkan(db, budi.id, terbuka.tanggal_hari)
+    db.commit()
+
+    hasil = rekap(db, date(2024, 2, 1))
+    assert hasil["Budi"]["hari_pulang"] == 3
+    assert hasil["Budi"]["jam_kerja"] == 25.0
+    assert hasil["Ani"]["jam_kerja"] == 8.0
+    assert rekap(db, date(2024, 1, 1))["Budi"]["hari_hadir"] == 1
+
+
+def test_bulan_arsip_tidak_dihitung_ulang(db, februari):
+    rekap_bulanan.hitung_ulang(db)
+    db.commit()
+    januari = rekap(db, date(2024, 1, 1))
+
+    arsip_absensi.arsipkan(db, date(2024, 2, 1))
+    rekap_bulanan.hitung_ulang(db)
+    db.commit()
+
+    assert rekap(db, date(2024, 1, 1)) == januari
+    assert rekap(db, date(2024, 2, 1))["Budi"]["jam_kerja"] == 16.75
+
+
+def test_parse_bulan():
+    assert rekap_bulanan.parse_bulan("2024-02") == date(2024, 2, 1)
+    with pytest.raises(ValueError):
+        rekap_bulanan.parse_bulan("02-2024")
@@ -0,0 +1,108 @@
+from datetime import date, datetime
+
+import pytest
+
+import arsip_absensi
+import ringkasan_harian
+from conftest import absen_keluar, absen_masuk, hapus_absensi, tambah_absensi, tambah_karyawan
+from models import RingkasanHarian
+
+SENIN = date(2024, 3, 4)
+SELASA = date(2024, 3, 5)
+
+
+def isi_ringkasan(db):
+    return {
+        (row.tanggal, row.departemen): (row.total_karyawan, row.hadir, row.terlambat, row.pulang)
+        for row in db.query(RingkasanHarian)
+    }
+
+
+def cocok_dengan_rebuild(db):
+    # Counter yang dinaikkan/diturunkan per absensi harus sama dengan hitung ulang penuh
+    counter = isi_ringkasan(db)
+    ringkasan_harian.rebuild(db, SENIN, SELASA)
+    hasil_rebuild = isi_ringkasan(db)
+    assert set(counter) <= set(hasil_rebuild)
+    assert counter == {key: hasil_rebuild[key] for key in counter}
+    return counter
+
+
+@pytest.fixture
+def karyawan(db):
+    orang = [
+        tambah_karyawan(db, "Budi", "Produksi"),
+        tambah_karyawan(db, "Ani", "Keuangan"),
+        tambah_karyawan(db, "Citra", "Produksi"),
+    ]
+    for item in orang:
+        item.tanggal_bergabung = datetime(2024, 1, 2)
+    db.commit()
+    return orang
+
+
+def test_counter_sama_dengan_rebuild(db, karyawan):
+    budi, ani, citra = karyawan
+    # Absensi yang sudah ada sebelum baris ringkasan dibuat ikut terhitung oleh pastikan_ringkasan
+    tambah_absensi(db, citra, datetime(2024, 3, 4, 7, 40), datetime(2024, 3, 4, 16, 0))
+    db.commit()
+
+    budi_senin = absen_masuk(db, budi, datetime(2024, 3, 4, 7, 55))
+    cocok_dengan_rebuild(db)
+    ani_senin = absen_masuk(db, ani, datetime(2024, 3, 4, 8, 30), status="Terlambat")
+    cocok_dengan_rebuild(db)
+    budi_selasa = absen_masuk(db, budi, datetime(2024, 3, 5, 8, 40), status="Terlambat")
+    ani_selasa = absen_masuk(db, ani, datetime(2024, 3, 5, 7, 50))
+    absen_masuk(db, citra, datetime(2024, 3, 5, 9, 0), status="Izin")
+    cocok_dengan_rebuild(db)
+
+    absen_keluar(db, budi_senin, datetime(2024, 3, 4, 16, 5))
+    absen_keluar(db, ani_selasa, datetime(2024, 3, 5, 16, 10))
+    hasil = cocok_dengan_rebuild(db)
+    assert hasil[(SENIN, "*")] == (3, 2, 1, 2)
+    assert hasil[(SELASA, "Produksi")] == (2, 0, 1, 0)
+
+    # Hapus absensi terbuka (Terlambat) dan absensi yang sudah absen keluar (Hadir)
+    hapus_absensi(db, ani_senin)
+    hapus_absensi(db, budi_senin)
+    absen_keluar(db, budi_selasa, datetime(2024, 3, 5, 17, 0))
+    hasil = cocok_dengan_rebuild(db)
+    assert hasil[(SENIN, "*")] == (3, 1, 0, 1)
+    assert hasil[(SENIN, "Keuangan")] == (1, 0, 0, 0)
+    assert hasil[(SELASA, "*")] == (3, 1, 1, 2)
+
+
+def test_counter_ikut_rollback(db, karyawan):
+    budi = karyawan[0]
+    ringkasan_harian.pastikan_ringkasan(db, SENIN, budi.departemen)
+    sebelum = isi_ringkasan(db)
+
+    tambah_absensi(db, budi, datetime(2024, 3, 4, 7, 55))
+    ringkasan_harian.catat_absen_masuk(db, SENIN, budi.departemen, "Hadir")
+    db.rollback()
+
+    assert isi_ringkasan(db) == sebelum
+
+
+def test_rebuild_melewati_tanggal_arsip(db, karyawan):
+    budi, ani, _ = karyawan
+    tambah_absensi(db, budi, datetime(2024, 2, 12, 7, 50), datetime(2024, 2, 12, 16, 0))
+    tambah_absensi(db, ani, datetime(2024, 2, 12, 8, 20), status="Terlambat")
+    tambah_absensi(db, budi, datetime(2024, 3, 4, 7, 50))
+    db.commit()
+    ringkasan_harian.rebuild(db, date(2024, 2, 1), date(2024, 3, 31))
+    februari = {key: value for key, value in isi_ringkasan(db).items() if key[0] < date(2024, 3, 1)}
+    assert februari[(date(2024, 2, 12), "*")] == (3, 1, 1, 1)
+
+    arsip_absensi.arsipkan(db, date(2024, 3, 1))
+    assert arsip_absensi.awal_live() == date(2024, 3, 1)
+
+    # Absensi Februari sudah pindah ke arsip; ringkasannya tidak boleh dihitung ulang menjadi nol
+    jumlah = ringkasan_harian.rebuild(db, date(2024, 2, 1), date(2024, 3, 31))
+    assert jumlah == 31 * 3
+    hasil = isi_ringkasan(db)
+    assert {key: value for key, value in hasil.items() if key[0] < date(2024, 3, 1)} == februari
+    assert hasil[(SENIN, "*")] == (3, 1, 0, 0)
+
+    assert ringkasan_harian.rebuild(db, date(2024, 2, 1), date(2024, 2, 29)) == 0
+    assert {key: value for key, value in isi_ringkasan(db).items() if key[0] < date(2024, 3, 1)} == februari
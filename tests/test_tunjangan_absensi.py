@@ -0,0 +1,87 @@
+from datetime import date
+
+import pytest
+
+import laporan
+import rekap_bulanan
+import tunjangan_absensi
+from models import Absensi, Karyawan
+
+
+def uang_makan(db):
+    return {absensi.id: absensi.uang_makan for absensi in db.query(Absensi)}
+
+
+def test_ubah_dengan_ids(db, data_absensi):
+    sebelum = uang_makan(db)
+    ids = sorted(sebelum)[:5]
+
+    jumlah = tunjangan_absensi.ubah_massal(db, {"uang_makan": False}, ids=ids)
+    db.commit()
+
+    assert jumlah == 5
+    sesudah = uang_makan(db)
+    assert all(sesudah[absensi_id] is False for absensi_id in ids)
+    assert {key: value for key, value in sesudah.items() if key not in ids} == {
+        key: value for key, value in sebelum.items() if key not in ids
+    }
+
+
+def test_ubah_dengan_filter(db, data_absensi):
+    filters = laporan.parse_filters("2024-02-01", "2024-02-29", departemen="Produksi")
+    rekap_bulanan.hitung_ulang(db)
+    db.commit()
+
+    jumlah = tunjangan_absensi.ubah_massal(db, {"uang_makan": True, "uang_transport": True}, filters=filters)
+    db.commit()
+
+    terpilih = db.query(Absensi).join(Karyawan, Absensi.karyawan_id == Karyawan.id).filter(
+        Absensi.tanggal_hari >= date(2024, 2, 1), Absensi.tanggal_hari <= date(2024, 2, 29),
+        Karyawan.departemen == "Produksi"
+    ).all()
+    assert jumlah == len(terpilih) > 0
+    assert all(absensi.uang_makan and absensi.uang_transport for absensi in terpilih)
+    assert db.query(Absensi).filter(Absensi.uang_transport == True).count() == jumlah  # noqa: E712
+
+    # Rekap bulanan karyawan yang tersentuh ikut dihitung ulang dalam transaksi yang sama
+    rekap = {row["nama"]: row for row in rekap_bulanan.ambil_rekap(db, date(2024, 2, 1))}
+    assert rekap["Budi"]["hari_uang_transport"] == rekap["Budi"]["hari_hadir"]
+    assert rekap["Ani"]["hari_uang_transport"] == 0
+
+
+@pytest.mark.parametrize("nilai", [{"uang_makan": "false"}, {"uang_makan": 0}, {"uang_transport": 1}, {}, {"uang_lembur": True}])
+def test_nilai_bukan_boolean_ditolak(db, data_absensi, nilai):
+    sebelum = uang_makan(db)
+    with pytest.raises(ValueError):
+        tunjangan_absensi.ubah_massal(db, nilai, ids=[1, 2])
+    assert uang_makan(db) == sebelum
+
+
+@pytest.mark.parametrize("ids", [[], "123", [1.9], [True], ["1"]])
+def test_ids_tidak_valid_ditolak(db, data_absensi, ids):
+    with pytest.raises(ValueError):
+        tunjangan_absensi.ubah_massal(db, {"uang_makan": True}, ids=ids)
+
+
+def test_tanpa_pilihan_ditolak(db, data_absensi):
+    with pytest.raises(ValueError):
+        tunjangan_absensi.ubah_massal(db, {"uang_makan": True}, filters={})
+
+
+@pytest.mark.parametrize("data", [
+    {"uang_makan": "false", "ids": [1]},
+    {"uang_makan": False, "ids": "123"},
+    {"uang_makan": False, "ids": [1.9]},
+    {"uang_makan": False, "ids": [True]},
+    {"uang_makan": False, "karyawan_id": "1"},
+    {"uang_makn": False, "ids": [1]},
+])
+def test_request_tidak_valid_ditolak(data):
+    with pytest.raises(ValueError):
+        tunjangan_absensi.PerubahanTunjangan.parse_obj(data)
+
+
+def test_request_valid():
+    permintaan = tunjangan_absensi.PerubahanTunjangan.parse_obj({"uang_transport": False, "karyawan_id": 3})
+    assert permintaan.nilai() == {"uang_transport": False}
+    assert permintaan.ids is None and permintaan.karyawan_id == 3
@@ -0,0 +1,110 @@
+"""
+Perubahan massal status uang makan dan uang transport absensi.
+
+Di akhir bulan HR mengubah ratusan status tunjangan sekaligus. Alih-alih satu
+request dan satu commit per absensi, absensi yang dipilih (daftar ID atau filter
+laporan seperti rentang tanggal dan departemen) diubah dengan satu UPDATE
+set-based. Rekap bulanan karyawan dan bulan yang tersentuh dihitung ulang dalam
+transaksi yang sama.
+
+Isi request endpoint diperiksa dengan tipe JSON yang ketat (PerubahanTunjangan):
+string "false" atau angka 0 ditolak sebagai nilai tunjangan alih-alih dibaca
+sebagai True, dan ids harus berupa daftar bilangan bulat.
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, StrictBool, StrictInt, StrictStr
+from sqlalchemy import func, update
+
+from models import Absensi
+import laporan
+import rekap_bulanan
+
+# Kolom tunjangan yang boleh diubah
+KOLOM_TUNJANGAN = ("uang_makan", "uang_transport")
+
+
+class PerubahanTunjangan(BaseModel):
+    """
+    Isi request perubahan massal tunjangan.
+
+    Attributes:
+        uang_makan (bool, optional): Nilai baru uang makan
+        uang_transport (bool, optional): Nilai baru uang transport
+        ids (list, optional): ID absensi yang diubah
+        tanggal_mulai, tanggal_akhir, karyawan_id, departemen, status (optional):
+            Filter laporan, dipakai jika ids tidak diberikan
+    """
+    uang_makan: Optional[StrictBool] = None
+    uang_transport: Optional[StrictBool] = None
+    ids: Optional[List[StrictInt]] = None
+    tanggal_mulai: Optional[StrictStr] = None
+    tanggal_akhir: Optional[StrictStr] = None
+    karyawan_id: Optional[StrictInt] = None
+    departemen: Optional[StrictStr] = None
+    status: Optional[StrictStr] = None
+
+    class Config:
+        # Nama field yang salah ketik ditolak alih-alih diabaikan
+        extra = "forbid"
+
+    def nilai(self):
+        """
+        Kolom tunjangan yang diisi di request beserta nilai barunya.
+        """
+        return {kolom: getattr(self, kolom) for kolom in KOLOM_TUNJANGAN if getattr(self, kolom) is not None}
+
+
+def ubah_massal(db, nilai, ids=None, filters=None):
+    """
+    Mengubah kolom tunjangan absensi terpilih dengan satu UPDATE.
+
+    Perubahan tidak di-commit; pemanggil melakukan commit sehingga UPDATE dan
+    hitung ulang rekap bulanan berada dalam satu transaksi.
+
+    Args:
+        db (Session): Session database
+        nilai (dict): Kolom tunjangan -> nilai baru (bool), misalnya {"uang_makan": True}
+        ids (list, optional): ID absensi yang diubah
+        filters (dict, optional): Hasil laporan.parse_filters (dipakai jika ids tidak diberikan)
+
+    Returns:
+        int: Jumlah absensi yang cocok dengan pilihan
+
+    Raises:
+        ValueError: Jika nilai kosong, tidak dikenal atau bukan boolean, atau pilihan absensi
+                    kosong atau bukan daftar ID
+    """
+    if not nilai or any(kolom not in KOLOM_TUNJANGAN for kolom in nilai):
+        raise ValueError("Isi minimal salah satu dari uang_makan atau uang_transport")
+    if any(not isinstance(value, bool) for value in nilai.values()):
+        raise ValueError("Nilai uang_makan dan uang_transport harus boolean (true/false)")
+    if ids is not None:
+        if not ids:
+            raise ValueError("Daftar ids tidak boleh kosong")
+        if isinstance(ids, (str, bytes)) or any(isinstance(value, bool) or not isinstance(value, int) for value in ids):
+            raise ValueError("ids harus berupa daftar ID absensi (bilangan bulat)")
+        kondisi = [Absensi.id.in_(ids)]
+    elif filters:
+        kondisi = laporan.filter_absensi(filters)
+    else:
+        # Cegah perubahan seluruh tabel absensi karena request tanpa pilihan
+        raise ValueError("Pilih absensi melalui ids atau minimal satu filter")
+
+    # Karyawan dan rentang tanggal yang tersentuh, untuk hitung ulang rekap bulanan
+    karyawan_ids = [row[0] for row in db.query(Absensi.karyawan_id).filter(
+        *kondisi, Absensi.karyawan_id.isnot(None)
+    ).distinct()]
+    tanggal_mulai, tanggal_akhir = db.query(
+        func.min(Absensi.tanggal_hari), func.max(Absensi.tanggal_hari)
+    ).filter(*kondisi).one()
+
+    result = db.execute(
+        update(Absensi).where(*kondisi).values(**nilai)
+        .execution_options(synchronize_session=False)
+    )
+
+    if karyawan_ids and tanggal_mulai is not None:
+        rekap_bulanan.hitung_ulang(db, tanggal_mulai, tanggal_akhir, karyawan_ids)
+    return result.rowcount